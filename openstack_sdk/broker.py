@@ -0,0 +1,206 @@
+# #######
+# Copyright (c) 2019 Cloudify Platform Ltd. All rights reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Standard imports
+import os
+import json
+import socket
+import logging
+import argparse
+import tempfile
+import threading
+import SocketServer
+
+# Local imports
+from openstack_sdk.cache import build_discover, supports_discovery_cache
+
+# Client config key used to enable the broker
+BROKER_CONFIG = 'broker'
+DEFAULT_SOCKET_PATH = os.path.join(tempfile.gettempdir(),
+                                   'cloudify-openstacksdk-broker.sock')
+# Timeout (in seconds) for a single broker request, once exceeded the client
+# falls back to a direct connection
+DEFAULT_TIMEOUT = 30
+# Token is refreshed by the broker when it is valid for less than this period
+# (in seconds), so that clients never receive a token which is about to expire
+DEFAULT_EXPIRY_MARGIN = 300
+
+logger = logging.getLogger(__name__)
+
+
+class BrokerError(Exception):
+    pass
+
+
+class BrokerClient(object):
+    """
+    Client for the local connection broker. Instead of authenticating by
+    itself the operation process asks the broker for the token, service
+    catalog and discovered API versions of a warm connection
+    """
+
+    def __init__(self, socket_path=DEFAULT_SOCKET_PATH,
+                 timeout=DEFAULT_TIMEOUT):
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    @classmethod
+    def from_client_config(cls, client_config):
+        """
+        Create broker client from client config if the broker is enabled
+        there and it is running
+        :param dict client_config: Openstack client configuration
+        :return: Instance of BrokerClient or None
+        """
+        config = client_config.get(BROKER_CONFIG) or {}
+        socket_path = config.get('socket_path') or DEFAULT_SOCKET_PATH
+        if not config.get('enabled') or not os.path.exists(socket_path):
+            return None
+        return cls(socket_path, timeout=config.get('timeout',
+                                                   DEFAULT_TIMEOUT))
+
+    def request(self, client_config):
+        """
+        Request auth state for client config from the broker
+        :param dict client_config: Openstack client configuration
+        :return dict: Broker response
+        """
+        request = {
+            'client_config': dict(
+                (key, value) for key, value in client_config.items()
+                if key != BROKER_CONFIG)
+        }
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        client.settimeout(self.timeout)
+        try:
+            client.connect(self.socket_path)
+            client.sendall(json.dumps(request) + '\n')
+            response = json.loads(client.makefile('rb').readline())
+        except (socket.error, ValueError) as error:
+            raise BrokerError(
+                'Failed to communicate with broker {0}: {1}'.format(
+                    self.socket_path, error))
+        finally:
+            client.close()
+
+        if response.get('status') != 'ok':
+            raise BrokerError(
+                'Broker failed to handle request: {0}'.format(
+                    response.get('message')))
+        return response
+
+    def authorize(self, connection, client_config):
+        """
+        Authorize connection using the auth state served by the broker
+        :param connection: Instance of openstack.connection.Connection
+        :param dict client_config: Openstack client configuration
+        """
+        response = self.request(client_config)
+        session = connection.session
+        session.auth.set_auth_state(response['auth_state'])
+        # Without a shared discovery cache the API versions are discovered
+        # by the connection itself
+        if not supports_discovery_cache(session):
+            return
+        for url, data in response['discovery'].items():
+            session._discovery_cache[url] = build_discover(url, data)
+
+
+class BrokerRequestHandler(SocketServer.StreamRequestHandler):
+
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline())
+            response = self.server.handle_request(request)
+        except Exception as error:
+            logger.exception('Failed to handle broker request')
+            response = {'status': 'error', 'message': str(error)}
+        self.wfile.write(json.dumps(response) + '\n')
+
+
+class BrokerServer(SocketServer.ThreadingMixIn,
+                   SocketServer.UnixStreamServer):
+    """
+    Long lived local broker which keeps authenticated connections per cloud
+    and serves their auth state to the short lived operation processes
+    """
+    daemon_threads = True
+
+    def __init__(self, socket_path, pool,
+                 expiry_margin=DEFAULT_EXPIRY_MARGIN):
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        self.pool = pool
+        self.expiry_margin = expiry_margin
+        self._lock = threading.Lock()
+        SocketServer.UnixStreamServer.__init__(
+            self, socket_path, BrokerRequestHandler)
+        # Requests contain credentials, so only the owner can use the broker
+        os.chmod(socket_path, 0o600)
+
+    def handle_request(self, request):
+        client_config = dict(
+            (key, value) for key, value in request['client_config'].items()
+            if key != BROKER_CONFIG)
+        with self._lock:
+            connection = self.pool.get(client_config)
+            auth = connection.session.auth
+            if not auth.auth_ref or \
+                    auth.auth_ref.will_expire_soon(self.expiry_margin):
+                auth.invalidate()
+                connection.authorize()
+            discovery = {}
+            if supports_discovery_cache(connection.session):
+                discovery = dict(
+                    (url, disc._data) for url, disc
+                    in connection.session._discovery_cache.items())
+            return {
+                'status': 'ok',
+                'auth_state': auth.get_auth_state(),
+                'discovery': discovery
+            }
+
+    def server_close(self):
+        SocketServer.UnixStreamServer.server_close(self)
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+        self.pool.clear()
+
+
+def main():
+    # Local imports
+    from openstack_sdk.pool import ConnectionPool
+
+    parser = argparse.ArgumentParser(
+        description='Local openstack connection broker')
+    parser.add_argument('--socket-path', default=DEFAULT_SOCKET_PATH)
+    parser.add_argument('--idle-timeout', type=int, default=3600)
+    parser.add_argument('--expiry-margin', type=int,
+                        default=DEFAULT_EXPIRY_MARGIN)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    server = BrokerServer(args.socket_path,
+                          ConnectionPool(idle_timeout=args.idle_timeout),
+                          expiry_margin=args.expiry_margin)
+    logger.info('Broker is listening on {0}'.format(args.socket_path))
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
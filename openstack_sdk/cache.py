@@ -0,0 +1,388 @@
+# #######
+# Copyright (c) 2019 Cloudify Platform Ltd. All rights reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Standard imports
+import os
+import hmac
+import json
+import time
+import fcntl
+import hashlib
+import calendar
+import tempfile
+from distutils.version import LooseVersion
+
+# Third party imports
+import pkg_resources
+from Crypto.Cipher import AES
+from keystoneauth1 import discover
+
+# Client config key used to enable the token cache
+TOKEN_CACHE_CONFIG = 'token_cache'
+# Default directory used to store cache files
+DEFAULT_CACHE_PATH = os.path.join(tempfile.gettempdir(),
+                                  'cloudify-openstacksdk-cache')
+# Token is considered expired when it is valid for less than this period (in
+# seconds), so that it will not expire in the middle of an operation
+DEFAULT_EXPIRY_MARGIN = 300
+# Period (in seconds) for which discovered API versions are reused
+DEFAULT_DISCOVERY_TTL = 3600
+
+# Discovery is shared through keystoneauth internals, the discovery cache
+# of the session and the raw version data of the discovery objects, which
+# are only relied on for the keystoneauth releases they were checked with.
+# Other releases fall back to plain discovery
+DISCOVERY_CACHE_KEYSTONEAUTH_VERSIONS = (LooseVersion('3.0.0'),
+                                         LooseVersion('5.0.0'))
+
+# Number of iterations used to derive the encryption keys
+KDF_ITERATIONS = 10000
+IV_SIZE = 16
+MAC_SIZE = 32
+
+# Client config keys that identify the keystone identity a token belongs to
+IDENTITY_KEYS = (
+    'auth_url',
+    'username',
+    'user_id',
+    'project_name',
+    'project_id',
+    'domain_name',
+    'domain_id',
+    'user_domain_name',
+    'user_domain_id',
+    'project_domain_name',
+    'project_domain_id',
+)
+
+
+def get_keystoneauth_version():
+    """
+    Get the installed keystoneauth version
+    :return: Instance of LooseVersion or None if it is unknown
+    """
+    try:
+        return LooseVersion(
+            pkg_resources.get_distribution('keystoneauth1').version)
+    except pkg_resources.DistributionNotFound:
+        return None
+
+
+KEYSTONEAUTH_VERSION = get_keystoneauth_version()
+
+
+def supports_discovery_cache(session):
+    """
+    Check if discovered API versions of keystoneauth session can be shared,
+    which is only the case for the checked keystoneauth releases
+    :param session: Instance of keystoneauth1.session.Session
+    :return bool: True if the discovery cache of session can be shared
+    """
+    min_version, max_version = DISCOVERY_CACHE_KEYSTONEAUTH_VERSIONS
+    if not KEYSTONEAUTH_VERSION or \
+            not min_version <= KEYSTONEAUTH_VERSION < max_version:
+        return False
+    return hasattr(session, '_discovery_cache')
+
+
+def build_discover(url, data):
+    """
+    Rebuild keystoneauth discovery object from its raw version data without
+    querying the endpoint again
+    :param str url: Discovered endpoint url
+    :param list data: Raw version data returned by the endpoint
+    :return: Instance of keystoneauth1.discover.Discover
+    """
+    disc = discover.Discover.__new__(discover.Discover)
+    disc._url = url
+    disc._data = data
+    return disc
+
+
+class FileCache(object):
+    """
+    Encrypted on-disk key/value cache shared between operation processes.
+    Every entry is stored in its own file which is guarded by an advisory
+    lock, written atomically and encrypted with a key derived from the
+    supplied secret, so entries can only be read by a process that knows
+    the secret
+    """
+
+    def __init__(self, path, secret):
+        self.path = path
+        self.secret = secret
+
+    def _file_path(self, key, suffix='.cache'):
+        return os.path.join(self.path, key + suffix)
+
+    def _ensure_path(self):
+        if not os.path.isdir(self.path):
+            try:
+                os.makedirs(self.path, 0o700)
+            except OSError:
+                # Another process may have created it concurrently
+                if not os.path.isdir(self.path):
+                    raise
+
+    def _derive_keys(self, key):
+        derived = hashlib.pbkdf2_hmac('sha256',
+                                      self.secret.encode('utf-8'),
+                                      key.encode('utf-8'),
+                                      KDF_ITERATIONS,
+                                      dklen=64)
+        return derived[:32], derived[32:]
+
+    def _encrypt(self, key, data):
+        encryption_key, mac_key = self._derive_keys(key)
+        iv = os.urandom(IV_SIZE)
+        cipher = AES.new(encryption_key, AES.MODE_CFB, iv)
+        payload = iv + cipher.encrypt(data)
+        return hmac.new(mac_key, payload, hashlib.sha256).digest() + payload
+
+    def _decrypt(self, key, data):
+        encryption_key, mac_key = self._derive_keys(key)
+        mac, payload = data[:MAC_SIZE], data[MAC_SIZE:]
+        expected_mac = hmac.new(mac_key, payload, hashlib.sha256).digest()
+        if len(payload) < IV_SIZE or not hmac.compare_digest(mac,
+                                                             expected_mac):
+            return None
+        cipher = AES.new(encryption_key, AES.MODE_CFB, payload[:IV_SIZE])
+        return cipher.decrypt(payload[IV_SIZE:])
+
+    def _lock(self, key, operation):
+        self._ensure_path()
+        lock_file = open(self._file_path(key, '.lock'), 'a')
+        fcntl.flock(lock_file, operation)
+        return lock_file
+
+    def load(self, key):
+        """
+        Load entry for key
+        :param str key: Entry key
+        :return: Cached value or None if entry is missing, expired, or it
+        cannot be decrypted
+        """
+        lock_file = self._lock(key, fcntl.LOCK_SH)
+        try:
+            with open(self._file_path(key), 'rb') as cache_file:
+                data = self._decrypt(key, cache_file.read())
+        except (IOError, OSError):
+            return None
+        finally:
+            lock_file.close()
+
+        if not data:
+            return None
+        try:
+            entry = json.loads(data.decode('utf-8'))
+        except ValueError:
+            return None
+        if entry.get('expires_at') and entry['expires_at'] <= time.time():
+            return None
+        return entry.get('value')
+
+    def store(self, key, value, expires_at=None):
+        """
+        Store value for key
+        :param str key: Entry key
+        :param value: JSON serializable value
+        :param float expires_at: Epoch time after which entry is not valid
+        """
+        data = json.dumps({'value': value, 'expires_at': expires_at})
+        lock_file = self._lock(key, fcntl.LOCK_EX)
+        try:
+            temp_fd, temp_path = tempfile.mkstemp(dir=self.path)
+            with os.fdopen(temp_fd, 'wb') as temp_file:
+                temp_file.write(self._encrypt(key, data.encode('utf-8')))
+            os.rename(temp_path, self._file_path(key))
+        finally:
+            lock_file.close()
+
+    def invalidate(self, key):
+        """
+        Remove entry for key
+        :param str key: Entry key
+        """
+        lock_file = self._lock(key, fcntl.LOCK_EX)
+        try:
+            os.remove(self._file_path(key))
+        except OSError:
+            pass
+        finally:
+            lock_file.close()
+
+
+class DiscoveryCache(dict):
+    """
+    Keystoneauth discovery cache backed by file cache, so that the API
+    versions and microversions negotiated by one operation are reused by the
+    next ones instead of querying every service endpoint again. The whole
+    cache is invalidated once any endpoint answers with multiple choices or
+    with a non API 404, which means that the cloud endpoints were changed
+    """
+
+    def __init__(self, cache, key, ttl=DEFAULT_DISCOVERY_TTL):
+        super(DiscoveryCache, self).__init__()
+        self.cache = cache
+        self.key = key
+        self.ttl = ttl
+        self.expires_at = None
+
+    def load(self):
+        entry = self.cache.load(self.key)
+        if not entry:
+            return
+        self.expires_at = entry['expires_at']
+        for url, data in entry['versions'].items():
+            super(DiscoveryCache, self).__setitem__(
+                url, build_discover(url, data))
+
+    def persist(self):
+        if not self.expires_at:
+            self.expires_at = time.time() + self.ttl
+        versions = dict((url, disc._data) for url, disc in self.items())
+        self.cache.store(self.key,
+                         {'versions': versions,
+                          'expires_at': self.expires_at},
+                         expires_at=self.expires_at)
+
+    def invalidate(self):
+        self.clear()
+        self.expires_at = None
+        self.cache.invalidate(self.key)
+
+    def __setitem__(self, url, disc):
+        known = self.get(url)
+        super(DiscoveryCache, self).__setitem__(url, disc)
+        # Keystoneauth sets entries on every lookup, so only persist when
+        # something was really discovered
+        if known is None or known._data != disc._data:
+            self.persist()
+
+    def response_hook(self, response, *args, **kwargs):
+        """
+        Requests response hook which invalidates the cache when the cloud
+        endpoints seem to be changed. API errors for missing resources are
+        returned as JSON, so only non JSON 404 responses are considered
+        """
+        content_type = response.headers.get('Content-Type') or ''
+        if response.status_code == 300 or (
+                response.status_code == 404 and
+                'json' not in content_type):
+            self.invalidate()
+
+    def attach(self, session):
+        """
+        Use this cache as the discovery cache of keystoneauth session, when
+        the installed keystoneauth release supports it
+        :param session: Instance of keystoneauth1.session.Session
+        :return bool: True if the cache was attached
+        """
+        if not supports_discovery_cache(session):
+            return False
+        self.load()
+        session._discovery_cache = self
+        if session.auth and hasattr(session.auth, '_discovery_cache'):
+            session.auth._discovery_cache = self
+        session.session.hooks['response'].append(self.response_hook)
+        return True
+
+
+class TokenCache(object):
+    """
+    Keystone token cache, so that operations which target the same identity
+    reuse a still valid token instead of doing a full authentication
+    """
+
+    def __init__(self,
+                 client_config,
+                 path=DEFAULT_CACHE_PATH,
+                 expiry_margin=DEFAULT_EXPIRY_MARGIN,
+                 discovery_ttl=DEFAULT_DISCOVERY_TTL):
+        self.client_config = client_config
+        self.expiry_margin = expiry_margin
+        self.cache = FileCache(path, client_config['password'])
+        self.discovery_cache = \
+            DiscoveryCache(self.cache, self.key + '-discovery', discovery_ttl)
+
+    @classmethod
+    def from_client_config(cls, client_config):
+        """
+        Create token cache from client config if it is enabled there
+        :param dict client_config: Openstack client configuration
+        :return: Instance of TokenCache or None when cache is not enabled
+        """
+        config = client_config.get(TOKEN_CACHE_CONFIG) or {}
+        # Password is used as the encryption secret, so without it tokens
+        # cannot be stored safely
+        if not config.get('enabled') or not client_config.get('password'):
+            return None
+        return cls(client_config,
+                   path=config.get('path') or DEFAULT_CACHE_PATH,
+                   expiry_margin=config.get('expiry_margin',
+                                            DEFAULT_EXPIRY_MARGIN),
+                   discovery_ttl=config.get('discovery_ttl',
+                                            DEFAULT_DISCOVERY_TTL))
+
+    @property
+    def key(self):
+        identity = dict((key, self.client_config.get(key))
+                        for key in IDENTITY_KEYS)
+        canonical_identity = json.dumps(identity, sort_keys=True)
+        return hashlib.sha256(canonical_identity.encode('utf-8')).hexdigest()
+
+    def load(self):
+        """
+        Load auth state which is still valid for at least the expiry margin
+        :return str: Serialized auth state or None
+        """
+        entry = self.cache.load(self.key)
+        if not entry or entry['expires_at'] - time.time() \
+                <= self.expiry_margin:
+            return None
+        return entry['auth_state']
+
+    def store(self, auth_state, expires):
+        """
+        Store auth state
+        :param str auth_state: Serialized auth state
+        :param datetime expires: Token expiration time
+        """
+        expires_at = calendar.timegm(expires.utctimetuple())
+        self.cache.store(self.key,
+                         {'auth_state': auth_state, 'expires_at': expires_at},
+                         expires_at=expires_at)
+
+    def invalidate(self):
+        self.cache.invalidate(self.key)
+
+    def authorize(self, connection):
+        """
+        Authorize connection using cached token if there is a valid one,
+        otherwise do full authentication and cache the new token. Service
+        catalog is part of the auth state, so together with the discovery
+        cache no request is needed before the first API call
+        :param connection: Instance of openstack.connection.Connection
+        """
+        self.discovery_cache.attach(connection.session)
+        auth = connection.session.auth
+        auth_state = self.load()
+        if auth_state:
+            auth.set_auth_state(auth_state)
+            return
+
+        connection.authorize()
+        if auth.auth_ref and auth.auth_ref.expires:
+            self.store(auth.get_auth_state(), auth.auth_ref.expires)
@@ -0,0 +1,243 @@
+# #######
+# Copyright (c) 2019 Cloudify Platform Ltd. All rights reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Standard imports
+import time
+
+# Third party imports
+from keystoneauth1.exceptions import ConnectionError as KeystoneConnectionError
+from keystoneauth1.exceptions import HttpError
+from openstack import exceptions
+from requests.exceptions import ConnectionError
+
+# Local imports
+from openstack_sdk.hooks import get_service_type
+from openstack_sdk.shared_state import DEFAULT_STATE_PATH, SharedState
+
+# Client config key used to configure the circuit breaker
+CIRCUIT_BREAKER_CONFIG = 'circuit_breaker'
+
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_COOLDOWN = 60
+
+STATE_CLOSED = 'closed'
+STATE_OPEN = 'open'
+STATE_HALF_OPEN = 'half_open'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS circuit_breakers (
+    breaker TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    failures INTEGER NOT NULL,
+    opened_at REAL
+);
+"""
+
+# Callables invoked with the event of every breaker state transition
+circuit_breaker_listeners = []
+
+
+class CircuitOpenError(exceptions.SDKException):
+    """
+    Raised instead of sending a request to a service whose circuit breaker
+    is open, the request can be retried once the breaker cooldown is over
+    """
+
+    def __init__(self, message=None, retry_after=None):
+        super(CircuitOpenError, self).__init__(message=message)
+        self.retry_after = retry_after
+
+
+def add_circuit_breaker_listener(listener):
+    """
+    Register listener for circuit breaker state transitions
+    :param listener: Callable which receives the event dict with
+    "breaker", "service_type", "from_state", "to_state" and "failures"
+    """
+    circuit_breaker_listeners.append(listener)
+
+
+def remove_circuit_breaker_listener(listener):
+    if listener in circuit_breaker_listeners:
+        circuit_breaker_listeners.remove(listener)
+
+
+class CircuitBreaker(object):
+    """
+    Circuit breaker per openstack service type, shared between all the
+    operation processes on the host. After consecutive failures the breaker
+    opens and requests fail fast until the cooldown is over, then a single
+    half open probe decides whether the service is healthy again
+    """
+
+    def __init__(self, state, scope,
+                 failure_threshold=DEFAULT_FAILURE_THRESHOLD,
+                 cooldown=DEFAULT_COOLDOWN,
+                 logger=None):
+        self.state = state
+        self.scope = scope
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.logger = logger
+
+    @classmethod
+    def from_client_config(cls, client_config, logger=None):
+        """
+        Create circuit breaker from client config if it is enabled there
+        :param dict client_config: Openstack client configuration
+        :param logger: Logger used to report state transitions
+        :return: Instance of CircuitBreaker or None
+        """
+        config = client_config.get(CIRCUIT_BREAKER_CONFIG) or {}
+        if not config.get('enabled'):
+            return None
+        state = SharedState(config.get('path') or DEFAULT_STATE_PATH,
+                            schema=SCHEMA)
+        scope = '{0}:{1}'.format(client_config.get('auth_url'),
+                                 client_config.get('region_name'))
+        return cls(state, scope,
+                   failure_threshold=config.get('failure_threshold',
+                                                DEFAULT_FAILURE_THRESHOLD),
+                   cooldown=config.get('cooldown', DEFAULT_COOLDOWN),
+                   logger=logger)
+
+    @staticmethod
+    def is_failure(response=None, error=None):
+        """
+        Check if request outcome indicates an unhealthy service
+        :param response: Response of the request
+        :param error: Exception raised by the request
+        :return bool: True if it is a service failure
+        """
+        if error is not None:
+            if isinstance(error, (KeystoneConnectionError, ConnectionError)):
+                return True
+            return isinstance(error, HttpError) and error.http_status >= 500
+        return response is not None and response.status_code >= 500
+
+    def _get_breaker(self, connection, breaker):
+        row = connection.execute(
+            'SELECT state, failures, opened_at FROM circuit_breakers '
+            'WHERE breaker = ?', (breaker,)).fetchone()
+        return row or (STATE_CLOSED, 0, None)
+
+    def _set_breaker(self, connection, breaker, state, failures, opened_at):
+        connection.execute(
+            'INSERT OR REPLACE INTO circuit_breakers '
+            '(breaker, state, failures, opened_at) VALUES (?, ?, ?, ?)',
+            (breaker, state, failures, opened_at))
+
+    def _notify(self, service_type, from_state, to_state, failures):
+        if from_state == to_state:
+            return
+        event = {
+            'breaker': '{0}:{1}'.format(self.scope, service_type),
+            'service_type': service_type,
+            'from_state': from_state,
+            'to_state': to_state,
+            'failures': failures
+        }
+        if self.logger:
+            self.logger.warning(
+                'Circuit breaker for {0} changed from {1} to {2} after {3} '
+                'consecutive failures'.format(
+                    service_type, from_state, to_state, failures))
+        for listener in list(circuit_breaker_listeners):
+            listener(event)
+
+    def _check_open(self, service_type, state, opened_at):
+        remaining = opened_at + self.cooldown - time.time()
+        if remaining > 0:
+            raise CircuitOpenError(
+                'Circuit breaker for {0} is {1}, failing fast for {2:.0f}'
+                ' seconds'.format(service_type, state, remaining),
+                retry_after=remaining)
+
+    def before_request(self, service_type):
+        """
+        Check if request to service is allowed, once the cooldown of an open
+        breaker is over the request is allowed as the half open probe. The
+        breaker state is only written when the probe is allowed, so that
+        requests to a healthy service do not wait for the write lock
+        :param str service_type: Openstack service type
+        """
+        breaker = '{0}:{1}'.format(self.scope, service_type)
+        with self.state.read() as connection:
+            state, _, opened_at = self._get_breaker(connection, breaker)
+        if state == STATE_CLOSED:
+            return
+        self._check_open(service_type, state, opened_at)
+
+        with self.state.transaction() as connection:
+            # Another process may have taken the probe in the meantime
+            state, failures, opened_at = \
+                self._get_breaker(connection, breaker)
+            if state == STATE_CLOSED:
+                return
+            self._check_open(service_type, state, opened_at)
+            # Allow only one probe per cooldown period, other requests keep
+            # failing fast until the probe result is recorded
+            self._set_breaker(connection, breaker,
+                              STATE_HALF_OPEN, failures, time.time())
+        self._notify(service_type, state, STATE_HALF_OPEN, failures)
+
+    def record_success(self, service_type):
+        breaker = '{0}:{1}'.format(self.scope, service_type)
+        with self.state.read() as connection:
+            state, failures, _ = self._get_breaker(connection, breaker)
+        if state == STATE_CLOSED and not failures:
+            return
+
+        with self.state.transaction() as connection:
+            state, failures, _ = self._get_breaker(connection, breaker)
+            if state == STATE_CLOSED and not failures:
+                return
+            self._set_breaker(connection, breaker, STATE_CLOSED, 0, None)
+        self._notify(service_type, state, STATE_CLOSED, failures)
+
+    def record_failure(self, service_type):
+        breaker = '{0}:{1}'.format(self.scope, service_type)
+        with self.state.transaction() as connection:
+            state, failures, opened_at = \
+                self._get_breaker(connection, breaker)
+            failures += 1
+            new_state = state
+            if state == STATE_HALF_OPEN or \
+                    failures >= self.failure_threshold:
+                new_state = STATE_OPEN
+                opened_at = time.time()
+            self._set_breaker(connection, breaker,
+                              new_state, failures, opened_at)
+        self._notify(service_type, state, new_state, failures)
+
+    def __call__(self, request):
+        def wrapper(url, method, **kwargs):
+            service_type = get_service_type(kwargs)
+            if not service_type:
+                return request(url, method, **kwargs)
+
+            self.before_request(service_type)
+            try:
+                response = request(url, method, **kwargs)
+            except Exception as error:
+                if self.is_failure(error=error):
+                    self.record_failure(service_type)
+                raise
+            if self.is_failure(response=response):
+                self.record_failure(service_type)
+            else:
+                self.record_success(service_type)
+            return response
+        return wrapper
@@ -14,32 +14,594 @@
 # limitations under the License.
 
 # Standard imports
+import copy
 import uuid
+import inspect
+from functools import wraps
+from itertools import islice
+from collections import namedtuple
+from contextlib import contextmanager
 
 # Third party imports
-import openstack
+from openstack import exceptions
+
+# Local imports
+from openstack_sdk.executor import Executor, ExecutorError
+from openstack_sdk.name_cache import NameCache
+from openstack_sdk.payload import Payload
+from openstack_sdk.pool import get_connection, set_request_logger
+from openstack_sdk.status_multiplexer import StatusMultiplexer
+
+# Maximum number of ids sent in a single id filtered list request, so that
+# request url length stays within the API limits
+ID_FILTER_CHUNK_SIZE = 100
+# Number of resources requested per page when iterating over resources of
+# services which support limit/marker pagination
+DEFAULT_PAGE_SIZE = 100
+
+# Result of fetching one resource of "get_many", where either resource or
+# error is set
+GetManyResult = namedtuple('GetManyResult', ['id', 'resource', 'error'])
 
 
 class QuotaException(Exception):
     pass
 
 
+class ResourceCache(object):
+    """
+    Operation scoped cache of fetched resources keyed by (type, id), so that
+    the same remote object is fetched once per operation unless it was
+    changed in between. Caching is only active inside a scope
+    """
+
+    def __init__(self):
+        self._entries = None
+
+    @property
+    def enabled(self):
+        return self._entries is not None
+
+    @contextmanager
+    def scope(self):
+        previous_entries = self._entries
+        self._entries = {}
+        try:
+            yield
+        finally:
+            self._entries = previous_entries
+
+    def scoped(self, func):
+        """
+        Decorator which runs func inside a cache scope
+        """
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with self.scope():
+                return func(*args, **kwargs)
+        return wrapper
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        return self._entries.get(key)
+
+    def set(self, key, value):
+        if self.enabled:
+            self._entries[key] = value
+
+    def invalidate(self, *keys):
+        if self.enabled:
+            for key in keys:
+                self._entries.pop(key, None)
+
+
+resource_cache = ResourceCache()
+
+
+def cached_get(func):
+    """
+    Memoize the result of resource "get" in the operation resource cache
+    :param func: Resource "get" method
+    :return: Wrapped method which accepts "fresh" argument to bypass the
+    cache, i.e. when polling the resource status
+    """
+    @wraps(func)
+    def wrapper(self, fresh=False):
+        key = (self.resource_type, self.resource_id or self.name)
+        if not fresh:
+            resource = resource_cache.get(key)
+            if resource is not None:
+                return resource
+
+        resource = self.get_by_cached_name(func)
+        resource_cache.set(key, resource)
+        resource_id = getattr(resource, 'id', None)
+        if resource_id:
+            resource_cache.set((self.resource_type, resource_id), resource)
+        return resource
+    return wrapper
+
+
+def project_fields(resource, fields):
+    """
+    Project resource to the requested fields
+    :param resource: Openstack SDK resource or its dict representation
+    :param list fields: Names of the resource attributes to keep
+    :return dict: Resource attributes restricted to the requested fields
+    """
+    if not isinstance(resource, dict):
+        resource = resource.to_dict()
+    return dict((field, resource.get(field)) for field in fields)
+
+
+def projected(func):
+    """
+    Add optional "fields" argument to resource "list" or "get", so that only
+    the requested attributes are returned as dicts. Fields are selected by
+    the API when the service supports it, otherwise they are projected on
+    client side
+    :param func: Resource "list" or "get" method
+    :return: Wrapped method which accepts "fields" keyword argument
+    """
+    is_list = func.__name__ == 'list'
+
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        if not fields:
+            return func(self, *args, **kwargs)
+        if self.supports_fields_filter and is_list:
+            return self._list_with_fields(fields, *args, **kwargs)
+        if self.supports_fields_filter and self.resource_id:
+            return self._get_with_fields(fields)
+
+        result = func(self, *args, **kwargs)
+        if is_list:
+            return (project_fields(item, fields) for item in result)
+        return project_fields(result, fields)
+    # Python 2 "wraps" does not keep the wrapped function
+    wrapper.__wrapped__ = func
+    return wrapper
+
+
+def raise_for_failures(results):
+    """
+    Raise the errors of the failed calls of "get_many" or "delete_many"
+    :param list results: GetManyResult for every called id
+    """
+    errors = dict((index, result.error)
+                  for index, result in enumerate(results) if result.error)
+    if errors:
+        raise ExecutorError(errors)
+
+
 class OpenstackResource(object):
     service_type = None
     resource_type = None
+    # SDK resource class used to query the service API directly for the
+    # requests which are not supported by the service proxy
+    sdk_resource_class = None
+    # Whether the service supports filtering the resources list by ids
+    supports_id_filter = False
+    # Whether the service supports selecting the returned fields
+    supports_fields_filter = False
+    # Whether the service supports limit/marker pagination of lists
+    supports_pagination = False
 
     def __init__(self, client_config, resource_config=None, logger=None):
         self.client_config = client_config
-        self.connection = openstack.connect(**client_config)
+        self._connection = None
+        self._name_cache = None
+        self._status_multiplexer = None
         self.config = resource_config or {}
         self.name = self.config.get('name')
         self.resource_id =\
             None if 'id' not in self.config else self.config['id']
         self.logger = logger
 
+    @property
+    def connection(self):
+        """
+        Openstack connection is only created on first access, so building
+        resource instances does not do any authentication by itself
+        """
+        if not self._connection:
+            self._connection = \
+                get_connection(self.client_config, logger=self.logger)
+        else:
+            # Connection is shared with other resources, so its request
+            # hooks log through the resource sending the request
+            set_request_logger(self.logger)
+        return self._connection
+
+    @connection.setter
+    def connection(self, connection):
+        self._connection = connection
+
+    @property
+    def name_cache(self):
+        """
+        Host wide name to id cache, it is only available when it is enabled
+        by "name_cache" of client config
+        """
+        if not self._name_cache:
+            self._name_cache = NameCache.from_client_config(self.client_config)
+        return self._name_cache
+
+    @property
+    def status_multiplexer(self):
+        """
+        Host wide status multiplexer, it is only available when it is enabled
+        by "status_multiplexer" of client config
+        """
+        if not self._status_multiplexer:
+            self._status_multiplexer = StatusMultiplexer.from_client_config(
+                self.client_config, logger=self.logger)
+        return self._status_multiplexer
+
+    def get_fresh(self):
+        """
+        Get the current state of the resource while waiting for its status,
+        through the status multiplexer when it is enabled, so that waiting
+        operations share a single list request per resource type
+        :return: Openstack SDK resource
+        """
+        if self.resource_id and self.sdk_resource_class \
+                and self.status_multiplexer:
+            return self.status_multiplexer.get(self)
+        return self.get(fresh=True)
+
+    def stop_waiting(self):
+        """
+        Stop fetching the status of the resource through the status
+        multiplexer, once the caller is not waiting for it anymore
+        """
+        if self.resource_id and self.status_multiplexer:
+            self.status_multiplexer.unregister(self)
+
+    def payload(self, value):
+        """
+        Wrap value so that it is only rendered when the log record is emitted
+        :param value: Resource, config or any other payload to log
+        :return: Instance of Payload
+        """
+        return Payload(value, Payload.get_max_length(self.client_config))
+
+    def resolve_resource_id(self, name_or_id, finder):
+        """
+        Resolve resource name to its id through the name cache, the finder is
+        only called when the name is not already cached
+        :param str name_or_id: Resource name or id
+        :param finder: Callable which looks up the resource by name or id
+        :return str: Resource id or None if there is no such resource
+        """
+        name_cache = self.name_cache
+        if name_cache:
+            resource_id = name_cache.get(self.resource_type, name_or_id)
+            if resource_id:
+                return resource_id
+
+        resource = finder(name_or_id)
+        if not resource:
+            return None
+        if name_cache:
+            name_cache.set(self.resource_type, name_or_id, resource.id)
+        return resource.id
+
+    def get_by_cached_name(self, get):
+        """
+        Call resource "get" by the cached id of the resource name, when the
+        resource id is not known. Stale ids are dropped and the resource is
+        looked up by its name again
+        :param get: Resource "get" method
+        :return: Fetched resource
+        """
+        name_cache = self.name_cache
+        if self.resource_id or not self.name or not name_cache:
+            return get(self)
+
+        resource_id = name_cache.get(self.resource_type, self.name)
+        if resource_id:
+            self.resource_id = resource_id
+            try:
+                return get(self)
+            except exceptions.ResourceNotFound:
+                name_cache.invalidate(self.resource_type, name=self.name)
+            finally:
+                self.resource_id = None
+
+        resource = get(self)
+        if getattr(resource, 'id', None):
+            name_cache.set(self.resource_type, self.name, resource.id)
+        return resource
+
+    def invalidate_name_cache(self, resource_id=None):
+        """
+        Remove the resource from the name cache, it must be called whenever
+        the resource is created, renamed or deleted
+        :param str resource_id: Resource id, when it is not known yet
+        """
+        if self.name_cache:
+            self.name_cache.invalidate(self.resource_type,
+                                       name=self.name,
+                                       resource_id=resource_id or
+                                       self.resource_id)
+
     def __str__(self):
         return self.name if not self.resource_id else self.resource_id
 
+    def get_resource_reference(self, invalidate_name=False):
+        """
+        Get the reference the proxies use to act on the resource. Proxies
+        accept the resource id, so when it is known the resource is not
+        fetched before every action, otherwise it is looked up by name
+        :param bool invalidate_name: Whether the resource is renamed or
+        deleted, so that its name is removed from the name cache as well
+        :return: Resource id or the resource itself
+        """
+        reference = self.resource_id or self.get()
+        # Reference is only requested in order to change the resource, so
+        # its cached state is not valid anymore
+        resource_id = getattr(reference, 'id', reference)
+        self.invalidate_cache(resource_id)
+        if invalidate_name:
+            self.invalidate_name_cache(resource_id)
+        return reference
+
+    def get_many(self, ids):
+        """
+        Fetch many resources by their ids, using a single id filtered list
+        request per chunk of ids when the service supports it, otherwise
+        using concurrent requests
+        :param list ids: Resource ids
+        :return list: GetManyResult for every id, in the order of ids
+        """
+        ids = list(ids)
+        if not ids:
+            return []
+        if self.supports_id_filter:
+            return self._get_many_by_id_filter(ids)
+
+        return self._call_many(ids, lambda resource: resource.get())
+
+    def iterate(self, query=None, page_size=DEFAULT_PAGE_SIZE,
+                max_items=None):
+        """
+        Iterate over resources page by page, a page is only requested once
+        the iteration reaches it, so stopping the iteration early does not
+        fetch the remaining pages
+        :param dict query: Optional query parameters to filter resources
+        :param int page_size: Number of resources requested per page, when
+        the service supports pagination
+        :param int max_items: Optional maximum number of resources to return
+        :return: Iterator over the resources
+        """
+        query = dict(query or {})
+        if page_size and self.supports_pagination:
+            query.setdefault('limit', page_size)
+        return islice(self._list_by_query(query), max_items)
+
+    def first_match(self, predicate, query=None, page_size=DEFAULT_PAGE_SIZE):
+        """
+        Find the first resource which matches predicate without fetching the
+        pages after it
+        :param predicate: Callable which takes a resource and returns whether
+        it matches
+        :param dict query: Optional query parameters to filter resources
+        :param int page_size: Number of resources requested per page, when
+        the service supports pagination
+        :return: Matched resource or None
+        """
+        return next(
+            (resource for resource in self.iterate(query, page_size)
+             if predicate(resource)), None)
+
+    def count(self, query=None, page_size=DEFAULT_PAGE_SIZE, max_items=None):
+        """
+        Count resources without holding all of them in memory
+        :param dict query: Optional query parameters to filter resources
+        :param int page_size: Number of resources requested per page, when
+        the service supports pagination
+        :param int max_items: Optional number of resources to stop counting at
+        :return int: Number of resources
+        """
+        return sum(1 for _ in self.iterate(query, page_size, max_items))
+
+    def delete_many(self, ids):
+        """
+        Delete many resources by their ids using concurrent requests
+        :param list ids: Resource ids
+        :return list: GetManyResult for every id, in the order of ids, where
+        resource is the result of the delete request
+        """
+        ids = list(ids)
+        if not ids:
+            return []
+        return self._call_many(ids, lambda resource: resource.delete())
+
+    def list_many(self, queries):
+        """
+        List resources for many queries using concurrent requests, like
+        listing the same resources across many projects
+        :param list queries: Query parameters of every list request
+        :return list: List of resources for every query, in the order of
+        queries
+        """
+        # Unsupported query fails before any request is sent
+        if any(queries):
+            self._validate_list_query()
+
+        def _list(query):
+            return list(copy.copy(self)._list_by_query(query))
+
+        executor = Executor.from_client_config(self.client_config,
+                                               logger=self.logger)
+        return executor.map(_list, queries)
+
+    @property
+    def supports_list_query(self):
+        """
+        Check if resource "list" accepts query parameters
+        """
+        list_method = type(self).list
+        list_method = getattr(list_method, '__wrapped__', list_method)
+        return 'query' in inspect.getargspec(list_method).args
+
+    def _validate_list_query(self):
+        if not self.supports_list_query:
+            raise exceptions.InvalidResourceQuery(
+                message='Listing {0} does not support query'.format(
+                    self.resource_type))
+
+    def _list_by_query(self, query):
+        if not query:
+            return self.list()
+        self._validate_list_query()
+        return self.list(query=query)
+
+    def _call_many(self, ids, call):
+        def _call(resource_id):
+            resource = copy.copy(self)
+            resource.resource_id = resource_id
+            return call(resource)
+
+        executor = Executor.from_client_config(self.client_config)
+        results, errors = executor.run(_call, ids)
+        return [
+            GetManyResult(resource_id, results[index], errors.get(index))
+            for index, resource_id in enumerate(ids)
+        ]
+
+    def _get_many_by_id_filter(self, ids):
+        proxy = getattr(self.connection, self.service_type)
+        resource_class = self.sdk_resource_class
+        results = {}
+        for index in range(0, len(ids), ID_FILTER_CHUNK_SIZE):
+            chunk = ids[index:index + ID_FILTER_CHUNK_SIZE]
+            try:
+                response = proxy.get(resource_class.base_path,
+                                     params={'id': chunk})
+                exceptions.raise_from_response(response)
+                for item in response.json()[resource_class.resources_key]:
+                    resource = resource_class.existing(**item)
+                    resource_cache.set((self.resource_type, resource.id),
+                                       resource)
+                    results[resource.id] = \
+                        GetManyResult(resource.id, resource, None)
+            except Exception as error:
+                results.update(
+                    (resource_id, GetManyResult(resource_id, None, error))
+                    for resource_id in chunk)
+
+        return [
+            results.get(resource_id) or GetManyResult(
+                resource_id, None, exceptions.ResourceNotFound(
+                    'No {0} found for {1}'.format(self.resource_type,
+                                                  resource_id)))
+            for resource_id in ids
+        ]
+
+    def _get_server_fields(self, fields):
+        attributes = dict(
+            (attribute, server_name) for server_name, attribute
+            in self.sdk_resource_class._body_mapping().items())
+        return [attributes.get(field, field) for field in fields]
+
+    def _list_with_fields(self, fields, query=None):
+        proxy = getattr(self.connection, self.service_type)
+        resource_class = self.sdk_resource_class
+        # Query is passed to the API as is, so its filters are named the
+        # way the API expects them
+        params = dict(query or {})
+        params['fields'] = self._get_server_fields(fields)
+        links_key = '{0}_links'.format(resource_class.resources_key)
+
+        uri = resource_class.base_path
+        while uri:
+            response = proxy.get(uri, params=params)
+            exceptions.raise_from_response(response)
+            body = response.json()
+            for item in body[resource_class.resources_key]:
+                yield project_fields(resource_class.existing(**item), fields)
+            # Next page link already contains all the query parameters
+            uri = next((link['href'] for link in body.get(links_key, [])
+                        if link.get('rel') == 'next'), None)
+            params = None
+
+    def _get_with_fields(self, fields):
+        proxy = getattr(self.connection, self.service_type)
+        resource_class = self.sdk_resource_class
+        response = proxy.get(
+            '{0}/{1}'.format(resource_class.base_path, self.resource_id),
+            params={'fields': self._get_server_fields(fields)})
+        exceptions.raise_from_response(response)
+        item = response.json()[resource_class.resource_key]
+        return project_fields(resource_class.existing(**item), fields)
+
+    @staticmethod
+    def get_changes(remote_resource, new_config):
+        """
+        Compare new config against the remote resource. Empty values are
+        considered equal, since empty values are reset to None in order to
+        clear the resource attributes
+        :param remote_resource: Openstack SDK resource
+        :param dict new_config: Requested resource attributes, named either
+        as SDK attributes or as the API expects them
+        :return dict: Attributes of new config which differ from the remote
+        resource, mapped to (remote value, requested value)
+        """
+        attributes = type(remote_resource)._body_mapping()
+        changes = {}
+        for key, value in new_config.items():
+            attribute = attributes.get(key, key)
+            try:
+                remote_value = remote_resource[attribute]
+            except KeyError:
+                # Attribute is unknown to SDK, so it cannot be compared
+                changes[key] = (None, value)
+                continue
+            if (value or remote_value) and value != remote_value:
+                changes[key] = (remote_value, value)
+        return changes
+
+    def update_changes(self, new_config):
+        """
+        Update only the attributes of new config which differ from the
+        remote resource, the update is skipped when there is no difference
+        :param dict new_config: Requested resource attributes
+        :return: Updated resource or the remote resource when it is already
+        up to date
+        """
+        remote_resource = self.get()
+        changes = self.get_changes(remote_resource, new_config)
+        if not changes:
+            self.logger.info(
+                '%s %s is up to date, skipping update',
+                self.resource_type, remote_resource.id)
+            return remote_resource
+
+        self.logger.info(
+            'Updating %s %s with changes (old, new): %s',
+            self.resource_type, remote_resource.id, self.payload(changes))
+        return self.update(dict((key, new_config[key]) for key in changes))
+
+    def invalidate_cache(self, resource_id=None):
+        """
+        Remove the resource from operation resource cache and drop its
+        published status, it must be called whenever the resource is changed
+        :param str resource_id: Resource id, when it is not known yet
+        """
+        resource_cache.invalidate((self.resource_type, self.resource_id),
+                                  (self.resource_type, self.name),
+                                  (self.resource_type, resource_id))
+        # Published status of a changed resource is outdated as well
+        if self.status_multiplexer:
+            for changed_id in set([self.resource_id, resource_id]):
+                if changed_id:
+                    self.status_multiplexer.invalidate(self.resource_type,
+                                                       changed_id)
+
     def validate_resource_identifier(self):
         """
         This method will validate the resource identifier whenever the
@@ -0,0 +1,118 @@
+# #######
+# Copyright (c) 2019 Cloudify Platform Ltd. All rights reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Number of console log lines fetched per check
+DEFAULT_TAIL_LINES = 50
+# Maximum number of characters of the last console log line, which is used
+# to find where the next fetched tail continues the read console log. It is
+# also scanned again, so that markers written across two checks are matched
+ANCHOR_LENGTH = 256
+
+
+def get_anchor(output):
+    """
+    Get the last line of console log, including the empty lines after it
+    :param str output: Console log
+    :return str: Anchor of the console log
+    """
+    start = output.rstrip('\n').rfind('\n') + 1
+    return output[start:][-ANCHOR_LENGTH:]
+
+
+class ConsoleProbe(object):
+    """
+    Readiness probe which tails the console log of server incrementally and
+    reports the server as ready once any of the completion markers (i.e.
+    the cloud-init "finished" line) is written. Only the last lines of the
+    console log are fetched per check, the whole log is only fetched when
+    more lines were written since the previous check than the tail holds
+    """
+
+    def __init__(self,
+                 server,
+                 markers,
+                 tail_lines=DEFAULT_TAIL_LINES,
+                 offset=0,
+                 anchor=''):
+        self.server = server
+        self.markers = markers
+        self.tail_lines = tail_lines
+        self.offset = offset
+        self.anchor = anchor
+
+    @classmethod
+    def from_state(cls, server, markers, tail_lines, state):
+        """
+        Create console probe which continues reading where the previous
+        probe of the server stopped
+        :param server: Instance of OpenstackServer with resource id
+        :param list markers: Console log lines which mark the server ready
+        :param int tail_lines: Number of console log lines fetched per check
+        :param dict state: State of the previous probe or None
+        :return: Instance of ConsoleProbe
+        """
+        state = state or {}
+        return cls(server,
+                   markers,
+                   tail_lines=tail_lines or DEFAULT_TAIL_LINES,
+                   offset=state.get('offset', 0),
+                   anchor=state.get('anchor', ''))
+
+    @property
+    def state(self):
+        """
+        State which has to be kept between checks of different operation
+        invocations
+        :return dict: Offset and anchor of the read console log
+        """
+        return {'offset': self.offset, 'anchor': self.anchor}
+
+    def read(self):
+        """
+        Read the console log written since the previous check, including the
+        anchor of the previous check
+        :return str: Console log to scan for markers
+        """
+        output = self.server.get_console_output(length=self.tail_lines)
+        if len(output.splitlines()) >= self.tail_lines:
+            start = output.rfind(self.anchor) if self.anchor else -1
+            # Anchor repeated in the tail, i.e. a login prompt, does not
+            # tell where the previous check stopped, so the whole log is
+            # read from the offset instead
+            if start >= 0 and output.find(self.anchor) == start:
+                self.offset += len(output) - start - len(self.anchor)
+                self.anchor = get_anchor(output)
+                return output[start:]
+
+            # More was written since the previous check than the tail holds,
+            # or it is not known how much was written
+            output = self.server.get_console_output()
+
+        # Output is the whole console log, which is read again from its
+        # start when it was reset, i.e. by rebuilding the server
+        start = self.offset if self.offset <= len(output) else 0
+        self.offset = len(output)
+        text = output[max(0, start - len(self.anchor)):]
+        self.anchor = get_anchor(output)
+        return text
+
+    def check(self):
+        """
+        Check if any of the markers was written to the console log since
+        the previous check
+        :return bool: True when the server is ready
+        """
+        text = self.read()
+        return any(marker in text for marker in self.markers)
@@ -0,0 +1,158 @@
+# #######
+# Copyright (c) 2019 Cloudify Platform Ltd. All rights reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Standard imports
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# Third party imports
+from openstack import exceptions
+
+# Client config key used to configure the executor
+EXECUTOR_CONFIG = 'executor'
+# Maximum number of calls running at the same time, requests of all of them
+# still go through the rate limiter of the shared connection
+DEFAULT_MAX_WORKERS = 10
+# Maximum period (in seconds) a single call is allowed to run
+DEFAULT_CALL_TIMEOUT = 300
+
+
+class ExecutorError(exceptions.SDKException):
+    """
+    Raised once all the calls are finished and some of them failed, it holds
+    the errors of all failed calls keyed by their index
+    """
+
+    def __init__(self, errors):
+        self.errors = errors
+        super(ExecutorError, self).__init__(
+            message='{0} of the calls failed: {1}'.format(
+                len(errors),
+                '; '.join('[{0}] {1}'.format(index, error)
+                          for index, error in sorted(errors.items()))))
+
+
+class Executor(object):
+    """
+    Run many resource calls concurrently with bounded concurrency. The calls
+    share the connection of their resources, so they reuse its session pool
+    and go through its rate limiter and circuit breaker
+    """
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS,
+                 timeout=DEFAULT_CALL_TIMEOUT, logger=None):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.logger = logger
+
+    @classmethod
+    def from_client_config(cls, client_config, logger=None):
+        """
+        Create executor from "executor" of client config
+        :param dict client_config: Openstack client configuration
+        :param logger: Logger used to report failed calls
+        :return: Instance of Executor
+        """
+        config = (client_config or {}).get(EXECUTOR_CONFIG) or {}
+        return cls(max_workers=config.get('max_workers', DEFAULT_MAX_WORKERS),
+                   timeout=config.get('timeout', DEFAULT_CALL_TIMEOUT),
+                   logger=logger)
+
+    def map(self, func, items):
+        """
+        Call func for every item and wait for all the calls to finish
+        :param func: Callable which takes a single item
+        :param items: Items to call func with
+        :return list: Results of the calls, in the order of items
+        """
+        results, errors = self.run(func, items)
+        if errors:
+            raise ExecutorError(errors)
+        return results
+
+    def run(self, func, items):
+        """
+        Call func for every item and collect the results and errors of all
+        the calls, a call which runs longer than the timeout is reported as
+        failed without waiting for it
+        :param func: Callable which takes a single item
+        :param items: Items to call func with
+        :return tuple: List of results in the order of items, where failed
+        calls are None, and dict of errors keyed by the item index
+        """
+        items = list(items)
+        results = [None] * len(items)
+        errors = {}
+        if not items:
+            return results, errors
+
+        started_at = {}
+
+        def _call(index, item):
+            started_at[index] = time.time()
+            return func(item)
+
+        executor = ThreadPoolExecutor(min(self.max_workers, len(items)))
+        try:
+            futures = dict(
+                (executor.submit(_call, index, item), index)
+                for index, item in enumerate(items))
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending,
+                                     timeout=self._get_wait_timeout(
+                                         started_at, futures, pending),
+                                     return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = futures[future]
+                    try:
+                        results[index] = future.result()
+                    except Exception as error:
+                        errors[index] = error
+                for future in self._get_timed_out(started_at, futures,
+                                                  pending):
+                    pending.remove(future)
+                    errors[futures[future]] = exceptions.ResourceTimeout(
+                        'Call did not finish within {0} seconds'.format(
+                            self.timeout))
+        finally:
+            # Calls which timed out can not be interrupted, so they are left
+            # to finish in the background
+            executor.shutdown(wait=False)
+
+        if errors and self.logger:
+            for index, error in sorted(errors.items()):
+                self.logger.error(
+                    'Call for {0} failed: {1}'.format(items[index], error))
+        return results, errors
+
+    def _get_wait_timeout(self, started_at, futures, pending):
+        if not self.timeout:
+            return None
+        started = [started_at[futures[future]] for future in pending
+                   if futures[future] in started_at]
+        if not started:
+            # None of the pending calls started yet, so wait for a running
+            # call to finish and free a worker
+            return self.timeout
+        return max(0, min(started) + self.timeout - time.time())
+
+    def _get_timed_out(self, started_at, futures, pending):
+        if not self.timeout:
+            return []
+        now = time.time()
+        return [future for future in pending
+                if futures[future] in started_at and
+                now - started_at[futures[future]] >= self.timeout]
@@ -0,0 +1,47 @@
+# #######
+# Copyright (c) 2019 Cloudify Platform Ltd. All rights reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Keystoneauth service types mapped to the service names used by the plugin
+# configuration
+SERVICE_TYPES = {
+    'block-storage': 'volume',
+    'block_storage': 'volume',
+    'volumev2': 'volume',
+    'volumev3': 'volume',
+}
+
+
+def get_service_type(request_kwargs):
+    """
+    Get the service type a keystoneauth session request is sent to
+    :param dict request_kwargs: Keyword arguments of the session request
+    :return str: Service type or None for requests which do not target a
+    catalog endpoint, like authentication requests
+    """
+    endpoint_filter = request_kwargs.get('endpoint_filter') or {}
+    service_type = endpoint_filter.get('service_type')
+    return SERVICE_TYPES.get(service_type, service_type)
+
+
+def install_request_hook(connection, hook):
+    """
+    Wrap the request method of connection session, which every service
+    proxy uses to send its requests, with hook
+    :param connection: Instance of openstack.connection.Connection
+    :param hook: Callable which receives the original request method and
+    returns the wrapped one
+    """
+    session = connection.session
+    session.request = hook(session.request)
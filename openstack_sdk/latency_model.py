@@ -0,0 +1,210 @@
+# #######
+# Copyright (c) 2019 Cloudify Platform Ltd. All rights reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Standard imports
+import math
+import time
+
+# Local imports
+from openstack_sdk.shared_state import DEFAULT_STATE_PATH, SharedState
+
+# Client config key used to configure the latency model
+LATENCY_MODEL_CONFIG = 'latency_model'
+# Bounds (in seconds) of the learned retry interval
+DEFAULT_MIN_RETRY_AFTER = 5
+DEFAULT_MAX_RETRY_AFTER = 300
+# Number of the most recent completion times kept per transition and bucket
+DEFAULT_MAX_SAMPLES = 50
+# Number of completion times needed before the learned retry interval is used
+DEFAULT_MIN_SAMPLES = 3
+# Quantiles of the completion times the next retry is aimed at, the first
+# one which is not reached yet by the elapsed time is used
+QUANTILES = (0.5, 0.75, 0.9, 0.99)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transition_latencies (
+    scope TEXT NOT NULL,
+    resource_type TEXT NOT NULL,
+    transition TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    duration REAL NOT NULL,
+    recorded_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS transition_latencies_key
+    ON transition_latencies (scope, resource_type, transition, bucket);
+"""
+
+
+def get_size_bucket(size):
+    """
+    Get the bucket of resource size, sizes are grouped by the next power of
+    two so that resources of similar size share their completion times
+    :param size: Resource size, i.e. volume size in GB
+    :return int: Size bucket or None when the size is unknown or invalid
+    """
+    try:
+        size = float(size)
+    except (TypeError, ValueError):
+        return None
+    if size <= 1:
+        return 1
+    return 2 ** int(math.ceil(math.log(size, 2)))
+
+
+def get_quantile(durations, quantile):
+    """
+    Get quantile of completion times using the nearest rank method
+    :param list durations: Sorted completion times
+    :param float quantile: Quantile between 0 and 1
+    :return float: Completion time of the quantile
+    """
+    rank = int(math.ceil(quantile * len(durations)))
+    return durations[min(len(durations), max(rank, 1)) - 1]
+
+
+class LatencyModel(object):
+    """
+    Completion times of resource transitions (i.e. server stop or volume
+    delete), shared between all operation processes on the host, so that
+    operations retry close to the likely completion time instead of using
+    the same interval for small and big resources
+    """
+
+    def __init__(self,
+                 state,
+                 scope,
+                 min_retry_after=DEFAULT_MIN_RETRY_AFTER,
+                 max_retry_after=DEFAULT_MAX_RETRY_AFTER,
+                 max_samples=DEFAULT_MAX_SAMPLES,
+                 min_samples=DEFAULT_MIN_SAMPLES,
+                 logger=None):
+        self.state = state
+        self.scope = scope
+        self.min_retry_after = min_retry_after
+        self.max_retry_after = max_retry_after
+        self.max_samples = max_samples
+        self.min_samples = min_samples
+        self.logger = logger
+
+    @classmethod
+    def from_client_config(cls, client_config, logger=None):
+        """
+        Create latency model from client config if it is enabled there
+        :param dict client_config: Openstack client configuration
+        :param logger: Logger used to report the learned retry intervals
+        :return: Instance of LatencyModel or None
+        """
+        config = (client_config or {}).get(LATENCY_MODEL_CONFIG) or {}
+        if not config.get('enabled'):
+            return None
+        state = SharedState(config.get('path') or DEFAULT_STATE_PATH,
+                            schema=SCHEMA)
+        scope = '{0}:{1}:{2}'.format(
+            client_config.get('auth_url'),
+            client_config.get('region_name'),
+            client_config.get('project_id') or
+            client_config.get('project_name'))
+        return cls(state,
+                   scope,
+                   min_retry_after=config.get('min_retry_after',
+                                              DEFAULT_MIN_RETRY_AFTER),
+                   max_retry_after=config.get('max_retry_after',
+                                              DEFAULT_MAX_RETRY_AFTER),
+                   max_samples=config.get('max_samples', DEFAULT_MAX_SAMPLES),
+                   min_samples=config.get('min_samples', DEFAULT_MIN_SAMPLES),
+                   logger=logger)
+
+    def _get_key(self, resource_type, transition, bucket):
+        return (self.scope,
+                resource_type,
+                transition,
+                '' if bucket is None else str(bucket))
+
+    def record(self, resource_type, transition, bucket, duration):
+        """
+        Record completion time of resource transition, only the most recent
+        completion times are kept
+        :param str resource_type: Type of the resource, i.e. server
+        :param str transition: Name of the transition, i.e. stop
+        :param bucket: Size or flavor bucket of the resource
+        :param float duration: Completion time in seconds
+        """
+        key = self._get_key(resource_type, transition, bucket)
+        with self.state.transaction() as connection:
+            connection.execute(
+                'INSERT INTO transition_latencies '
+                '(scope, resource_type, transition, bucket, duration, '
+                'recorded_at) VALUES (?, ?, ?, ?, ?, ?)',
+                key + (duration, time.time()))
+            connection.execute(
+                'DELETE FROM transition_latencies WHERE scope = ? '
+                'AND resource_type = ? AND transition = ? AND bucket = ? '
+                'AND rowid NOT IN (SELECT rowid FROM transition_latencies '
+                'WHERE scope = ? AND resource_type = ? AND transition = ? '
+                'AND bucket = ? ORDER BY recorded_at DESC LIMIT ?)',
+                key + key + (self.max_samples,))
+
+    def get_durations(self, resource_type, transition, bucket):
+        """
+        Get recorded completion times of resource transition
+        :param str resource_type: Type of the resource, i.e. server
+        :param str transition: Name of the transition, i.e. stop
+        :param bucket: Size or flavor bucket of the resource
+        :return list: Sorted completion times in seconds
+        """
+        with self.state.read() as connection:
+            rows = connection.execute(
+                'SELECT duration FROM transition_latencies WHERE scope = ? '
+                'AND resource_type = ? AND transition = ? AND bucket = ? '
+                'ORDER BY duration',
+                self._get_key(resource_type, transition, bucket)).fetchall()
+        return [row[0] for row in rows]
+
+    def get_retry_after(self,
+                        resource_type,
+                        transition,
+                        bucket,
+                        elapsed,
+                        default=None):
+        """
+        Get period to wait before checking resource transition again, which
+        is the time left to the first recorded quantile of completion times
+        that is not reached yet
+        :param str resource_type: Type of the resource, i.e. server
+        :param str transition: Name of the transition, i.e. stop
+        :param bucket: Size or flavor bucket of the resource
+        :param float elapsed: Seconds elapsed since the transition started
+        :param default: Period used when there are not enough completion
+        times recorded, or the transition is slower than all of them
+        :return: Period in seconds
+        """
+        durations = self.get_durations(resource_type, transition, bucket)
+        if len(durations) < self.min_samples:
+            return default
+
+        for quantile in QUANTILES:
+            remaining = get_quantile(durations, quantile) - elapsed
+            if remaining > 0:
+                retry_after = int(math.ceil(min(
+                    self.max_retry_after,
+                    max(self.min_retry_after, remaining))))
+                if self.logger:
+                    self.logger.debug(
+                        'Retrying %s %s after %s seconds, p%s of %s '
+                        'completion times', resource_type, transition,
+                        retry_after, int(quantile * 100), len(durations))
+                return retry_after
+
+        return default
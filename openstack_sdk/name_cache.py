@@ -0,0 +1,106 @@
+# #######
+# Copyright (c) 2019 Cloudify Platform Ltd. All rights reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Standard imports
+import time
+
+# Local imports
+from openstack_sdk.shared_state import DEFAULT_STATE_PATH, SharedState
+
+# Client config key used to configure the name cache
+NAME_CACHE_CONFIG = 'name_cache'
+# Period (in seconds) for which resolved names are reused
+DEFAULT_NAME_CACHE_TTL = 300
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS resource_names (
+    scope TEXT NOT NULL,
+    resource_type TEXT NOT NULL,
+    name TEXT NOT NULL,
+    resource_id TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (scope, resource_type, name)
+);
+"""
+
+
+class NameCache(object):
+    """
+    Resource name to id cache per cloud, project and resource type, shared
+    between all operation processes on the host, so that a name referenced
+    by many node instances is only resolved once per TTL
+    """
+
+    def __init__(self, state, scope, ttl=DEFAULT_NAME_CACHE_TTL):
+        self.state = state
+        self.scope = scope
+        self.ttl = ttl
+
+    @classmethod
+    def from_client_config(cls, client_config):
+        """
+        Create name cache from client config if it is enabled there
+        :param dict client_config: Openstack client configuration
+        :return: Instance of NameCache or None
+        """
+        config = client_config.get(NAME_CACHE_CONFIG) or {}
+        if not config.get('enabled'):
+            return None
+        state = SharedState(config.get('path') or DEFAULT_STATE_PATH,
+                            schema=SCHEMA)
+        scope = '{0}:{1}:{2}'.format(
+            client_config.get('auth_url'),
+            client_config.get('region_name'),
+            client_config.get('project_id') or
+            client_config.get('project_name'))
+        return cls(state, scope, ttl=config.get('ttl',
+                                                DEFAULT_NAME_CACHE_TTL))
+
+    def get(self, resource_type, name):
+        """
+        Get the id of named resource
+        :param str resource_type: Openstack resource type
+        :param str name: Resource name
+        :return str: Resource id or None if it is not cached or expired
+        """
+        with self.state.read() as connection:
+            row = connection.execute(
+                'SELECT resource_id FROM resource_names WHERE scope = ? '
+                'AND resource_type = ? AND name = ? AND expires_at > ?',
+                (self.scope, resource_type, name, time.time())).fetchone()
+        return row[0] if row else None
+
+    def set(self, resource_type, name, resource_id):
+        with self.state.transaction() as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO resource_names '
+                '(scope, resource_type, name, resource_id, expires_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (self.scope, resource_type, name, resource_id,
+                 time.time() + self.ttl))
+
+    def invalidate(self, resource_type, name=None, resource_id=None):
+        """
+        Remove the entries of resource either by its name or by its id, so
+        that renamed and deleted resources are not resolved anymore
+        :param str resource_type: Openstack resource type
+        :param str name: Resource name
+        :param str resource_id: Resource id
+        """
+        with self.state.transaction() as connection:
+            connection.execute(
+                'DELETE FROM resource_names WHERE scope = ? '
+                'AND resource_type = ? AND (name = ? OR resource_id = ?)',
+                (self.scope, resource_type, name, resource_id))
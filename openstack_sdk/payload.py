@@ -0,0 +1,96 @@
+# #######
+# Copyright (c) 2019 Cloudify Platform Ltd. All rights reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Third party imports
+from openstack import resource
+
+# Client config key used to configure how payloads are logged
+LOGGING_CONFIG = 'logging'
+# Maximum number of characters of a rendered payload written to the logs
+DEFAULT_MAX_PAYLOAD_LENGTH = 2048
+# Payload keys are redacted when their name contains one of these words
+SENSITIVE_KEYS = ('password',
+                  'admin_pass',
+                  'adminpass',
+                  'user_data',
+                  'private_key',
+                  'secret',
+                  'token')
+REDACTED_VALUE = '******'
+
+
+def redact(value):
+    """
+    Replace the values of sensitive keys of value, nested dicts and lists
+    are redacted as well
+    :param value: Payload to redact
+    :return: Copy of value where sensitive values are replaced
+    """
+    if isinstance(value, dict):
+        return dict(
+            (key, REDACTED_VALUE if is_sensitive(key) and item is not None
+             else redact(item))
+            for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return type(value)(redact(item) for item in value)
+    return value
+
+
+def is_sensitive(key):
+    """
+    Check whether the value of key must not be written to the logs
+    :param key: Payload key
+    :return bool: True when the key holds sensitive data
+    """
+    key = str(key).lower()
+    return any(sensitive_key in key for sensitive_key in SENSITIVE_KEYS)
+
+
+class Payload(object):
+    """
+    Lazily rendered payload passed as a logging argument, so that resources
+    and configs are only rendered when the log record is emitted, sensitive
+    values are redacted and the rendered text is truncated
+    """
+
+    def __init__(self, value, max_length=DEFAULT_MAX_PAYLOAD_LENGTH):
+        self.value = value
+        self.max_length = max_length
+
+    @staticmethod
+    def get_max_length(client_config):
+        """
+        Get the maximum rendered payload length from "logging" of client
+        config
+        :param dict client_config: Openstack client configuration
+        :return int: Maximum number of characters, falsy for no limit
+        """
+        config = (client_config or {}).get(LOGGING_CONFIG) or {}
+        return config.get('max_payload_length', DEFAULT_MAX_PAYLOAD_LENGTH)
+
+    def render(self):
+        value = self.value
+        if isinstance(value, resource.Resource):
+            value = value.to_dict()
+        text = str(redact(value))
+        if self.max_length and len(text) > self.max_length:
+            text = '{0}... ({1} more characters)'.format(
+                text[:self.max_length], len(text) - self.max_length)
+        return text
+
+    def __str__(self):
+        return self.render()
+
+    __repr__ = __str__
@@ -0,0 +1,144 @@
+# #######
+# Copyright (c) 2019 Cloudify Platform Ltd. All rights reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Standard imports
+import random
+import threading
+import time
+
+# Client config key used to configure in process polling
+POLLING_CONFIG = 'polling'
+
+# Maximum period (in seconds) spent polling in process before the caller
+# falls back to retrying the whole operation
+DEFAULT_POLLING_BUDGET = 20
+DEFAULT_BASE_DELAY = 1
+DEFAULT_MAX_DELAY = 5
+
+
+class PollerStats(object):
+    """
+    Process wide polling counters, so that the caller can verify how many
+    operation retries were avoided by polling in process
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self.polls = 0
+        self.checks = 0
+        self.ready_in_process = 0
+        self.operation_retries = 0
+
+    def record(self, checks, ready):
+        with self._lock:
+            self.polls += 1
+            self.checks += checks
+            if ready:
+                self.ready_in_process += 1
+            else:
+                self.operation_retries += 1
+
+    def stats(self):
+        """
+        Return polling statistics, every check after the first one of a
+        poll would have been an operation retry without polling in process
+        :return dict: Polling statistics
+        """
+        with self._lock:
+            return {
+                'polls': self.polls,
+                'checks': self.checks,
+                'ready_in_process': self.ready_in_process,
+                'operation_retries': self.operation_retries,
+                'avoided_retries': self.checks - self.polls
+            }
+
+
+poller_stats = PollerStats()
+
+
+class Poller(object):
+    """
+    Poll resource status in process with exponential backoff and jitter
+    until it is ready or the polling budget is spent, so that resources
+    which become ready in a few seconds do not wait for an operation retry
+    """
+
+    def __init__(self,
+                 budget=DEFAULT_POLLING_BUDGET,
+                 base_delay=DEFAULT_BASE_DELAY,
+                 max_delay=DEFAULT_MAX_DELAY,
+                 logger=None):
+        self.budget = budget
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.logger = logger
+
+    @classmethod
+    def from_client_config(cls, client_config, logger=None):
+        """
+        Create poller from "polling" of client config
+        :param dict client_config: Openstack client configuration
+        :param logger: Logger used to report polling
+        :return: Instance of Poller
+        """
+        config = (client_config or {}).get(POLLING_CONFIG) or {}
+        return cls(budget=config.get('budget', DEFAULT_POLLING_BUDGET),
+                   base_delay=config.get('base_delay', DEFAULT_BASE_DELAY),
+                   max_delay=config.get('max_delay', DEFAULT_MAX_DELAY),
+                   logger=logger)
+
+    def get_delay(self, attempt):
+        """
+        Get delay before the next check
+        :param int attempt: Number of the finished check, starting from 1
+        :return float: Delay in seconds
+        """
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return delay / 2.0 + random.uniform(0, delay / 2.0)
+
+    def poll(self, check):
+        """
+        Call check until it reports ready or the budget is spent, a budget of
+        0 checks only once
+        :param check: Callable which returns a tuple of the checked result
+        and whether it is ready
+        :return tuple: Result of the last check and whether it is ready
+        """
+        started_at = time.time()
+        waited = 0
+        attempt = 1
+        while True:
+            result, ready = check()
+            if ready:
+                break
+            delay = self.get_delay(attempt)
+            # Both the time spent sleeping and the time spent checking count
+            # towards the budget
+            spent = max(waited, time.time() - started_at)
+            if spent + delay > self.budget:
+                break
+            time.sleep(delay)
+            waited += delay
+            attempt += 1
+
+        poller_stats.record(attempt, ready)
+        if self.logger and attempt > 1:
+            self.logger.debug(
+                'Polled %s times in process, ready: %s', attempt, ready)
+        return result, ready
@@ -0,0 +1,254 @@
+# #######
+# Copyright (c) 2019 Cloudify Platform Ltd. All rights reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Standard imports
+import json
+import time
+import logging
+import hashlib
+import threading
+
+# Third party imports
+import openstack
+
+# Local imports
+from openstack_sdk.broker import BROKER_CONFIG, BrokerClient, BrokerError
+from openstack_sdk.cache import TOKEN_CACHE_CONFIG, TokenCache
+from openstack_sdk.circuit_breaker import (CIRCUIT_BREAKER_CONFIG,
+                                           CircuitBreaker)
+from openstack_sdk.executor import EXECUTOR_CONFIG
+from openstack_sdk.hooks import install_request_hook
+from openstack_sdk.latency_model import LATENCY_MODEL_CONFIG
+from openstack_sdk.name_cache import NAME_CACHE_CONFIG
+from openstack_sdk.payload import LOGGING_CONFIG
+from openstack_sdk.poller import POLLING_CONFIG
+from openstack_sdk.rate_limit import RATE_LIMIT_CONFIG, RateLimiter
+from openstack_sdk.retry import RETRY_POLICY_CONFIG, RetryPolicy
+from openstack_sdk.status_multiplexer import STATUS_MULTIPLEXER_CONFIG
+
+# Connections which are not used for this period (in seconds) are closed
+# and removed from the pool
+DEFAULT_IDLE_TIMEOUT = 300
+
+# Client config keys which are handled by the plugin itself and must not be
+# passed to openstack.connect
+PLUGIN_CONFIG_KEYS = (TOKEN_CACHE_CONFIG,
+                      BROKER_CONFIG,
+                      RETRY_POLICY_CONFIG,
+                      RATE_LIMIT_CONFIG,
+                      CIRCUIT_BREAKER_CONFIG,
+                      NAME_CACHE_CONFIG,
+                      EXECUTOR_CONFIG,
+                      LOGGING_CONFIG,
+                      POLLING_CONFIG,
+                      STATUS_MULTIPLEXER_CONFIG,
+                      LATENCY_MODEL_CONFIG)
+
+
+logger = logging.getLogger(__name__)
+
+
+class RequestLogger(object):
+    """
+    Logger of the request hooks of pooled connections. A connection is
+    shared by all the resources which target the same cloud, so messages
+    are logged by the logger of the resource which uses the connection on
+    the current thread, rather than by the one which created it
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def set(self, resource_logger):
+        """
+        Use logger for the requests sent from the current thread
+        :param resource_logger: Logger of the resource using the connection
+        """
+        self._local.logger = resource_logger
+
+    def __getattr__(self, name):
+        return getattr(getattr(self._local, 'logger', None) or logger, name)
+
+
+class ConnectionPool(object):
+    """
+    Process wide registry for openstack connections. Connections are keyed by
+    the canonicalized client config, so every resource that targets the
+    same cloud with the same credentials shares one authenticated connection
+    (and its HTTP session pool) instead of doing a new handshake per resource
+    """
+
+    def __init__(self, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        self.idle_timeout = idle_timeout
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._lock = threading.RLock()
+        self.request_logger = RequestLogger()
+
+    @staticmethod
+    def generate_key(client_config):
+        """
+        Generate a stable key for client config, so that two configs which
+        only differ by keys order resolve to the same connection
+        :param dict client_config: Openstack client configuration
+        :return str: Hash of the canonicalized client config
+        """
+        canonical_config = \
+            json.dumps(client_config or {}, sort_keys=True, default=str)
+        return hashlib.sha256(canonical_config.encode('utf-8')).hexdigest()
+
+    def get(self, client_config, logger=None):
+        """
+        Lookup a connection for client config from the pool or create a new
+        one if there is no one already cached
+        :param dict client_config: Openstack client configuration
+        :param logger: Logger used by the connection request hooks for the
+        requests sent from the current thread
+        :return: Instance of openstack.connection.Connection
+        """
+        self.request_logger.set(logger)
+        key = self.generate_key(client_config)
+        with self._lock:
+            self.evict_idle()
+            entry = self._entries.get(key)
+            if entry:
+                self.hits += 1
+            else:
+                self.misses += 1
+                entry = {'connection': self._connect(client_config)}
+                # Resources keep using the connection without getting it
+                # from the pool again, i.e. while polling a status, so every
+                # request marks it as used
+                install_request_hook(entry['connection'],
+                                     self._track_usage(entry))
+                self._entries[key] = entry
+
+            entry['last_used'] = time.time()
+            return entry['connection']
+
+    @staticmethod
+    def _track_usage(entry):
+        def hook(request):
+            def wrapper(url, method, **kwargs):
+                entry['last_used'] = time.time()
+                try:
+                    return request(url, method, **kwargs)
+                finally:
+                    entry['last_used'] = time.time()
+            return wrapper
+        return hook
+
+    def evict_idle(self):
+        """
+        Close and remove all connections that have not been used, neither
+        got from the pool nor used to send a request, for more than the idle
+        timeout
+        """
+        now = time.time()
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if now - entry['last_used'] > self.idle_timeout:
+                    self._close(self._entries.pop(key)['connection'])
+
+    def clear(self):
+        """
+        Close all the connections and reset the pool counters
+        """
+        with self._lock:
+            for entry in self._entries.values():
+                self._close(entry['connection'])
+            self._entries = {}
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        Return the pool counters, so that the caller can verify how many
+        connections were created compared to how many were reused
+        :return dict: Pool statistics
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._entries)
+            }
+
+    def _connect(self, client_config):
+        connection_config = dict(
+            (key, value) for key, value in client_config.items()
+            if key not in PLUGIN_CONFIG_KEYS)
+        connection = openstack.connect(**connection_config)
+        rate_limiter = RateLimiter.from_client_config(client_config,
+                                                      self.request_logger)
+        if rate_limiter:
+            install_request_hook(connection, rate_limiter)
+        # Every retried attempt goes through the rate limiter, while the
+        # circuit breaker only records the outcome of the last attempt
+        install_request_hook(
+            connection,
+            RetryPolicy.from_client_config(client_config,
+                                           self.request_logger))
+        # Installed last, so that an open breaker fails before throttling
+        circuit_breaker = CircuitBreaker.from_client_config(
+            client_config, self.request_logger)
+        if circuit_breaker:
+            install_request_hook(connection, circuit_breaker)
+
+        broker_client = BrokerClient.from_client_config(client_config)
+        if broker_client:
+            try:
+                broker_client.authorize(connection, client_config)
+                return connection
+            except BrokerError:
+                # Broker is optional, so fallback to authenticate directly
+                pass
+
+        token_cache = TokenCache.from_client_config(client_config)
+        if token_cache:
+            token_cache.authorize(connection)
+        return connection
+
+    def _close(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            # Closing a connection should never fail the caller, at worst
+            # the underlying resources are released by garbage collector
+            pass
+
+
+connection_pool = ConnectionPool()
+
+
+def get_connection(client_config, logger=None):
+    """
+    Get a shared openstack connection for client config
+    :param dict client_config: Openstack client configuration
+    :param logger: Logger used by the connection request hooks for the
+    requests sent from the current thread
+    :return: Instance of openstack.connection.Connection
+    """
+    return connection_pool.get(client_config, logger=logger)
+
+
+def set_request_logger(resource_logger):
+    """
+    Use logger for the requests of shared connections sent from the current
+    thread
+    :param resource_logger: Logger of the resource using the connection
+    """
+    connection_pool.request_logger.set(resource_logger)
@@ -0,0 +1,129 @@
+# #######
+# Copyright (c) 2019 Cloudify Platform Ltd. All rights reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Standard imports
+import time
+
+# Local imports
+from openstack_sdk.hooks import get_service_type
+from openstack_sdk.shared_state import DEFAULT_STATE_PATH, SharedState
+
+# Client config key used to configure the rate limiter
+RATE_LIMIT_CONFIG = 'rate_limit'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+    bucket TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+class RateLimiter(object):
+    """
+    Token bucket rate limiter per openstack service type. Buckets are kept
+    in shared state, so all operation processes targeting the same cloud
+    respect one global rate. Every request reserves a token, and when the
+    bucket is empty the caller waits until its reserved token is refilled
+    """
+
+    def __init__(self, state, scope, services, logger=None):
+        """
+        :param state: Instance of SharedState
+        :param str scope: Cloud identifier, so that buckets of different
+        clouds do not affect each other
+        :param dict services: Mapping of service type to its "rate" (requests
+        per second) and "burst" (bucket size)
+        :param logger: Logger used to report throttling
+        """
+        self.state = state
+        self.scope = scope
+        self.services = services
+        self.logger = logger
+        self.throttled_time = {}
+
+    @classmethod
+    def from_client_config(cls, client_config, logger=None):
+        """
+        Create rate limiter from client config if it is configured there
+        :param dict client_config: Openstack client configuration
+        :param logger: Logger used to report throttling
+        :return: Instance of RateLimiter or None
+        """
+        config = client_config.get(RATE_LIMIT_CONFIG) or {}
+        services = config.get('services')
+        if not services:
+            return None
+        state = SharedState(config.get('path') or DEFAULT_STATE_PATH,
+                            schema=SCHEMA)
+        scope = '{0}:{1}'.format(client_config.get('auth_url'),
+                                 client_config.get('region_name'))
+        return cls(state, scope, services, logger=logger)
+
+    def reserve(self, service_type):
+        """
+        Reserve a token from service bucket
+        :param str service_type: Openstack service type
+        :return float: Period (in seconds) the caller has to wait before its
+        token is available
+        """
+        config = self.services.get(service_type)
+        if not config:
+            return 0
+        rate = float(config['rate'])
+        burst = float(config.get('burst') or rate)
+        bucket = '{0}:{1}'.format(self.scope, service_type)
+
+        with self.state.transaction() as connection:
+            now = time.time()
+            row = connection.execute(
+                'SELECT tokens, updated_at FROM rate_limit_buckets '
+                'WHERE bucket = ?', (bucket,)).fetchone()
+            tokens = burst
+            if row:
+                tokens = min(burst, row[0] + (now - row[1]) * rate)
+            tokens -= 1
+            connection.execute(
+                'INSERT OR REPLACE INTO rate_limit_buckets '
+                '(bucket, tokens, updated_at) VALUES (?, ?, ?)',
+                (bucket, tokens, now))
+        return max(0, -tokens / rate)
+
+    def acquire(self, service_type):
+        """
+        Wait until a request to service is allowed
+        :param str service_type: Openstack service type
+        :return float: Period (in seconds) the caller was throttled
+        """
+        wait = self.reserve(service_type)
+        if wait > 0:
+            self.throttled_time[service_type] = \
+                self.throttled_time.get(service_type, 0) + wait
+            if self.logger:
+                self.logger.info(
+                    'Throttling {0} request for {1:.2f} seconds, total '
+                    'throttled time is {2:.2f} seconds'.format(
+                        service_type,
+                        wait,
+                        self.throttled_time[service_type]))
+            time.sleep(wait)
+        return wait
+
+    def __call__(self, request):
+        def wrapper(url, method, **kwargs):
+            self.acquire(get_service_type(kwargs))
+            return request(url, method, **kwargs)
+        return wrapper
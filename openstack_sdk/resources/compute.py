@@ -16,81 +16,93 @@
 # Based on this documentation:
 # https://docs.openstack.org/openstacksdk/latest/user/proxies/compute.html.
 
+# Third party imports
+from openstack.compute.v2.server import Server
+
 # Local imports
-from openstack_sdk.common import OpenstackResource
+from openstack_sdk.common import OpenstackResource, cached_get, projected
 
 
 class OpenstackServer(OpenstackResource):
     service_type = 'compute'
     resource_type = 'server'
+    supports_pagination = True
+    sdk_resource_class = Server
 
+    @projected
     def list(self, details=True, all_projects=False, query=None):
         query = query or {}
         self.logger.debug('Attempting to list servers')
         return self.connection.compute.servers(details, all_projects, **query)
 
+    @projected
+    @cached_get
     def get(self):
         self.logger.debug(
-            'Attempting to find this server: {0}'.format(
-                self.name if not self.resource_id else self.resource_id))
+            'Attempting to find this server: %s',
+            self.name if not self.resource_id else self.resource_id)
         server = self.connection.compute.get_server(
             self.name if not self.resource_id else self.resource_id
         )
         self.logger.debug(
-            'Found server with this result: {0}'.format(server))
+            'Found server with this result: %s', self.payload(server))
         return server
 
     def create(self):
+        self.invalidate_name_cache()
         self.logger.debug(
-            'Attempting to create server with these args: {0}'.format(
-                self.config))
+            'Attempting to create server with these args: %s',
+            self.payload(self.config))
         server = self.connection.compute.create_server(**self.config)
         self.logger.info(
-            'Created server with this result: {0}'.format(server))
+            'Created server with this result: %s', self.payload(server))
         return server
 
     def delete(self):
-        server = self.get()
+        server = self.get_resource_reference(invalidate_name=True)
         self.logger.debug(
-            'Attempting to delete this server: {0}'.format(server))
+            'Attempting to delete this server: %s', self.payload(server))
         result = self.connection.compute.delete_server(server)
         self.logger.debug(
-            'Deleted server with this result: {0}'.format(result))
+            'Deleted server with this result: %s', self.payload(result))
         return result
 
     def reboot(self, reboot_type):
-        server = self.get()
+        server = self.get_resource_reference()
         self.logger.debug(
-            'Attempting to reboot this server: {0}'.format(server))
+            'Attempting to reboot this server: %s', self.payload(server))
         self.connection.compute.reboot_server(server, reboot_type)
 
     def resume(self):
-        server = self.get()
+        server = self.get_resource_reference()
         self.logger.debug(
-            'Attempting to resume this server: {0}'.format(server))
+            'Attempting to resume this server: %s', self.payload(server))
         self.connection.compute.resume_server(server)
 
     def suspend(self):
-        server = self.get()
+        server = self.get_resource_reference()
         self.logger.debug(
-            'Attempting to suspend this server: {0}'.format(server))
+            'Attempting to suspend this server: %s', self.payload(server))
         self.connection.compute.suspend_server(server)
 
     def backup(self, name, backup_type, rotation):
-        server = self.get()
+        server = self.get_resource_reference()
         self.logger.debug(
-            'Attempting to backup this server: {0}'.format(server))
+            'Attempting to backup this server: %s', self.payload(server))
         self.connection.compute.backup_server(server,
                                               name,
                                               backup_type,
                                               rotation)
 
     def rebuild(self, image, name=None, admin_password='', **attr):
-        server = self.get()
+        # Server name is only needed when it is not supplied
+        server = self.get() if not name else \
+            self.get_resource_reference(invalidate_name=True)
         name = name or server.name
+        self.invalidate_cache()
         attr['image'] = image
         self.logger.debug(
-            'Attempting to rebuild this server: {0}'.format(server))
+            'Attempting to rebuild this server: %s', self.payload(server))
 
         self.connection.compute.rebuild_server(server,
                                                name,
@@ -98,40 +110,53 @@ class OpenstackServer(OpenstackResource):
                                                **attr)
 
     def create_image(self, name, metadata=None):
-        server = self.get()
+        server = self.get_resource_reference()
         self.logger.debug(
-            'Attempting to create image for this server: {0}'.format(server))
+            'Attempting to create image for this server: %s',
+            self.payload(server))
         self.connection.compute.create_server_image(
             server, name, metadata=metadata
         )
 
+    def get_console_output(self, length=None):
+        # Reading the console does not change the server, so its cached
+        # state is kept
+        server = self.resource_id or self.get()
+        self.logger.debug(
+            'Attempting to get console output of this server: %s',
+            self.resource_id or self.name)
+        result = self.connection.compute.get_server_console_output(
+            server, length=length)
+        return (result or {}).get('output') or ''
+
     def update(self, new_config=None):
-        server = self.get()
+        server = self.get_resource_reference(
+            invalidate_name='name' in (new_config or {}))
         self.logger.debug(
-            'Attempting to update this server: {0} with args {1}'.format(
-                server, new_config))
+            'Attempting to update this server: %s with args %s',
+            self.payload(server), self.payload(new_config))
         result = self.connection.compute.update_server(server, **new_config)
         self.logger.debug(
-            'Updated server with this result: {0}'.format(result))
+            'Updated server with this result: %s', self.payload(result))
         return result
 
     def start(self):
-        server = self.get()
+        server = self.get_resource_reference()
         self.logger.debug(
-            'Attempting to start this server: {0}'.format(server))
+            'Attempting to start this server: %s', self.payload(server))
         self.connection.compute.start_server(server)
 
     def stop(self):
-        server = self.get()
+        server = self.get_resource_reference()
         self.logger.debug(
-            'Attempting to stop this server: {0}'.format(server))
+            'Attempting to stop this server: %s', self.payload(server))
         self.connection.compute.stop_server(server)
 
     def get_server_password(self):
-        server = self.get()
+        server = self.get_resource_reference()
         self.logger.debug(
             'Attempting to get server'
-            ' password for this server: {0}'.format(server))
+            ' password for this server: %s', self.payload(server))
         return self.connection.compute.get_server_password(server)
 
     def list_volume_attachments(self, query=None):
@@ -141,69 +166,69 @@ class OpenstackServer(OpenstackResource):
 
     def get_volume_attachment(self, attachment_id):
         self.logger.debug(
-            'Attempting to find this volume attachment: {0}'
-            ''.format(attachment_id))
+            'Attempting to find this volume attachment: %s', attachment_id)
         volume_attachment = \
             self.connection.compute.get_volume_attachment(
                 attachment_id, self.resource_id)
         self.logger.debug(
-            'Found volume attachment with this result: {0}'
-            ''.format(volume_attachment))
+            'Found volume attachment with this result: %s',
+            self.payload(volume_attachment))
         return volume_attachment
 
     def create_volume_attachment(self, attachment_config):
+        self.invalidate_cache()
         self.logger.debug(
             'Attempting to create volume attachment'
-            ' with these args: {0}'.format(self.config))
+            ' with these args: %s', self.payload(self.config))
         volume_attachment = \
             self.connection.compute.create_volume_attachment(
                 self.resource_id, **attachment_config)
         self.logger.debug(
-            'Created volume attachment with this result: {0}'
-            ''.format(volume_attachment))
+            'Created volume attachment with this result: %s',
+            self.payload(volume_attachment))
         return volume_attachment
 
     def delete_volume_attachment(self, attachment_id):
+        self.invalidate_cache()
         self.logger.debug(
-            'Attempting to delete this volume attachment: {0}'
-            ''.format(attachment_id))
+            'Attempting to delete this volume attachment: %s', attachment_id)
         self.connection.compute.delete_volume_attachment(attachment_id,
                                                          self.resource_id)
         self.logger.debug(
-            'Volume attachment {0} was deleted successfully'
-            ''.format(attachment_id))
+            'Volume attachment %s was deleted successfully', attachment_id)
 
     def create_server_interface(self, interface_config):
+        self.invalidate_cache()
         self.logger.debug(
             'Attempting to create server interface with these args:'
-            '{0}'.format(interface_config))
+            '%s', self.payload(interface_config))
         result = \
             self.connection.compute.create_server_interface(
                 self.resource_id, **interface_config)
         self.logger.debug(
-            'Created server interface with this result: {0}'.format(result))
+            'Created server interface with this result: %s',
+            self.payload(result))
         return result
 
     def delete_server_interface(self, interface_id):
+        self.invalidate_cache()
         self.logger.debug(
             'Attempting to delete server interface with these args:'
-            '{0}'.format(interface_id))
+            '%s', interface_id)
         self.connection.compute.delete_server_interface(
             interface_id, server=self.resource_id)
         self.logger.debug(
-            'Server interface {0} was deleted successfully'
-            ''.format(interface_id))
+            'Server interface %s was deleted successfully', interface_id)
 
     def get_server_interface(self, interface_id):
         self.logger.debug(
-            'Attempting to find this server interface: {0}'
-            ''.format(interface_id))
+            'Attempting to find this server interface: %s', interface_id)
         server_interface = \
             self.connection.compute.get_server_interface(
                 interface_id, self.resource_id)
         self.logger.debug(
-            'Found server interface with this result: {0}'
-            ''.format(server_interface))
+            'Found server interface with this result: %s',
+            self.payload(server_interface))
         return server_interface
 
     def server_interfaces(self):
@@ -211,124 +236,135 @@ class OpenstackServer(OpenstackResource):
         return self.connection.compute.server_interfaces(self.resource_id)
 
     def add_security_group_to_server(self, security_group_id):
+        self.invalidate_cache()
         self.logger.debug(
-            'Attempting to add security group {0} to server {1}'
-            ''.format(security_group_id, self.resource_id))
+            'Attempting to add security group %s to server %s',
+            security_group_id, self.resource_id)
         self.connection.compute.add_security_group_to_server(
             self.resource_id, security_group_id)
         self.logger.debug(
-            'Security group {0} was added to server {1} '
-            'successfully'.format(security_group_id, self.resource_id))
+            'Security group %s was added to server %s '
+            'successfully', security_group_id, self.resource_id)
 
     def remove_security_group_from_server(self, security_group_id):
+        self.invalidate_cache()
         self.logger.debug(
-            'Attempting to remove security group {0} from server {1}'
-            ''.format(security_group_id, self.resource_id))
+            'Attempting to remove security group %s from server %s',
+            security_group_id, self.resource_id)
         self.connection.compute.remove_security_group_from_server(
             self.resource_id, security_group_id)
         self.logger.debug(
-            'Security group {0} was removed from server {1} '
-            'successfully'.format(security_group_id, self.resource_id))
+            'Security group %s was removed from server %s '
+            'successfully', security_group_id, self.resource_id)
 
     def add_floating_ip_to_server(self, floating_ip, fixed_ip=None):
+        self.invalidate_cache()
         self.logger.debug(
-            'Attempting to add floating ip {0} to server {1}'
-            ''.format(floating_ip, self.resource_id))
+            'Attempting to add floating ip %s to server %s',
+            self.payload(floating_ip), self.resource_id)
         self.connection.compute.add_floating_ip_to_server(
             self.resource_id, floating_ip, fixed_address=fixed_ip)
         self.logger.debug(
-            'Floating ip {0} was added to server {1} successfully'
-            ''.format(floating_ip, self.resource_id))
+            'Floating ip %s was added to server %s successfully',
+            self.payload(floating_ip), self.resource_id)
 
     def remove_floating_ip_from_server(self, floating_ip):
+        self.invalidate_cache()
         self.logger.debug(
-            'Attempting to remove floating ip {0} from server {1}'
-            ''.format(floating_ip, self.resource_id))
+            'Attempting to remove floating ip %s from server %s',
+            self.payload(floating_ip), self.resource_id)
         self.connection.compute.remove_floating_ip_from_server(
             self.resource_id, floating_ip)
         self.logger.debug(
-            'Floating ip {0} was removed from server {1} '
-            'successfully'.format(floating_ip, self.resource_id))
+            'Floating ip %s was removed from server %s '
+            'successfully', self.payload(floating_ip), self.resource_id)
 
 
 class OpenstackHostAggregate(OpenstackResource):
     service_type = 'compute'
     resource_type = 'aggregate'
 
+    @projected
     def list(self):
         self.logger.debug('Attempting to list aggregates')
         return self.connection.compute.aggregates()
 
+    @projected
+    @cached_get
     def get(self):
         self.logger.debug(
-            'Attempting to find this aggregate: {0}'.format(
-                self.name if not self.resource_id else self.resource_id))
+            'Attempting to find this aggregate: %s',
+            self.name if not self.resource_id else self.resource_id)
         aggregate = self.connection.compute.get_aggregate(
             self.name if not self.resource_id else self.resource_id
         )
         self.logger.debug(
-            'Found aggregate with this result: {0}'.format(aggregate))
+            'Found aggregate with this result: %s', self.payload(aggregate))
         return aggregate
 
     def create(self):
+        self.invalidate_name_cache()
         self.logger.debug(
-            'Attempting to create aggregate with these args: {0}'.format(
-                self.config))
+            'Attempting to create aggregate with these args: %s',
+            self.payload(self.config))
         aggregate = self.connection.compute.create_aggregate(**self.config)
         self.logger.debug(
-            'Created aggregate with this result: {0}'.format(aggregate))
+            'Created aggregate with this result: %s', self.payload(aggregate))
         return aggregate
 
     def update(self, new_config=None):
-        aggregate = self.get()
+        aggregate = self.get_resource_reference(
+            invalidate_name='name' in (new_config or {}))
         self.logger.debug(
-            'Attempting to update this aggregate: {0} with args {1}'.format(
-                aggregate, new_config))
+            'Attempting to update this aggregate: %s with args %s',
+            self.payload(aggregate), self.payload(new_config))
         result =\
             self.connection.compute.update_aggregate(aggregate, **new_config)
         self.logger.debug(
-            'Updated aggregate with this result: {0}'.format(result))
+            'Updated aggregate with this result: %s', self.payload(result))
         return result
 
     def delete(self):
-        aggregate = self.get()
+        aggregate = self.get_resource_reference(invalidate_name=True)
         self.logger.debug(
-            'Attempting to delete this aggregate: {0}'.format(aggregate))
+            'Attempting to delete this aggregate: %s', self.payload(aggregate))
         result = self.connection.compute.delete_aggregate(aggregate)
         self.logger.debug(
-            'Deleted aggregate with this result: {0}'.format(result))
+            'Deleted aggregate with this result: %s', self.payload(result))
         return result
 
     def set_metadata(self, metadata):
-        aggregate = self.get()
+        aggregate = self.get_resource_reference()
         self.logger.debug(
-            'Attempting to set metadata to this aggregate: {0}'
-            ''.format(aggregate))
+            'Attempting to set metadata to this aggregate: %s',
+            self.payload(aggregate))
         result = \
             self.connection.compute.set_aggregate_metadata(aggregate, metadata)
         self.logger.debug(
-            'Set metadata to aggregate with this result: {0}'.format(
-                result))
+            'Set metadata to aggregate with this result: %s',
+            self.payload(result))
         return result
 
     def add_host(self, host):
-        aggregate = self.get()
+        aggregate = self.get_resource_reference()
         self.logger.debug(
-            'Attempting to add host to this aggregate: {0}'
-            ''.format(aggregate))
+            'Attempting to add host to this aggregate: %s',
+            self.payload(aggregate))
         result = self.connection.compute.add_host_to_aggregate(aggregate, host)
         self.logger.debug(
-            'Added host to aggregate with this result: {0}'.format(result))
+            'Added host to aggregate with this result: %s',
+            self.payload(result))
         return result
 
     def remove_host(self, host):
-        aggregate = self.get()
+        aggregate = self.get_resource_reference()
         self.logger.debug(
-            'Attempting to delete this aggregate: {0}'.format(aggregate))
+            'Attempting to delete this aggregate: %s', self.payload(aggregate))
         result = \
             self.connection.compute.remove_host_from_aggregate(aggregate, host)
         self.logger.debug(
-            'Deleted host to aggregate with this result: {0}'.format(result))
+            'Deleted host to aggregate with this result: %s',
+            self.payload(result))
         return result
 
 
@@ -336,38 +372,45 @@ class OpenstackServerGroup(OpenstackResource):
     service_type = 'compute'
     resource_type = 'server_group'
 
+    @projected
     def list(self, query=None):
         query = query or {}
         return self.connection.compute.server_groups(**query)
 
+    @projected
+    @cached_get
     def get(self):
         self.logger.debug(
-            'Attempting to find this server group: {0}'.format(
-                self.name if not self.resource_id else self.resource_id))
+            'Attempting to find this server group: %s',
+            self.name if not self.resource_id else self.resource_id)
         server_group = self.connection.compute.get_server_group(
             self.name if not self.resource_id else self.resource_id
         )
         self.logger.debug(
-            'Found server group with this result: {0}'.format(server_group))
+            'Found server group with this result: %s',
+            self.payload(server_group))
         return server_group
 
     def create(self):
+        self.invalidate_name_cache()
         self.logger.debug(
-            'Attempting to create server group with these args: {0}'.format(
-                self.config))
+            'Attempting to create server group with these args: %s',
+            self.payload(self.config))
         server_group =\
             self.connection.compute.create_server_group(**self.config)
         self.logger.debug(
-            'Created server group with this result: {0}'.format(server_group))
+            'Created server group with this result: %s',
+            self.payload(server_group))
         return server_group
 
     def delete(self):
-        server_group = self.get()
+        server_group = self.get_resource_reference(invalidate_name=True)
         self.logger.debug(
-            'Attempting to delete this server group: {0}'.format(server_group))
+            'Attempting to delete this server group: %s',
+            self.payload(server_group))
         result = self.connection.compute.delete_server_group(server_group)
         self.logger.debug(
-            'Deleted server group with this result: {0}'.format(result))
+            'Deleted server group with this result: %s', self.payload(result))
         return result
 
 
@@ -378,70 +421,79 @@ class OpenstackKeyPair(OpenstackResource):
     def validate_resource_identifier(self):
         return None
 
+    @projected
     def list(self):
         return self.connection.compute.keypairs()
 
+    @projected
+    @cached_get
     def get(self):
         name = self.name if not self.resource_id else self.resource_id
         self.logger.debug(
-            'Attempting to find this key pair: {0}'.format(name))
+            'Attempting to find this key pair: %s', name)
         key_pair = self.connection.compute.get_keypair(name)
         self.logger.debug(
-            'Found key pair with this result: {0}'.format(key_pair))
+            'Found key pair with this result: %s', self.payload(key_pair))
         return key_pair
 
     def create(self):
+        self.invalidate_name_cache()
         self.logger.debug(
-            'Attempting to create key pair with these args: {0}'.format(
-                self.config))
+            'Attempting to create key pair with these args: %s',
+            self.payload(self.config))
         key_pair = self.connection.compute.create_keypair(**self.config)
         self.logger.debug(
-            'Created key pair with this result: {0}'.format(key_pair))
+            'Created key pair with this result: %s', self.payload(key_pair))
         return key_pair
 
     def delete(self):
-        key_pair = self.get()
+        key_pair = self.get_resource_reference(invalidate_name=True)
         self.logger.debug(
-            'Attempting to delete this key pair: {0}'.format(key_pair))
+            'Attempting to delete this key pair: %s', self.payload(key_pair))
         result = self.connection.compute.delete_keypair(key_pair)
         self.logger.debug(
-            'Deleted key pair with this result: {0}'.format(result))
+            'Deleted key pair with this result: %s', self.payload(result))
         return result
 
 
 class OpenstackFlavor(OpenstackResource):
     service_type = 'compute'
     resource_type = 'flavor'
+    supports_pagination = True
 
+    @projected
     def list(self, details=True, query=None):
         query = query or {}
         return self.connection.compute.flavors(details, **query)
 
+    @projected
+    @cached_get
     def get(self):
         self.logger.debug(
-            'Attempting to find this flavor: {0}'.format(
-                self.name if not self.resource_id else self.resource_id))
+            'Attempting to find this flavor: %s',
+            self.name if not self.resource_id else self.resource_id)
         flavor = self.connection.compute.get_flavor(
             self.name if not self.resource_id else self.resource_id
         )
         self.logger.debug(
-            'Found flavor with this result: {0}'.format(flavor))
+            'Found flavor with this result: %s', self.payload(flavor))
         return flavor
 
     def create(self):
+        self.invalidate_name_cache()
         self.logger.debug(
-            'Attempting to create flavor with these args: {0}'.format(
-                self.config))
+            'Attempting to create flavor with these args: %s',
+            self.payload(self.config))
         flavor = self.connection.compute.create_flavor(**self.config)
         self.logger.debug(
-            'Created flavor image with this result: {0}'.format(flavor))
+            'Created flavor image with this result: %s', self.payload(flavor))
         return flavor
 
     def delete(self):
-        flavor = self.get()
+        flavor = self.get_resource_reference(invalidate_name=True)
         self.logger.debug(
-            'Attempting to delete this flavor: {0}'.format(flavor))
+            'Attempting to delete this flavor: %s', self.payload(flavor))
         result = self.connection.compute.delete_flavor(flavor)
         self.logger.debug(
-            'Deleted flavor with this result: {0}'.format(result))
+            'Deleted flavor with this result: %s', self.payload(result))
         return result
@@ -17,57 +17,71 @@
 # https://docs.openstack.org/openstacksdk/latest/user/proxies/compute.html.
 
 # Local imports
-from openstack_sdk.common import OpenstackResource
+from openstack_sdk.common import OpenstackResource, cached_get, projected
 
 
 class OpenstackUser(OpenstackResource):
     service_type = 'identity'
     resource_type = 'user'
 
+    @projected
     def list(self, query=None):
         query = query or {}
         return self.connection.identity.users(**query)
 
+    @projected
+    @cached_get
     def get(self):
         self.logger.debug(
-            'Attempting to find this user: {0}'.format(
-                self.name if not self.resource_id else self.resource_id))
+            'Attempting to find this user: %s',
+            self.name if not self.resource_id else self.resource_id)
         user = self.connection.identity.get_user(
             self.name if not self.resource_id else self.resource_id
         )
-        self.logger.debug('Found user with this result: {0}'.format(user))
+        self.logger.debug('Found user with this result: %s',
+                          self.payload(user))
         return user
 
     def find_user(self, name_or_id):
         self.logger.debug(
-            'Attempting to find this user: {0}'.format(
-                self.name if not self.resource_id else self.resource_id))
+            'Attempting to find this user: %s',
+            self.name if not self.resource_id else self.resource_id)
         user = self.connection.identity.find_user(name_or_id)
-        self.logger.debug('Found user with this result: {0}'.format(user))
+        self.logger.debug('Found user with this result: %s',
+                          self.payload(user))
         return user
 
+    def find_user_id(self, name_or_id):
+        return self.resolve_resource_id(name_or_id, self.find_user)
+
     def create(self):
+        self.invalidate_name_cache()
         self.logger.debug(
-            'Attempting to create user with these args: {0}'.format(
-                self.config))
+            'Attempting to create user with these args: %s',
+            self.payload(self.config))
         user = self.connection.identity.create_user(**self.config)
-        self.logger.debug('Created user with this result: {0}'.format(user))
+        self.logger.debug('Created user with this result: %s',
+                          self.payload(user))
         return user
 
     def delete(self):
-        user = self.get()
-        self.logger.debug('Attempting to delete this user: {0}'.format(user))
+        user = self.get_resource_reference(invalidate_name=True)
+        self.logger.debug('Attempting to delete this user: %s',
+                          self.payload(user))
         result = self.connection.identity.delete_user(user)
-        self.logger.debug('Deleted user with this result: {0}'.format(result))
+        self.logger.debug('Deleted user with this result: %s',
+                          self.payload(result))
         return result
 
     def update(self, new_config=None):
-        user = self.get()
+        user = self.get_resource_reference(
+            invalidate_name='name' in (new_config or {}))
         self.logger.debug(
-            'Attempting to update this user: {0} with args {1}'.format(
-                user, new_config))
+            'Attempting to update this user: %s with args %s',
+            self.payload(user), self.payload(new_config))
         result = self.connection.identity.update_user(user, **new_config)
-        self.logger.debug('Updated user with this result: {0}'.format(result))
+        self.logger.debug('Updated user with this result: %s',
+                          self.payload(result))
         return result
 
 
@@ -75,28 +89,36 @@ class OpenstackRole(OpenstackResource):
     service_type = 'identity'
     resource_type = 'role'
 
+    @projected
     def list(self, query=None):
         query = query or {}
         return self.connection.identity.roles(**query)
 
+    @projected
+    @cached_get
     def get(self):
         self.logger.debug(
-            'Attempting to find this role: {0}'.format(
-                self.name if not self.resource_id else self.resource_id))
+            'Attempting to find this role: %s',
+            self.name if not self.resource_id else self.resource_id)
         role = self.connection.identity.get_role(
             self.name if not self.resource_id else self.resource_id
         )
-        self.logger.debug('Found role with this result: {0}'.format(role))
+        self.logger.debug('Found role with this result: %s',
+                          self.payload(role))
         return role
 
     def find_role(self, name_or_id):
         self.logger.debug(
-            'Attempting to find this role: {0}'.format(
-                self.name if not self.resource_id else self.resource_id))
+            'Attempting to find this role: %s',
+            self.name if not self.resource_id else self.resource_id)
         role = self.connection.identity.find_role(name_or_id)
-        self.logger.debug('Found role with this result: {0}'.format(role))
+        self.logger.debug('Found role with this result: %s',
+                          self.payload(role))
         return role
 
+    def find_role_id(self, name_or_id):
+        return self.resolve_resource_id(name_or_id, self.find_role)
+
     def assign_project_role_to_user(self, project_id, user_id, role_id):
         params = {
             'project': project_id,
@@ -104,36 +126,39 @@ class OpenstackRole(OpenstackResource):
             'role': role_id
         }
         self.logger.debug(
-            'Attempting to assign role to user for this project: {0}'.format(
-                self.name if not self.resource_id else self.resource_id))
+            'Attempting to assign role to user for this project: %s',
+            self.name if not self.resource_id else self.resource_id)
 
         self.connection.identity.assign_project_role_to_user(**params)
 
     def create(self):
+        self.invalidate_name_cache()
         self.logger.debug(
-            'Attempting to create role with these args: {0}'.format(
-                self.config))
+            'Attempting to create role with these args: %s',
+            self.payload(self.config))
         role = self.connection.identity.create_role(**self.config)
-        self.logger.debug('Created role with this result: {0}'.format(role))
+        self.logger.debug('Created role with this result: %s',
+                          self.payload(role))
         return role
 
     def delete(self):
-        role = self.get()
+        role = self.get_resource_reference(invalidate_name=True)
         self.logger.debug(
-            'Attempting to delete this role: {0}'.format(role))
+            'Attempting to delete this role: %s', self.payload(role))
         result = self.connection.identity.delete_role(role)
         self.logger.debug(
-            'Deleted role with this result: {0}'.format(result))
+            'Deleted role with this result: %s', self.payload(result))
         return result
 
     def update(self, new_config=None):
-        role = self.get()
+        role = self.get_resource_reference(
+            invalidate_name='name' in (new_config or {}))
         self.logger.debug(
-            'Attempting to update this role: {0} with args {1}'.format(
-                role, new_config))
+            'Attempting to update this role: %s with args %s',
+            self.payload(role), self.payload(new_config))
         result = self.connection.identity.update_role(role, **new_config)
         self.logger.debug(
-            'Updated role with this result: {0}'.format(result))
+            'Updated role with this result: %s', self.payload(result))
         return result
 
 
@@ -142,6 +167,7 @@ class OpenstackProject(OpenstackResource):
     resource_type = 'project'
     infinite_resource_quota = 10 ** 9
 
+    @projected
     def list(self, query=None):
         query = query or {}
         return self.connection.identity.projects(**query)
@@ -149,41 +175,45 @@ class OpenstackProject(OpenstackResource):
     def get_quota_sets(self, quota_type=None):
         return self.infinite_resource_quota
 
+    @projected
+    @cached_get
     def get(self):
         self.logger.debug(
-            'Attempting to find this project: {0}'.format(
-                self.name if not self.resource_id else self.resource_id))
+            'Attempting to find this project: %s',
+            self.name if not self.resource_id else self.resource_id)
         project = self.connection.identity.get_project(
             self.name if not self.resource_id else self.resource_id
         )
         self.logger.debug(
-            'Found project with this result: {0}'.format(project))
+            'Found project with this result: %s', self.payload(project))
         return project
 
     def create(self):
+        self.invalidate_name_cache()
         self.logger.debug(
-            'Attempting to create project with these args: {0}'.format(
-                self.config))
+            'Attempting to create project with these args: %s',
+            self.payload(self.config))
         project = self.connection.identity.create_project(**self.config)
         self.logger.debug(
-            'Created project with this result: {0}'.format(project))
+            'Created project with this result: %s', self.payload(project))
         return project
 
     def delete(self):
-        project = self.get()
+        project = self.get_resource_reference(invalidate_name=True)
         self.logger.debug(
-            'Attempting to delete this project: {0}'.format(project))
+            'Attempting to delete this project: %s', self.payload(project))
         result = self.connection.identity.delete_project(project)
         self.logger.debug(
-            'Deleted project with this result: {0}'.format(result))
+            'Deleted project with this result: %s', self.payload(result))
         return result
 
     def update(self, new_config=None):
-        project = self.get()
+        project = self.get_resource_reference(
+            invalidate_name='name' in (new_config or {}))
         self.logger.debug(
-            'Attempting to update this project: {0} with args {1}'.format(
-                project, new_config))
+            'Attempting to update this project: %s with args %s',
+            self.payload(project), self.payload(new_config))
         result = self.connection.identity.update_project(project, **new_config)
         self.logger.debug(
-            'Updated project with this result: {0}'.format(result))
+            'Updated project with this result: %s', self.payload(result))
         return result
@@ -17,14 +17,16 @@
 # https://docs.openstack.org/openstacksdk/latest/user/proxies/compute.html.
 
 # Local imports
-from openstack_sdk.common import OpenstackResource
+from openstack_sdk.common import OpenstackResource, cached_get, projected
 
 
 class OpenstackImage(OpenstackResource):
     service_type = 'compute'
     resource_type = 'image'
+    supports_pagination = True
     infinite_resource_quota = 10 ** 9
 
+    @projected
     def list(self, query=None):
         query = query or {}
         return self.connection.image.images(**query)
@@ -32,38 +34,44 @@ class OpenstackImage(OpenstackResource):
     def get_quota_sets(self, quota_type=None):
         return self.infinite_resource_quota
 
+    @projected
+    @cached_get
     def get(self):
         self.logger.debug(
-            'Attempting to find this image: {0}'.format(
-                self.name if not self.resource_id else self.resource_id))
+            'Attempting to find this image: %s',
+            self.name if not self.resource_id else self.resource_id)
         image = self.connection.image.get_image(
             self.name if not self.resource_id else self.resource_id
         )
         self.logger.debug(
-            'Found image with this result: {0}'.format(image))
+            'Found image with this result: %s', self.payload(image))
         return image
 
     def create(self):
+        self.invalidate_name_cache()
         self.logger.debug(
-            'Attempting to create image with these args: {0}'.format(
-                self.config))
+            'Attempting to create image with these args: %s',
+            self.payload(self.config))
         image = self.connection.image.upload_image(**self.config)
         self.logger.debug(
-            'Created image with this result: {0}'.format(image))
+            'Created image with this result: %s', self.payload(image))
         return image
 
     def delete(self):
-        image = self.get()
+        image = self.get_resource_reference(invalidate_name=True)
         self.logger.debug(
-            'Attempting to delete this image: {0}'.format(image))
+            'Attempting to delete this image: %s', self.payload(image))
         self.connection.image.delete_image(image)
 
     def update(self, new_config=None):
-        image = self.get()
+        # Image update is sent as JSON patch, which is generated from the
+        # current state of the image
+        image = self.get(fresh=True)
+        self.invalidate_cache()
         self.logger.debug(
-            'Attempting to update this image: {0} with args {1}'.format(
-                image, new_config))
+            'Attempting to update this image: %s with args %s',
+            self.payload(image), self.payload(new_config))
         result = self.connection.image.update_image(image, **new_config)
         self.logger.debug(
-            'Updated image with this result: {0}'.format(result))
+            'Updated image with this result: %s', self.payload(result))
         return result
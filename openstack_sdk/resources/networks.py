@@ -17,451 +17,597 @@
 # Based on this documentation:
 # https://docs.openstack.org/openstacksdk/latest/user/proxies/network.html.
 
+# Third party imports
+from openstack import exceptions
+from openstack.network.v2.floating_ip import FloatingIP
+from openstack.network.v2.network import Network
+from openstack.network.v2.port import Port
+from openstack.network.v2.rbac_policy import RBACPolicy
+from openstack.network.v2.router import Router
+from openstack.network.v2.security_group import SecurityGroup
+from openstack.network.v2.security_group_rule import SecurityGroupRule
+from openstack.network.v2.subnet import Subnet
+
 # Local imports
-from openstack_sdk.common import OpenstackResource
+from openstack_sdk.common import OpenstackResource, cached_get, projected
+
+# Number of attempts of conditional update, which is only retried when the
+# resource was changed concurrently between reading and updating it
+DEFAULT_CONDITIONAL_UPDATE_ATTEMPTS = 5
+
+
+class OpenstackNeutronResource(OpenstackResource):
+    """
+    Base class for neutron resources, which all support id and fields
+    filters as well as revision number based conditional updates
+    """
+    service_type = 'network'
+    supports_id_filter = True
+    supports_fields_filter = True
+    supports_pagination = True
+
+    def conditional_update(self, modify, remote_resource=None,
+                           max_attempts=DEFAULT_CONDITIONAL_UPDATE_ATTEMPTS):
+        """
+        Update resource only if it was not changed since it was read, using
+        "If-Match" header on its revision number. When the revision does not
+        match, the resource is read again and the update is recomputed, so
+        read modify write sequences do not lose concurrent updates
+        :param modify: Callable which takes the remote resource and returns
+        the attributes to update or None if there is nothing to update
+        :param remote_resource: Remote resource already read by the caller
+        :param int max_attempts: Maximum number of attempts to update
+        :return: Updated remote resource
+        """
+        attempt = 1
+        while True:
+            remote_resource = remote_resource or self.get(fresh=True)
+            new_config = modify(remote_resource)
+            if not new_config:
+                return remote_resource
+            try:
+                return self._update_if_revision_matches(remote_resource,
+                                                        new_config)
+            except exceptions.HttpException as error:
+                if error.status_code != 412 or attempt >= max_attempts:
+                    raise
+                self.logger.debug(
+                    '%s %s was changed concurrently, retrying '
+                    'update', self.resource_type, remote_resource.id)
+                remote_resource = None
+                attempt += 1
+
+    def _update_if_revision_matches(self, remote_resource, new_config):
+        resource_class = self.sdk_resource_class
+        body = dict(zip(self._get_server_fields(new_config.keys()),
+                        new_config.values()))
+        revision_number = getattr(remote_resource, 'revision_number', None)
+        self.logger.debug(
+            'Attempting to update this %s: %s with args %s if its revision'
+            ' is %s', self.resource_type, remote_resource.id,
+            self.payload(new_config), revision_number)
+        self.invalidate_cache(remote_resource.id)
+        if 'name' in new_config:
+            self.invalidate_name_cache(remote_resource.id)
+        # Revision number is not exposed when neutron does not support
+        # standard attributes for the resource, so it is updated as is
+        headers = {}
+        if revision_number is not None:
+            headers['If-Match'] = \
+                'revision_number={0}'.format(revision_number)
+        response = self.connection.network.put(
+            '{0}/{1}'.format(resource_class.base_path, remote_resource.id),
+            json={resource_class.resource_key: body},
+            headers=headers)
+        exceptions.raise_from_response(response)
+        result = resource_class.existing(
+            **response.json()[resource_class.resource_key])
+        self.logger.debug(
+            'Updated %s with this result: %s',
+            self.resource_type, self.payload(result))
+        return result
 
 
-class OpenstackNetwork(OpenstackResource):
+class OpenstackNetwork(OpenstackNeutronResource):
     # SDK documentation link:
     # https://bit.ly/2D2S1xw.
     service_type = 'network'
     resource_type = 'network'
+    sdk_resource_class = Network
 
     def resource_plural(self, openstack_type):
         return openstack_type
 
+    @projected
     def list(self, query=None):
         query = query or {}
         return self.connection.network.networks(**query)
 
+    @projected
+    @cached_get
     def get(self):
         self.logger.debug(
-            'Attempting to find this network: {0}'.format(
-                self.name if not self.resource_id else self.resource_id))
+            'Attempting to find this network: %s',
+            self.name if not self.resource_id else self.resource_id)
         network = self.connection.network.get_network(
             self.name if not self.resource_id else self.resource_id)
         self.logger.debug(
-            'Found network with this result: {0}'.format(network))
+            'Found network with this result: %s', self.payload(network))
         return network
 
     def find_network(self):
         self.logger.debug(
-            'Attempting to find this network: {0}'.format(self.name))
+            'Attempting to find this network: %s', self.name)
         network = self.connection.network.find_network(self.name)
         self.logger.debug(
-            'Found network with this result: {0}'.format(network))
+            'Found network with this result: %s', self.payload(network))
         return network
 
+    def find_network_id(self):
+        return self.resolve_resource_id(
+            self.name, lambda name: self.find_network())
+
     def create(self):
+        self.invalidate_name_cache()
         self.logger.debug(
-            'Attempting to create network with these args: {0}'.format(
-                self.config))
+            'Attempting to create network with these args: %s',
+            self.payload(self.config))
         network = self.connection.network.create_network(**self.config)
         self.logger.debug(
-            'Created network with this result: {0}'.format(network))
+            'Created network with this result: %s', self.payload(network))
         return network
 
     def delete(self):
-        network = self.get()
+        network = self.get_resource_reference(invalidate_name=True)
         self.logger.debug(
-            'Attempting to delete this network: {0}'.format(network))
+            'Attempting to delete this network: %s', self.payload(network))
         result = self.connection.network.delete_network(network)
         self.logger.debug(
-            'Deleted network with this result: {0}'.format(result))
+            'Deleted network with this result: %s', self.payload(result))
         return result
 
     def update(self, new_config=None):
-        network = self.get()
+        network = self.get_resource_reference(
+            invalidate_name='name' in (new_config or {}))
         self.logger.debug(
-            'Attempting to update this network: {0} with args {1}'.format(
-                network, new_config))
+            'Attempting to update this network: %s with args %s',
+            self.payload(network), self.payload(new_config))
         result = self.connection.network.update_network(network, **new_config)
         self.logger.debug(
-            'Updated network with this result: {0}'.format(result))
+            'Updated network with this result: %s', self.payload(result))
         return result
 
 
-class OpenstackSubnet(OpenstackResource):
+class OpenstackSubnet(OpenstackNeutronResource):
     # SDK documentation link:
     # https://bit.ly/2SMLuvY
 
     service_type = 'network'
     resource_type = 'subnet'
+    sdk_resource_class = Subnet
 
     def resource_plural(self, openstack_type):
         return openstack_type
 
+    @projected
     def list(self, query=None):
         query = query or {}
         return self.connection.network.subnets(**query)
 
+    @projected
+    @cached_get
     def get(self):
         self.logger.debug(
-            'Attempting to find this subnet: {0}'.format(
-                self.name if not self.resource_id else self.resource_id))
+            'Attempting to find this subnet: %s',
+            self.name if not self.resource_id else self.resource_id)
         subnet = self.connection.network.get_subnet(
             self.name if not self.resource_id else self.resource_id)
         self.logger.debug(
-            'Found subnet with this result: {0}'.format(subnet))
+            'Found subnet with this result: %s', self.payload(subnet))
         return subnet
 
     def create(self):
+        self.invalidate_name_cache()
         self.logger.debug(
-            'Attempting to create subnet with these args: {0}'.format(
-                self.config))
+            'Attempting to create subnet with these args: %s',
+            self.payload(self.config))
         subnet = self.connection.network.create_subnet(**self.config)
         self.logger.debug(
-            'Created subnet with this result: {0}'.format(subnet))
+            'Created subnet with this result: %s', self.payload(subnet))
         return subnet
 
     def delete(self):
-        subnet = self.get()
+        subnet = self.get_resource_reference(invalidate_name=True)
         self.logger.debug(
-            'Attempting to delete this subnet: {0}'.format(subnet))
+            'Attempting to delete this subnet: %s', self.payload(subnet))
         result = self.connection.network.delete_subnet(subnet)
         self.logger.debug(
-            'Deleted subnet with this result: {0}'.format(result))
+            'Deleted subnet with this result: %s', self.payload(result))
         return result
 
     def update(self, new_config=None):
-        subnet = self.get()
+        subnet = self.get_resource_reference(
+            invalidate_name='name' in (new_config or {}))
         self.logger.debug(
-            'Attempting to update this subnet: {0} with args {1}'.format(
-                subnet, new_config))
+            'Attempting to update this subnet: %s with args %s',
+            self.payload(subnet), self.payload(new_config))
         result = self.connection.network.update_subnet(subnet, **new_config)
         self.logger.debug(
-            'Updated subnet with this result: {0}'.format(result))
+            'Updated subnet with this result: %s', self.payload(result))
         return result
 
 
-class OpenstackPort(OpenstackResource):
+class OpenstackPort(OpenstackNeutronResource):
     # SDK documentation link:
     # https://bit.ly/2DlPnUj
     service_type = 'network'
     resource_type = 'port'
+    sdk_resource_class = Port
 
     def resource_plural(self, openstack_type):
         return openstack_type
 
+    @projected
     def list(self, query=None):
         query = query or {}
         return self.connection.network.ports(**query)
 
+    @projected
+    @cached_get
     def get(self):
         self.logger.debug(
-            'Attempting to find this port: {0}'.format(
-                self.name if not self.resource_id else self.resource_id))
+            'Attempting to find this port: %s',
+            self.name if not self.resource_id else self.resource_id)
         port = self.connection.network.get_port(
             self.name if not self.resource_id else self.resource_id)
         self.logger.debug(
-            'Found port with this result: {0}'.format(port))
+            'Found port with this result: %s', self.payload(port))
         return port
 
     def create(self):
+        self.invalidate_name_cache()
         self.logger.debug(
-            'Attempting to create port with these args: {0}'.format(
-                self.config))
+            'Attempting to create port with these args: %s',
+            self.payload(self.config))
         port = self.connection.network.create_port(**self.config)
         self.logger.debug(
-            'Created port with this result: {0}'.format(port))
+            'Created port with this result: %s', self.payload(port))
         return port
 
     def delete(self):
-        port = self.get()
+        port = self.get_resource_reference(invalidate_name=True)
         self.logger.debug(
-            'Attempting to delete this port: {0}'.format(port))
+            'Attempting to delete this port: %s', self.payload(port))
         result = self.connection.network.delete_port(port)
         self.logger.debug(
-            'Deleted port with this result: {0}'.format(result))
+            'Deleted port with this result: %s', self.payload(result))
         return result
 
     def update(self, new_config=None):
-        port = self.get()
+        port = self.get_resource_reference(
+            invalidate_name='name' in (new_config or {}))
         self.logger.debug(
-            'Attempting to update this port: {0} with args {1}'.format(
-                port, new_config))
+            'Attempting to update this port: %s with args %s',
+            self.payload(port), self.payload(new_config))
         result = self.connection.network.update_port(port, **new_config)
         self.logger.debug(
-            'Updated port with this result: {0}'.format(result))
+            'Updated port with this result: %s', self.payload(result))
         return result
 
 
-class OpenstackRouter(OpenstackResource):
+class OpenstackRouter(OpenstackNeutronResource):
     # SDK documentation link:
     # https://bit.ly/2QioQdg
     service_type = 'network'
     resource_type = 'router'
+    sdk_resource_class = Router
 
     def resource_plural(self, openstack_type):
         return openstack_type
 
+    @projected
     def list(self, query=None):
         query = query or {}
         return self.connection.network.routers(**query)
 
+    @projected
+    @cached_get
     def get(self):
         self.logger.debug(
-            'Attempting to find this router: {0}'.format(
-                self.name if not self.resource_id else self.resource_id))
+            'Attempting to find this router: %s',
+            self.name if not self.resource_id else self.resource_id)
         router = self.connection.network.get_router(
             self.name if not self.resource_id else self.resource_id)
         self.logger.debug(
-            'Found router with this result: {0}'.format(router))
+            'Found router with this result: %s', self.payload(router))
         return router
 
     def create(self):
+        self.invalidate_name_cache()
         self.logger.debug(
-            'Attempting to create router with these args: {0}'.format(
-                self.config))
+            'Attempting to create router with these args: %s',
+            self.payload(self.config))
         router = self.connection.network.create_router(**self.config)
         self.logger.debug(
-            'Created router with this result: {0}'.format(router))
+            'Created router with this result: %s', self.payload(router))
         return router
 
     def delete(self):
-        router = self.get()
+        router = self.get_resource_reference(invalidate_name=True)
         self.logger.debug(
-            'Attempting to delete this router: {0}'.format(router))
+            'Attempting to delete this router: %s', self.payload(router))
         result = self.connection.network.delete_router(router)
         self.logger.debug(
-            'Deleted router with this result: {0}'.format(result))
+            'Deleted router with this result: %s', self.payload(result))
         return result
 
     def update(self, new_config=None):
-        router = self.get()
+        router = self.get_resource_reference(
+            invalidate_name='name' in (new_config or {}))
         self.logger.debug(
-            'Attempting to update this router: {0} with args {1}'.format(
-                router, new_config))
+            'Attempting to update this router: %s with args %s',
+            self.payload(router), self.payload(new_config))
         result = self.connection.network.update_router(router, **new_config)
         self.logger.debug(
-            'Updated router with this result: {0}'.format(result))
+            'Updated router with this result: %s', self.payload(result))
         return result
 
     def add_interface(self, kwargs):
-        router = self.get()
+        router = self.get_resource_reference()
         self.logger.debug(
-            'Attempting to add {0} interface this router: {1}'.format(
-                kwargs, router))
+            'Attempting to add %s interface this router: %s',
+            self.payload(kwargs), self.payload(router))
         result = self.connection.network.add_interface_to_router(
             router, **kwargs)
         self.logger.debug(
-            'Added this interface to router: {0}'.format(result))
+            'Added this interface to router: %s', self.payload(result))
         return result
 
     def remove_interface(self, kwargs):
-        router = self.get()
+        router = self.get_resource_reference()
         self.logger.debug(
-            'Attempting to remove {0} interface this router: {1}'.format(
-                kwargs, router))
+            'Attempting to remove %s interface this router: %s',
+            self.payload(kwargs), self.payload(router))
         result = self.connection.network.remove_interface_from_router(
             router, **kwargs)
         self.logger.debug(
-            'Removed this interface to router: {0}'.format(result))
+            'Removed this interface to router: %s', self.payload(result))
         return result
 
 
-class OpenstackFloatingIP(OpenstackResource):
+class OpenstackFloatingIP(OpenstackNeutronResource):
     # SDK documentation link:
     # https://bit.ly/2JGHqcQ
     service_type = 'network'
     resource_type = 'ip'
+    sdk_resource_class = FloatingIP
 
     def resource_plural(self, openstack_type):
         return openstack_type
 
+    @projected
     def list(self, query=None):
         query = query or {}
         return self.connection.network.ips(**query)
 
+    @projected
+    @cached_get
     def get(self):
         self.logger.debug(
-            'Attempting to find this floating ip: {0}'.format(
-                self.name if not self.resource_id else self.resource_id))
+            'Attempting to find this floating ip: %s',
+            self.name if not self.resource_id else self.resource_id)
         floating_ip = self.connection.network.get_ip(
             self.name if not self.resource_id else self.resource_id)
         self.logger.debug(
-            'Found floating ip with this result: {0}'.format(floating_ip))
+            'Found floating ip with this result: %s',
+            self.payload(floating_ip))
         return floating_ip
 
     def create(self):
+        self.invalidate_name_cache()
         self.logger.debug(
-            'Attempting to create floating ip with these args: {0}'.format(
-                self.config))
+            'Attempting to create floating ip with these args: %s',
+            self.payload(self.config))
         floating_ip = self.connection.network.create_ip(**self.config)
         self.logger.debug(
-            'Created floating ip with this result: {0}'.format(floating_ip))
+            'Created floating ip with this result: %s',
+            self.payload(floating_ip))
         return floating_ip
 
     def delete(self):
-        floating_ip = self.get()
+        floating_ip = self.get_resource_reference(invalidate_name=True)
         self.logger.debug(
-            'Attempting to delete this floating ip: {0}'.format(floating_ip))
+            'Attempting to delete this floating ip: %s',
+            self.payload(floating_ip))
         self.connection.network.delete_ip(floating_ip)
 
     def update(self, new_config=None):
-        floating_ip = self.get()
+        floating_ip = self.get_resource_reference(
+            invalidate_name='name' in (new_config or {}))
         self.logger.debug(
-            'Attempting to update this floating ip: {0} with args {1}'.format(
-                floating_ip, new_config))
+            'Attempting to update this floating ip: %s with args %s',
+            self.payload(floating_ip), self.payload(new_config))
         result = self.connection.network.update_ip(floating_ip, **new_config)
         self.logger.debug(
-            'Updated floating ip with this result: {0}'.format(result))
+            'Updated floating ip with this result: %s', self.payload(result))
         return result
 
 
-class OpenstackSecurityGroup(OpenstackResource):
+class OpenstackSecurityGroup(OpenstackNeutronResource):
     # SDK documentation link:
     # https://bit.ly/2PCsWA0
     service_type = 'network'
     resource_type = 'security_group'
+    sdk_resource_class = SecurityGroup
 
     def resource_plural(self, openstack_type):
         return openstack_type
 
+    @projected
     def list(self, query=None):
         query = query or {}
         return self.connection.network.security_groups(**query)
 
+    @projected
+    @cached_get
     def get(self):
         self.logger.debug(
-            'Attempting to find this security group: {0}'.format(
-                self.name if not self.resource_id else self.resource_id))
+            'Attempting to find this security group: %s',
+            self.name if not self.resource_id else self.resource_id)
         security_group = self.connection.network.get_security_group(
             self.name if not self.resource_id else self.resource_id)
         self.logger.debug(
-            'Found security group with this result: {0}'.format(
-                security_group))
+            'Found security group with this result: %s',
+            self.payload(security_group))
         return security_group
 
     def create(self):
+        self.invalidate_name_cache()
         self.logger.debug(
-            'Attempting to create security group with these args: {0}'.format(
-                self.config))
+            'Attempting to create security group with these args: %s',
+            self.payload(self.config))
         security_group = self.connection.network.create_security_group(
             **self.config)
         self.logger.debug(
-            'Created security group with this result: {0}'.format(
-                security_group))
+            'Created security group with this result: %s',
+            self.payload(security_group))
         return security_group
 
     def delete(self):
-        security_group = self.get()
+        security_group = self.get_resource_reference(invalidate_name=True)
         self.logger.debug(
-            'Attempting to delete this security_group: {0}'.format(
-                security_group))
+            'Attempting to delete this security_group: %s',
+            self.payload(security_group))
         result = self.connection.network.delete_security_group(security_group)
         self.logger.debug(
-            'Deleted security group with this result: {0}'.format(result))
+            'Deleted security group with this result: %s',
+            self.payload(result))
         return result
 
     def update(self, new_config=None):
-        security_group = self.get()
+        security_group = self.get_resource_reference(
+            invalidate_name='name' in (new_config or {}))
         self.logger.debug('Attempting to update this '
-                          'security group: {0} with args {1}'.format(
-                              security_group, new_config))
+                          'security group: %s with args %s',
+                          self.payload(security_group),
+                          self.payload(new_config))
         result = self.connection.network.update_security_group(
             security_group, **new_config)
         self.logger.debug(
-            'Updated security group with this result: {0}'.format(result))
+            'Updated security group with this result: %s',
+            self.payload(result))
         return result
 
 
-class OpenstackSecurityGroupRule(OpenstackResource):
+class OpenstackSecurityGroupRule(OpenstackNeutronResource):
     # SDK documentation link:
     # https://bit.ly/2PCsWA0
     service_type = 'network'
     resource_type = 'security_group_rule'
+    sdk_resource_class = SecurityGroupRule
 
     def resource_plural(self, openstack_type):
         return openstack_type
 
+    @projected
     def list(self, query=None):
         query = query or {}
         return self.connection.network.security_group_rules(**query)
 
+    @projected
+    @cached_get
     def get(self):
         self.logger.debug(
-            'Attempting to find this security group rule: {0}'.format(
-                self.name if not self.resource_id else self.resource_id))
+            'Attempting to find this security group rule: %s',
+            self.name if not self.resource_id else self.resource_id)
         security_group_rule = self.connection.network.get_security_group_rule(
             self.name if not self.resource_id else self.resource_id)
         self.logger.debug(
-            'Found security group with this result: {0}'.format(
-                security_group_rule))
+            'Found security group with this result: %s',
+            self.payload(security_group_rule))
         return security_group_rule
 
     def create(self):
+        self.invalidate_name_cache()
         self.logger.debug('Attempting to create security group rule '
-                          'with these args: {0}'.format(self.config))
+                          'with these args: %s', self.payload(self.config))
         security_group_rule = \
             self.connection.network.create_security_group_rule(**self.config)
         self.logger.debug(
-            'Created security group rule with this result: {0}'.format(
-                security_group_rule))
+            'Created security group rule with this result: %s',
+            self.payload(security_group_rule))
         return security_group_rule
 
     def delete(self):
-        security_group_rule = self.get()
+        security_group_rule = self.get_resource_reference(invalidate_name=True)
         self.logger.debug(
-            'Attempting to delete this security group rule: {0}'.format(
-                security_group_rule))
+            'Attempting to delete this security group rule: %s',
+            self.payload(security_group_rule))
         result = self.connection.network.delete_security_group_rule(
             security_group_rule)
         self.logger.debug(
-            'Deleted security group with this result: {0}'.format(result))
+            'Deleted security group with this result: %s',
+            self.payload(result))
         return result
 
 
-class OpenstackRBACPolicy(OpenstackResource):
+class OpenstackRBACPolicy(OpenstackNeutronResource):
     # SDK documentation link:
     # https://bit.ly/2DvKSnI
     service_type = 'network'
     resource_type = 'rbac_policy'
+    sdk_resource_class = RBACPolicy
 
     def resource_plural(self, openstack_type):
         return openstack_type
 
+    @projected
     def list(self, query=None):
         query = query or {}
         return self.connection.network.rbac_policies(**query)
 
+    @projected
+    @cached_get
     def get(self):
         self.logger.debug(
-            'Attempting to find this rbac policy: {0}'.format(
-                self.name if not self.resource_id else self.resource_id))
+            'Attempting to find this rbac policy: %s',
+            self.name if not self.resource_id else self.resource_id)
         rbac_policy = self.connection.network.get_rbac_policy(
             self.name if not self.resource_id else self.resource_id)
         self.logger.debug(
-            'Found rbac policy with this result: {0}'.format(
-                rbac_policy))
+            'Found rbac policy with this result: %s',
+            self.payload(rbac_policy))
         return rbac_policy
 
     def create(self):
+        self.invalidate_name_cache()
         self.logger.debug('Attempting to create rbac policy '
-                          'with these args: {0}'.format(self.config))
+                          'with these args: %s', self.payload(self.config))
         rbac_policy = \
             self.connection.network.create_rbac_policy(**self.config)
         self.logger.debug(
-            'Created rbac policy with this result: {0}'.format(rbac_policy))
+            'Created rbac policy with this result: %s',
+            self.payload(rbac_policy))
         return rbac_policy
 
     def delete(self):
-        rbac_policy = self.get()
+        rbac_policy = self.get_resource_reference(invalidate_name=True)
         self.logger.debug(
-            'Attempting to delete this rbac policy: {0}'.format(
-                rbac_policy))
+            'Attempting to delete this rbac policy: %s',
+            self.payload(rbac_policy))
         result = self.connection.network.delete_rbac_policy(rbac_policy)
         self.logger.debug(
-            'Deleted rbac policy with this result: {0}'.format(result))
+            'Deleted rbac policy with this result: %s', self.payload(result))
         return result
 
     def update(self, new_config=None):
-        rbac_policy = self.get()
+        rbac_policy = self.get_resource_reference(
+            invalidate_name='name' in (new_config or {}))
         self.logger.debug(
-            'Attempting to update this rbac policy: {0} with args {1}'
-            ''.format(rbac_policy, new_config))
+            'Attempting to update this rbac policy: %s with args %s',
+            self.payload(rbac_policy), self.payload(new_config))
         result = self.connection.network.update_rbac_policy(
             rbac_policy, **new_config)
         self.logger.debug(
-            'Updated rbac policy with this result: {0}'.format(result))
+            'Updated rbac policy with this result: %s', self.payload(result))
         return result
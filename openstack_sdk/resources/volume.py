@@ -16,42 +16,51 @@
 # Based on this documentation:
 # https://docs.openstack.org/openstacksdk/latest/user/proxies/compute.html.
 
+# Third party imports
+from openstack.block_storage.v2.volume import Volume
+
 # Local imports
-from openstack_sdk.common import OpenstackResource
+from openstack_sdk.common import OpenstackResource, cached_get, projected
 
 
 class OpenstackVolume(OpenstackResource):
     service_type = 'volume'
     resource_type = 'volume'
+    supports_pagination = True
+    sdk_resource_class = Volume
 
+    @projected
     def list(self, query=None):
         query = query or {}
         return self.connection.block_storage.volumes(**query)
 
+    @projected
+    @cached_get
     def get(self):
         self.logger.debug(
-            'Attempting to find this volume: {0}'.format(
-                self.name if not self.resource_id else self.resource_id))
+            'Attempting to find this volume: %s',
+            self.name if not self.resource_id else self.resource_id)
         volume = self.connection.block_storage.get_volume(
             self.name if not self.resource_id else self.resource_id
         )
         self.logger.debug(
-            'Found volume with this result: {0}'.format(volume))
+            'Found volume with this result: %s', self.payload(volume))
         return volume
 
     def create(self):
+        self.invalidate_name_cache()
         self.logger.debug(
-            'Attempting to create volume with these args: {0}'.format(
-                self.config))
+            'Attempting to create volume with these args: %s',
+            self.payload(self.config))
         volume = self.connection.block_storage.create_volume(**self.config)
         self.logger.debug(
-            'Created volume with this result: {0}'.format(volume))
+            'Created volume with this result: %s', self.payload(volume))
         return volume
 
     def delete(self):
-        volume = self.get()
+        volume = self.get_resource_reference(invalidate_name=True)
         self.logger.debug(
-            'Attempting to delete this volume: {0}'.format(volume))
+            'Attempting to delete this volume: %s', self.payload(volume))
         self.connection.block_storage.delete_volume(volume)
 
 
@@ -59,33 +68,40 @@ class OpenstackVolumeType(OpenstackResource):
     service_type = 'volume'
     resource_type = 'volume_type'
 
+    @projected
     def list(self):
         return self.connection.block_storage.types()
 
+    @projected
+    @cached_get
     def get(self):
         self.logger.debug(
-            'Attempting to find this volume type: {0}'.format(
-                self.name if not self.resource_id else self.resource_id))
+            'Attempting to find this volume type: %s',
+            self.name if not self.resource_id else self.resource_id)
         volume_type = self.connection.block_storage.get_type(
             self.name if not self.resource_id else self.resource_id
         )
         self.logger.debug(
-            'Found volume type with this result: {0}'.format(volume_type))
+            'Found volume type with this result: %s',
+            self.payload(volume_type))
         return volume_type
 
     def create(self):
+        self.invalidate_name_cache()
         self.logger.debug(
-            'Attempting to create volume type with these args: {0}'.format(
-                self.config))
+            'Attempting to create volume type with these args: %s',
+            self.payload(self.config))
         volume_type = self.connection.block_storage.create_type(**self.config)
         self.logger.debug(
-            'Created volume type with this result: {0}'.format(volume_type))
+            'Created volume type with this result: %s',
+            self.payload(volume_type))
         return volume_type
 
     def delete(self):
-        volume_type = self.get()
+        volume_type = self.get_resource_reference(invalidate_name=True)
         self.logger.debug(
-            'Attempting to delete this volume type: {0}'.format(volume_type))
+            'Attempting to delete this volume type: %s',
+            self.payload(volume_type))
         self.connection.block_storage.delete_type(volume_type)
 
 
@@ -93,47 +109,52 @@ class OpenstackVolumeBackup(OpenstackResource):
     resource_type = 'backup'
     service_type = 'volume'
 
+    @projected
     def list(self, query=None):
         query = query or {}
         self.logger.debug('Attempting to list backups')
         result = self.connection.block_storage.backups(query)
         return result
 
+    @projected
+    @cached_get
     def get(self):
         self.logger.debug(
-            'Attempting to find this backup: {0}'.format(
-                self.name if not self.resource_id else self.resource_id))
+            'Attempting to find this backup: %s',
+            self.name if not self.resource_id else self.resource_id)
         backup = self.connection.block_storage.get_backup(
             self.name if not self.resource_id else self.resource_id
         )
         self.logger.debug(
-            'Found backup with this result: {0}'.format(backup))
+            'Found backup with this result: %s', self.payload(backup))
         return backup
 
     def create(self):
+        self.invalidate_name_cache()
         self.logger.debug(
-            'Attempting to create backup with these args: {0}'.format(
-                self.config))
+            'Attempting to create backup with these args: %s',
+            self.payload(self.config))
         volume = self.connection.block_storage.create_backup(**self.config)
         self.logger.debug(
-            'Created backup with this result: {0}'.format(volume))
+            'Created backup with this result: %s', self.payload(volume))
         return volume
 
     def restore(self, backup_id, volume_id, name):
         self.logger.debug(
-            'Attempting to restore backup this volume: {0}'.format(volume_id))
+            'Attempting to restore backup this volume: %s', volume_id)
         result = \
             self.connection.block_storage.restore_backup(backup_id,
                                                          volume_id,
                                                          name)
         self.logger.debug(
-            'Restored backup volume with this result: {0}'.format(result))
+            'Restored backup volume with this result: %s',
+            self.payload(result))
         return result
 
     def delete(self):
-        volume = self.get()
+        volume = self.get_resource_reference(invalidate_name=True)
         self.logger.debug(
-            'Attempting to delete this backup: {0}'.format(volume))
+            'Attempting to delete this backup: %s', self.payload(volume))
         self.connection.block_storage.delete_backup(volume)
 
 
@@ -141,34 +162,38 @@ class OpenstackVolumeSnapshot(OpenstackResource):
     resource_type = 'snapshot'
     service_type = 'volume'
 
+    @projected
     def list(self, query=None):
         query = query or {}
         self.logger.debug('Attempting to list snapshots')
-        result = self.connection.block_storage.snapshots(query)
+        result = self.connection.block_storage.snapshots(**query)
         return result
 
+    @projected
+    @cached_get
     def get(self):
         self.logger.debug(
-            'Attempting to find this snapshot: {0}'.format(
-                self.name if not self.resource_id else self.resource_id))
+            'Attempting to find this snapshot: %s',
+            self.name if not self.resource_id else self.resource_id)
         snapshot = self.connection.block_storage.get_snapshot(
             self.name if not self.resource_id else self.resource_id
         )
         self.logger.debug(
-            'Found snapshot with this result: {0}'.format(snapshot))
+            'Found snapshot with this result: %s', self.payload(snapshot))
         return snapshot
 
     def create(self):
+        self.invalidate_name_cache()
         self.logger.debug(
-            'Attempting to create snapshot with these args: {0}'.format(
-                self.config))
+            'Attempting to create snapshot with these args: %s',
+            self.payload(self.config))
         snapshot = self.connection.block_storage.create_snapshot(**self.config)
         self.logger.debug(
-            'Created snapshot with this result: {0}'.format(snapshot))
+            'Created snapshot with this result: %s', self.payload(snapshot))
         return snapshot
 
     def delete(self):
-        snapshot = self.get()
+        snapshot = self.get_resource_reference(invalidate_name=True)
         self.logger.debug(
-            'Attempting to delete this snapshot: {0}'.format(snapshot))
+            'Attempting to delete this snapshot: %s', self.payload(snapshot))
         self.connection.block_storage.delete_snapshot(snapshot)
@@ -0,0 +1,300 @@
+# #######
+# Copyright (c) 2019 Cloudify Platform Ltd. All rights reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Standard imports
+import time
+import random
+from email.utils import mktime_tz, parsedate_tz
+
+# Third party imports
+from keystoneauth1.exceptions import HttpError, RetriableConnectionFailure
+from openstack import exceptions
+from requests.exceptions import ConnectionError
+
+# Local imports
+from openstack_sdk.circuit_breaker import CircuitOpenError
+from openstack_sdk.executor import ExecutorError
+
+# Client config key used to configure the retry policy
+RETRY_POLICY_CONFIG = 'retry_policy'
+
+# Throttling is expected to succeed once retried, same as server side
+# errors. Conflicts are not retried, since they are mostly permanent, i.e.
+# the resource already exists
+TRANSIENT_STATUS_CODES = (429,)
+TRANSIENT_EXCEPTIONS = (RetriableConnectionFailure,
+                        ConnectionError,
+                        CircuitOpenError)
+
+# Throttled requests are rejected before the API processes them
+THROTTLED_STATUS_CODES = (429,)
+
+# Neutron and Cinder reply with a conflict (InUse) while the resource being
+# deleted or detached is still used by another one which is being released,
+# so conflicts are transient on these paths only
+CONFLICT_STATUS_CODES = (409,)
+
+# Only requests which can be sent again without side effects are retried
+# in process, a create request which failed after it was processed by the
+# API would otherwise create a duplicate resource
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Once the in process attempts are exhausted the whole operation is
+# retried, which is safe as long as the failed request ends in the same
+# state when it is sent again
+OPERATION_RETRY_METHODS = IDEMPOTENT_METHODS + ('PUT', 'DELETE')
+
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_BASE_DELAY = 1
+DEFAULT_MAX_DELAY = 30
+DEFAULT_OPERATION_RETRY_INTERVAL = 30
+
+
+class RetryPolicy(object):
+    """
+    Retry policy for openstack API errors. Transient errors of idempotent
+    requests are retried in process with exponential backoff and jitter,
+    honouring the "Retry-After" header returned by the API, while permanent
+    errors are raised at once
+    """
+
+    def __init__(self,
+                 max_attempts=DEFAULT_MAX_ATTEMPTS,
+                 base_delay=DEFAULT_BASE_DELAY,
+                 max_delay=DEFAULT_MAX_DELAY,
+                 operation_retry_interval=DEFAULT_OPERATION_RETRY_INTERVAL,
+                 logger=None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.operation_retry_interval = operation_retry_interval
+        self.logger = logger
+
+    @classmethod
+    def from_client_config(cls, client_config, logger=None):
+        """
+        Create retry policy from "retry_policy" of client config
+        :param dict client_config: Openstack client configuration
+        :param logger: Logger used to report retries
+        :return: Instance of RetryPolicy
+        """
+        config = (client_config or {}).get(RETRY_POLICY_CONFIG) or {}
+        return cls(
+            max_attempts=config.get('max_attempts', DEFAULT_MAX_ATTEMPTS),
+            base_delay=config.get('base_delay', DEFAULT_BASE_DELAY),
+            max_delay=config.get('max_delay', DEFAULT_MAX_DELAY),
+            operation_retry_interval=config.get(
+                'operation_retry_interval', DEFAULT_OPERATION_RETRY_INTERVAL),
+            logger=logger)
+
+    @staticmethod
+    def is_transient_status(status_code):
+        """
+        Check if HTTP status code indicates a transient error
+        :param int status_code: HTTP status code
+        :return bool: True if status code is a transient one
+        """
+        status_code = status_code or 0
+        return status_code >= 500 or status_code in TRANSIENT_STATUS_CODES
+
+    @staticmethod
+    def is_transient(error):
+        """
+        Check if error is a transient one which is expected to succeed once
+        the request is retried
+        :param error: Raised exception
+        :return bool: True if error is transient
+        """
+        if isinstance(error, TRANSIENT_EXCEPTIONS):
+            return True
+        if isinstance(error, ExecutorError):
+            return all(RetryPolicy.is_transient(call_error)
+                       for call_error in error.errors.values())
+        if isinstance(error, exceptions.HttpException):
+            return RetryPolicy.is_transient_status(error.status_code)
+        if isinstance(error, HttpError):
+            return RetryPolicy.is_transient_status(error.http_status)
+        return False
+
+    @staticmethod
+    def get_status_code(error):
+        """
+        Get HTTP status code of the failed request
+        :param error: Raised exception
+        :return: HTTP status code or None if no response was received
+        """
+        if isinstance(error, exceptions.HttpException):
+            return error.status_code
+        if isinstance(error, HttpError):
+            return error.http_status
+        return None
+
+    @staticmethod
+    def get_request_method(error):
+        """
+        Get HTTP method of the failed request, which is either set by the
+        retry hook or taken from the request the error is raised for
+        :param error: Raised exception
+        :return: HTTP method or None if it is unknown
+        """
+        method = getattr(error, 'request_method', None)
+        if not method and isinstance(error, HttpError):
+            method = error.method
+        if not method:
+            request = getattr(getattr(error, 'response', None),
+                              'request', None) \
+                or getattr(error, 'request', None)
+            method = getattr(request, 'method', None)
+        if not isinstance(method, basestring):
+            return None
+        return method.upper()
+
+    @staticmethod
+    def should_retry_operation(error, retry_conflicts=False):
+        """
+        Check if operation should be retried for the raised error, which is
+        the case when the error is transient and the failed request can be
+        sent again, or when the request was not processed at all
+        :param error: Raised exception
+        :param bool retry_conflicts: Whether conflicts are transient, which
+        is the case for delete and detach operations
+        :return bool: True if operation should be retried
+        """
+        if isinstance(error, CircuitOpenError):
+            return True
+        if isinstance(error, ExecutorError):
+            return all(RetryPolicy.should_retry_operation(call_error,
+                                                          retry_conflicts)
+                       for call_error in error.errors.values())
+        status_code = RetryPolicy.get_status_code(error)
+        if status_code in THROTTLED_STATUS_CODES:
+            return True
+        if retry_conflicts and status_code in CONFLICT_STATUS_CODES:
+            return True
+        return RetryPolicy.is_transient(error) and \
+            RetryPolicy.get_request_method(error) in OPERATION_RETRY_METHODS
+
+    @staticmethod
+    def get_retry_after(error=None, response=None):
+        """
+        Get the delay requested by the API through "Retry-After" header,
+        which is either a number of seconds or an HTTP date
+        :param error: Raised exception
+        :param response: Response of the request, when no error was raised
+        :return: Delay in seconds or None if it was not requested
+        """
+        if isinstance(error, CircuitOpenError):
+            return error.retry_after
+        if isinstance(error, ExecutorError):
+            delays = [RetryPolicy.get_retry_after(call_error)
+                      for call_error in error.errors.values()]
+            delays = [delay for delay in delays if delay is not None]
+            return max(delays) if delays else None
+        if response is None:
+            response = getattr(error, 'response', None)
+        retry_after = response is not None and \
+            response.headers.get('Retry-After')
+        if not retry_after:
+            return None
+        try:
+            return max(0, float(retry_after))
+        except ValueError:
+            retry_date = parsedate_tz(retry_after)
+            if not retry_date:
+                return None
+            return max(0, mktime_tz(retry_date) - time.time())
+
+    def get_delay(self, attempt, error=None, response=None):
+        """
+        Get delay before the next attempt
+        :param int attempt: Number of the failed attempt, starting from 1
+        :param error: Raised exception
+        :param response: Response of the request, when no error was raised
+        :return float: Delay in seconds
+        """
+        retry_after = self.get_retry_after(error, response)
+        if retry_after is not None:
+            return retry_after
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return delay / 2.0 + random.uniform(0, delay / 2.0)
+
+    def get_operation_retry_interval(self, error):
+        """
+        Get interval for the operation retry once the in process attempts
+        are exhausted
+        :param error: Raised exception
+        :return: Interval in seconds
+        """
+        retry_after = self.get_retry_after(error)
+        if retry_after is not None:
+            return max(int(retry_after), self.operation_retry_interval)
+        return self.operation_retry_interval
+
+    def _wait(self, attempt, reason, error=None, response=None):
+        delay = self.get_delay(attempt, error, response)
+        if self.logger:
+            self.logger.warning(
+                'Transient error on attempt {0} of {1}, retrying in'
+                ' {2:.1f} seconds: {3}'.format(
+                    attempt, self.max_attempts, delay, reason))
+        time.sleep(delay)
+
+    def send(self, request, url, method, **kwargs):
+        """
+        Send idempotent request retrying transient errors until the attempts
+        are exhausted, at which point the last error is raised or the last
+        response is returned
+        :param request: Request method of keystoneauth session
+        :param str url: Request URL
+        :param str method: HTTP method
+        :return: Response of the request
+        """
+        attempt = 1
+        while True:
+            try:
+                response = request(url, method, **kwargs)
+            except Exception as error:
+                # There is no point to wait for an open circuit breaker in
+                # process, so the operation is retried once it is closed
+                if attempt >= self.max_attempts \
+                        or not self.is_transient(error) \
+                        or isinstance(error, CircuitOpenError):
+                    raise
+                self._wait(attempt, error, error=error)
+            else:
+                # Openstack SDK does not raise for HTTP errors, the response
+                # is checked once it is returned
+                if attempt >= self.max_attempts or \
+                        not self.is_transient_status(response.status_code):
+                    return response
+                self._wait(attempt,
+                           'HTTP {0} for {1} {2}'.format(
+                               response.status_code, method, url),
+                           response=response)
+            attempt += 1
+
+    def __call__(self, request):
+        def wrapper(url, method, **kwargs):
+            try:
+                if method.upper() not in IDEMPOTENT_METHODS:
+                    return request(url, method, **kwargs)
+                return self.send(request, url, method, **kwargs)
+            except Exception as error:
+                # Connection failures do not carry the request, which is
+                # needed to know whether the operation can be retried
+                if not getattr(error, 'request_method', None):
+                    error.request_method = method.upper()
+                raise
+        return wrapper
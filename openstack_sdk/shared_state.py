@@ -0,0 +1,90 @@
+# #######
+# Copyright (c) 2019 Cloudify Platform Ltd. All rights reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Standard imports
+import os
+import sqlite3
+import tempfile
+from contextlib import contextmanager
+
+DEFAULT_STATE_PATH = os.path.join(tempfile.gettempdir(),
+                                  'cloudify-openstacksdk-state.db')
+# Period (in seconds) to wait for the database lock held by other processes
+DEFAULT_LOCK_TIMEOUT = 30
+
+
+class SharedState(object):
+    """
+    SQLite backed state shared between all operation processes on the same
+    host. Every transaction takes the database write lock up front, so read
+    modify write sequences are atomic across processes, while plain reads
+    do not take the write lock
+    """
+
+    def __init__(self, path=DEFAULT_STATE_PATH, schema=None,
+                 lock_timeout=DEFAULT_LOCK_TIMEOUT):
+        self.path = path
+        self.lock_timeout = lock_timeout
+        directory = os.path.dirname(path)
+        if directory and not os.path.isdir(directory):
+            try:
+                os.makedirs(directory, 0o700)
+            except OSError:
+                # Another process may have created it concurrently
+                if not os.path.isdir(directory):
+                    raise
+        if schema:
+            # Script execution manages its own transaction
+            connection = self._connect()
+            try:
+                connection.executescript(schema)
+            finally:
+                connection.close()
+
+    def _connect(self):
+        return sqlite3.connect(self.path,
+                               timeout=self.lock_timeout,
+                               isolation_level=None)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Open exclusive transaction which is committed once the block ends
+        :return: Instance of sqlite3.Connection
+        """
+        connection = self._connect()
+        try:
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                yield connection
+            except Exception:
+                connection.execute('ROLLBACK')
+                raise
+            connection.execute('COMMIT')
+        finally:
+            connection.close()
+
+    @contextmanager
+    def read(self):
+        """
+        Open connection for reads which do not need to be atomic with a
+        write, every statement sees the last committed state
+        :return: Instance of sqlite3.Connection
+        """
+        connection = self._connect()
+        try:
+            yield connection
+        finally:
+            connection.close()
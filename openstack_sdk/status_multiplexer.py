@@ -0,0 +1,310 @@
+# #######
+# Copyright (c) 2019 Cloudify Platform Ltd. All rights reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Standard imports
+import os
+import json
+import time
+import threading
+
+# Third party imports
+from openstack import exceptions
+
+# Local imports
+from openstack_sdk.shared_state import DEFAULT_STATE_PATH, SharedState
+
+# Client config key used to configure the status multiplexer
+STATUS_MULTIPLEXER_CONFIG = 'status_multiplexer'
+# Minimum period (in seconds) between two list requests for the same
+# resource type
+DEFAULT_TICK = 2
+# Period (in seconds) for which the poller of a resource type keeps its lease
+# without polling, after which another waiting operation takes over
+DEFAULT_LEASE = 10
+# Period (in seconds) for which a published status is used, older statuses
+# are ignored and registrations which were not read are dropped
+DEFAULT_STALE_AFTER = 10
+# Maximum number of registered resources which are fetched directly when
+# their type does not support id filtered lists, rather than paging through
+# the listing of the whole project until all of them are found
+DEFAULT_DIRECT_FETCH_LIMIT = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pending_statuses (
+    scope TEXT NOT NULL,
+    resource_type TEXT NOT NULL,
+    resource_id TEXT NOT NULL,
+    resource TEXT,
+    published_at REAL,
+    read_at REAL NOT NULL,
+    PRIMARY KEY (scope, resource_type, resource_id)
+);
+CREATE TABLE IF NOT EXISTS status_invalidations (
+    scope TEXT NOT NULL,
+    resource_type TEXT NOT NULL,
+    resource_id TEXT NOT NULL,
+    invalidated_at REAL NOT NULL,
+    PRIMARY KEY (scope, resource_type, resource_id)
+);
+CREATE TABLE IF NOT EXISTS status_pollers (
+    scope TEXT NOT NULL,
+    resource_type TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    polled_at REAL NOT NULL,
+    PRIMARY KEY (scope, resource_type)
+);
+"""
+
+
+def get_owner():
+    """
+    Get identity of the current poller, operations run in their own
+    processes and may wait on resources from executor threads
+    :return str: Poller identity
+    """
+    return '{0}-{1}'.format(os.getpid(), threading.current_thread().ident)
+
+
+class StatusMultiplexer(object):
+    """
+    Status of resources which operations are waiting on, shared between all
+    operation processes on the host. Waiting operations register their
+    resources, and one of them holds the lease of the resource type and
+    fetches the status of all registered resources of that type with a
+    single list request per tick, so that the status requests grow with
+    the number of resource types rather than the number of instances
+    """
+
+    def __init__(self,
+                 state,
+                 scope,
+                 tick=DEFAULT_TICK,
+                 lease=DEFAULT_LEASE,
+                 stale_after=DEFAULT_STALE_AFTER,
+                 direct_fetch_limit=DEFAULT_DIRECT_FETCH_LIMIT,
+                 logger=None):
+        self.state = state
+        self.scope = scope
+        self.tick = tick
+        self.lease = lease
+        self.stale_after = stale_after
+        self.direct_fetch_limit = direct_fetch_limit
+        self.logger = logger
+
+    @classmethod
+    def from_client_config(cls, client_config, logger=None):
+        """
+        Create status multiplexer from client config if it is enabled there
+        :param dict client_config: Openstack client configuration
+        :param logger: Logger used to report polling failures
+        :return: Instance of StatusMultiplexer or None
+        """
+        config = client_config.get(STATUS_MULTIPLEXER_CONFIG) or {}
+        if not config.get('enabled'):
+            return None
+        state = SharedState(config.get('path') or DEFAULT_STATE_PATH,
+                            schema=SCHEMA)
+        scope = '{0}:{1}:{2}'.format(
+            client_config.get('auth_url'),
+            client_config.get('region_name'),
+            client_config.get('project_id') or
+            client_config.get('project_name'))
+        return cls(state,
+                   scope,
+                   tick=config.get('tick', DEFAULT_TICK),
+                   lease=config.get('lease', DEFAULT_LEASE),
+                   stale_after=config.get('stale_after', DEFAULT_STALE_AFTER),
+                   direct_fetch_limit=config.get('direct_fetch_limit',
+                                                 DEFAULT_DIRECT_FETCH_LIMIT),
+                   logger=logger)
+
+    def get(self, resource):
+        """
+        Get the current state of resource as published by the poller of its
+        type, the resource is fetched directly when there is no recent
+        published state for it
+        :param resource: Instance of OpenstackResource with resource id
+        :return: Openstack SDK resource
+        """
+        resource_type = resource.resource_type
+        resource_id = resource.resource_id
+        now = time.time()
+        with self.state.transaction() as connection:
+            connection.execute(
+                'INSERT OR IGNORE INTO pending_statuses '
+                '(scope, resource_type, resource_id, read_at) '
+                'VALUES (?, ?, ?, ?)',
+                (self.scope, resource_type, resource_id, now))
+            connection.execute(
+                'UPDATE pending_statuses SET read_at = ? WHERE scope = ? '
+                'AND resource_type = ? AND resource_id = ?',
+                (now, self.scope, resource_type, resource_id))
+            is_poller = self._acquire_lease(connection, resource_type, now)
+
+        if is_poller:
+            self.poll(resource)
+
+        with self.state.read() as connection:
+            row = connection.execute(
+                'SELECT resource, published_at FROM pending_statuses '
+                'WHERE scope = ? AND resource_type = ? AND resource_id = ?',
+                (self.scope, resource_type, resource_id)).fetchone()
+
+        body, published_at = row if row else (None, None)
+        if not published_at or published_at < time.time() - self.stale_after:
+            return resource.get(fresh=True)
+        if body is None:
+            raise exceptions.ResourceNotFound(
+                'No {0} found for {1}'.format(resource_type, resource_id))
+        return resource.sdk_resource_class.existing(**json.loads(body))
+
+    def invalidate(self, resource_type, resource_id):
+        """
+        Drop the published status of resource, it must be called whenever
+        the resource is changed. Waiting operations fetch the resource
+        directly until its status is polled again, and statuses which were
+        fetched before the change are not published
+        :param str resource_type: Type of the changed resource
+        :param str resource_id: Id of the changed resource
+        """
+        with self.state.transaction() as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO status_invalidations '
+                '(scope, resource_type, resource_id, invalidated_at) '
+                'VALUES (?, ?, ?, ?)',
+                (self.scope, resource_type, resource_id, time.time()))
+            connection.execute(
+                'UPDATE pending_statuses SET resource = NULL, '
+                'published_at = NULL WHERE scope = ? AND resource_type = ? '
+                'AND resource_id = ?',
+                (self.scope, resource_type, resource_id))
+
+    def unregister(self, resource):
+        """
+        Stop fetching the status of resource, and give up the lease of its
+        type so that another waiting operation takes it over at once
+        :param resource: Instance of OpenstackResource with resource id
+        """
+        with self.state.transaction() as connection:
+            connection.execute(
+                'DELETE FROM pending_statuses WHERE scope = ? '
+                'AND resource_type = ? AND resource_id = ?',
+                (self.scope, resource.resource_type, resource.resource_id))
+            connection.execute(
+                'DELETE FROM status_pollers WHERE scope = ? '
+                'AND resource_type = ? AND owner = ?',
+                (self.scope, resource.resource_type, get_owner()))
+
+    def poll(self, resource):
+        """
+        Fetch the status of all registered resources of the resource type
+        and publish it
+        :param resource: Instance of OpenstackResource of the polled type
+        """
+        resource_type = resource.resource_type
+        with self.state.transaction() as connection:
+            # Operations which stopped reading their status are gone
+            connection.execute(
+                'DELETE FROM pending_statuses WHERE scope = ? '
+                'AND resource_type = ? AND read_at < ?',
+                (self.scope, resource_type, time.time() - self.stale_after))
+            # Statuses fetched before that are stale anyway
+            connection.execute(
+                'DELETE FROM status_invalidations WHERE scope = ? '
+                'AND resource_type = ? AND invalidated_at < ?',
+                (self.scope, resource_type, time.time() - self.stale_after))
+            ids = [row[0] for row in connection.execute(
+                'SELECT resource_id FROM pending_statuses WHERE scope = ? '
+                'AND resource_type = ?', (self.scope, resource_type))]
+        if not ids:
+            return
+
+        # Status is published as of the time it was requested, so that it
+        # is never considered newer than a change made during the request
+        observed_at = time.time()
+        try:
+            found = self._fetch(resource, ids)
+        except Exception as error:
+            # Waiting operations fetch their resources directly until the
+            # next poll succeeds
+            if self.logger:
+                self.logger.warning(
+                    'Failed to poll %s statuses: %s', resource_type, error)
+            return
+
+        with self.state.transaction() as connection:
+            changed = set(row[0] for row in connection.execute(
+                'SELECT resource_id FROM status_invalidations WHERE scope = ? '
+                'AND resource_type = ? AND invalidated_at >= ?',
+                (self.scope, resource_type, observed_at)))
+            connection.executemany(
+                'UPDATE pending_statuses SET resource = ?, published_at = ? '
+                'WHERE scope = ? AND resource_type = ? AND resource_id = ?',
+                [(json.dumps(found[resource_id].to_dict())
+                  if resource_id in found else None,
+                  observed_at, self.scope, resource_type, resource_id)
+                 for resource_id in ids if resource_id not in changed])
+
+    def _acquire_lease(self, connection, resource_type, now):
+        owner = get_owner()
+        row = connection.execute(
+            'SELECT owner, expires_at, polled_at FROM status_pollers '
+            'WHERE scope = ? AND resource_type = ?',
+            (self.scope, resource_type)).fetchone()
+        if row:
+            lease_owner, expires_at, polled_at = row
+            if lease_owner != owner and expires_at > now:
+                return False
+            if lease_owner == owner and polled_at > now - self.tick:
+                return False
+        connection.execute(
+            'INSERT OR REPLACE INTO status_pollers '
+            '(scope, resource_type, owner, expires_at, polled_at) '
+            'VALUES (?, ?, ?, ?, ?)',
+            (self.scope, resource_type, owner, now + self.lease, now))
+        return True
+
+    def _fetch(self, resource, ids):
+        if resource.supports_id_filter:
+            results = resource.get_many(ids)
+        elif len(ids) <= self.direct_fetch_limit:
+            # Few resources are fetched directly, since the listing may span
+            # many pages before all of them are found
+            results = resource._call_many(
+                ids, lambda item: item.get(fresh=True))
+        else:
+            return self._fetch_from_list(resource, ids)
+
+        for result in results:
+            # Only missing resources are published as not found
+            if result.error and not isinstance(
+                    result.error, exceptions.ResourceNotFound):
+                raise result.error
+        return dict((result.id, result.resource) for result in results
+                    if result.resource is not None)
+
+    def _fetch_from_list(self, resource, ids):
+        # Single paginated list request, which stops once all the
+        # registered resources are found
+        pending = set(ids)
+        found = {}
+        for item in resource.iterate():
+            if item.id in pending:
+                found[item.id] = item
+                pending.discard(item.id)
+                if not pending:
+                    break
+        return found
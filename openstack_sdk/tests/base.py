@@ -21,11 +21,15 @@ import mock
 # Third party imports
 from openstack import exceptions
 
+# Local imports
+from openstack_sdk.pool import connection_pool
+
 
 class OpenStackSDKTestBase(unittest.TestCase):
 
     def setUp(self):
         super(OpenStackSDKTestBase, self).setUp()
+        connection_pool.clear()
         self.connection = mock.patch('openstack.connect', mock.MagicMock())
 
     def tearDown(self):
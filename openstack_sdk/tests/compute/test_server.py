@@ -215,6 +215,54 @@ class ServerTestCase(base.OpenStackSDKTestBase):
         response = self.server_instance.delete()
         self.assertIsNone(response)
 
+    def test_delete_server_by_id_single_call(self):
+        self.server_instance.resource_id = \
+            'a34b5509-c122-4c2f-823e-884bb559afe8'
+        self.fake_client.get_server = mock.MagicMock()
+        self.fake_client.delete_server = mock.MagicMock(return_value=None)
+
+        self.server_instance.delete()
+        self.fake_client.get_server.assert_not_called()
+        self.fake_client.delete_server.assert_called_once_with(
+            'a34b5509-c122-4c2f-823e-884bb559afe8')
+
+    def test_delete_server_by_name(self):
+        server = openstack.compute.v2.server.Server(**{
+            'id': 'a34b5509-c122-4c2f-823e-884bb559afe8',
+            'name': 'test_server',
+        })
+        self.server_instance.name = 'test_server'
+        self.fake_client.get_server = mock.MagicMock(return_value=server)
+        self.fake_client.delete_server = mock.MagicMock(return_value=None)
+
+        self.server_instance.delete()
+        self.fake_client.get_server.assert_called_once_with('test_server')
+        self.fake_client.delete_server.assert_called_once_with(server)
+
+    def test_mutations_by_id_single_call(self):
+        self.server_instance.resource_id = \
+            'a34b5509-c122-4c2f-823e-884bb559afe8'
+        self.fake_client.get_server = mock.MagicMock()
+        for action in ('reboot_server', 'resume_server', 'suspend_server',
+                       'start_server', 'stop_server', 'backup_server',
+                       'rebuild_server', 'update_server'):
+            setattr(self.fake_client, action, mock.MagicMock())
+
+        self.server_instance.reboot('SOFT')
+        self.server_instance.resume()
+        self.server_instance.suspend()
+        self.server_instance.start()
+        self.server_instance.stop()
+        self.server_instance.backup('test_backup', 'daily', 1)
+        self.server_instance.rebuild('test_image', name='test_server')
+        self.server_instance.update({'name': 'new_test_server'})
+
+        self.fake_client.get_server.assert_not_called()
+        self.fake_client.reboot_server.assert_called_once_with(
+            'a34b5509-c122-4c2f-823e-884bb559afe8', 'SOFT')
+        self.fake_client.update_server.assert_called_once_with(
+            'a34b5509-c122-4c2f-823e-884bb559afe8', name='new_test_server')
+
     def test_reboot_server(self):
         server = openstack.compute.v2.server.Server(**{
             'id': 'a34b5509-c122-4c2f-823e-884bb559afe8',
@@ -366,6 +414,17 @@ class ServerTestCase(base.OpenStackSDKTestBase):
         response = self.server_instance.create_image('test-image')
         self.assertIsNone(response)
 
+    def test_get_console_output(self):
+        self.server_instance.resource_id = \
+            'a34b5509-c122-4c2f-823e-884bb559afe8'
+        self.fake_client.get_server_console_output = \
+            mock.MagicMock(return_value={'output': 'login:\n'})
+
+        response = self.server_instance.get_console_output(length=10)
+        self.assertEqual(response, 'login:\n')
+        self.fake_client.get_server_console_output.assert_called_once_with(
+            'a34b5509-c122-4c2f-823e-884bb559afe8', length=10)
+
     def test_start_server(self):
         server = openstack.compute.v2.server.Server(**{
             'id': 'a34b5509-c122-4c2f-823e-884bb559afe8',
@@ -283,3 +283,20 @@ class NetworkTestCase(base.OpenStackSDKTestBase):
 
         response = self.network_instance.delete()
         self.assertIsNone(response)
+
+    def test_delete_and_update_by_id_single_call(self):
+        self.network_instance.resource_id = \
+            'a95b5509-c122-4c2f-823e-884bb559afe8'
+        self.fake_client.get_network = mock.MagicMock()
+        self.fake_client.delete_network = mock.MagicMock(return_value=None)
+        self.fake_client.update_network = mock.MagicMock()
+
+        self.network_instance.update({'name': 'test_updated_network'})
+        self.network_instance.delete()
+
+        self.fake_client.get_network.assert_not_called()
+        self.fake_client.update_network.assert_called_once_with(
+            'a95b5509-c122-4c2f-823e-884bb559afe8',
+            name='test_updated_network')
+        self.fake_client.delete_network.assert_called_once_with(
+            'a95b5509-c122-4c2f-823e-884bb559afe8')
@@ -18,6 +18,7 @@ import mock
 
 # Third party imports
 import openstack.network.v2.port
+from openstack import exceptions
 
 # Local imports
 from openstack_sdk.tests import base
@@ -297,3 +298,62 @@ class PortTestCase(base.OpenStackSDKTestBase):
 
         response = self.port_instance.delete()
         self.assertIsNone(response)
+
+    def _get_put_response(self, status_code, body=None):
+        response = mock.MagicMock()
+        response.status_code = status_code
+        response.headers = {}
+        response.json.return_value = body or {}
+        return response
+
+    def test_conditional_update_port(self):
+        ports = [
+            openstack.network.v2.port.Port(
+                id='1', revision_number=revision_number,
+                security_group_ids=security_group_ids)
+            for revision_number, security_group_ids
+            in ((22, ['23', '24']), (23, ['23', '24', '25']))
+        ]
+        self.port_instance.resource_id = '1'
+        self.fake_client.get_port = mock.MagicMock(side_effect=ports)
+        self.fake_client.put = mock.MagicMock(side_effect=[
+            self._get_put_response(412),
+            self._get_put_response(
+                200, {'port': {'id': '1', 'revision_number': 24,
+                               'security_groups': ['24', '25']}})
+        ])
+
+        def _remove_security_group(port):
+            return {'security_group_ids': [
+                security_group_id
+                for security_group_id in port.security_group_ids
+                if security_group_id != '23']}
+
+        response = self.port_instance.conditional_update(
+            _remove_security_group)
+        self.assertEqual(response.security_group_ids, ['24', '25'])
+        self.assertEqual(self.fake_client.get_port.call_count, 2)
+        self.fake_client.put.assert_called_with(
+            '/ports/1',
+            json={'port': {'security_groups': ['24', '25']}},
+            headers={'If-Match': 'revision_number=23'})
+
+    def test_conditional_update_port_nothing_to_update(self):
+        port = openstack.network.v2.port.Port(id='1', revision_number=22)
+        self.fake_client.put = mock.MagicMock()
+        response = self.port_instance.conditional_update(
+            lambda remote_port: None, remote_resource=port)
+        self.assertIs(response, port)
+        self.fake_client.put.assert_not_called()
+
+    def test_conditional_update_port_exhausted(self):
+        self.port_instance.resource_id = '1'
+        self.fake_client.get_port = mock.MagicMock(
+            return_value=openstack.network.v2.port.Port(
+                id='1', revision_number=22))
+        self.fake_client.put = mock.MagicMock(
+            return_value=self._get_put_response(412))
+        with self.assertRaises(exceptions.HttpException):
+            self.port_instance.conditional_update(
+                lambda remote_port: {'name': 'test_port'}, max_attempts=2)
+        self.assertEqual(self.fake_client.put.call_count, 2)
@@ -0,0 +1,138 @@
+# #######
+# Copyright (c) 2019 Cloudify Platform Ltd. All rights reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Standard imports
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+import mock
+from distutils.version import LooseVersion
+
+# Local imports
+from openstack_sdk.broker import BrokerClient, BrokerError, BrokerServer
+from openstack_sdk.cache import build_discover
+from openstack_sdk.pool import ConnectionPool
+
+
+class BrokerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super(BrokerTestCase, self).setUp()
+        self.path = tempfile.mkdtemp()
+        self.socket_path = os.path.join(self.path, 'broker.sock')
+        self.broker_connection = mock.MagicMock()
+        auth = self.broker_connection.session.auth
+        auth.auth_ref = None
+
+        def _authorize():
+            auth.auth_ref = mock.MagicMock()
+            auth.auth_ref.will_expire_soon.return_value = False
+
+        self.broker_connection.authorize.side_effect = _authorize
+        self.broker_connection.session.auth.get_auth_state.return_value = \
+            'test_state'
+        self.broker_connection.session._discovery_cache = {
+            'http://compute': build_discover('http://compute', [{'id': 'v2'}])
+        }
+
+        self.broker_pool = ConnectionPool()
+        self.broker_pool._connect = mock.MagicMock(
+            return_value=self.broker_connection)
+        self.server = BrokerServer(self.socket_path, self.broker_pool)
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.path, ignore_errors=True)
+        super(BrokerTestCase, self).tearDown()
+
+    @property
+    def client_config(self):
+        return {
+            'auth_url': 'test_auth_url',
+            'username': 'test_username',
+            'password': 'test_password',
+            'project_name': 'test_project_name',
+            'region_name': 'test_region_name',
+            'broker': {
+                'enabled': True,
+                'socket_path': self.socket_path
+            }
+        }
+
+    def test_from_client_config_disabled(self):
+        client_config = self.client_config
+        client_config['broker']['enabled'] = False
+        self.assertIsNone(BrokerClient.from_client_config(client_config))
+
+    def test_from_client_config_broker_not_running(self):
+        client_config = self.client_config
+        client_config['broker']['socket_path'] = \
+            os.path.join(self.path, 'missing.sock')
+        self.assertIsNone(BrokerClient.from_client_config(client_config))
+
+    def test_request(self):
+        client = BrokerClient.from_client_config(self.client_config)
+        response = client.request(self.client_config)
+        self.assertEqual(response['auth_state'], 'test_state')
+        self.assertEqual(response['discovery'],
+                         {'http://compute': [{'id': 'v2'}]})
+
+        client.request(self.client_config)
+        self.broker_connection.authorize.assert_called_once_with()
+        client_config = self.client_config
+        del client_config['broker']
+        self.broker_pool._connect.assert_called_once_with(client_config)
+
+    def test_request_failure(self):
+        self.broker_connection.authorize.side_effect = Exception('error')
+        client = BrokerClient.from_client_config(self.client_config)
+        with self.assertRaises(BrokerError):
+            client.request(self.client_config)
+
+    @mock.patch('openstack.connect')
+    def test_pool_authorize_through_broker(self, mock_connect):
+        connection = mock.MagicMock()
+        connection.session._discovery_cache = {}
+        mock_connect.return_value = connection
+        ConnectionPool().get(self.client_config)
+
+        connection.authorize.assert_not_called()
+        connection.session.auth.set_auth_state.assert_called_once_with(
+            'test_state')
+        self.assertEqual(
+            connection.session._discovery_cache['http://compute']._data,
+            [{'id': 'v2'}])
+
+    @mock.patch('openstack_sdk.cache.KEYSTONEAUTH_VERSION',
+                LooseVersion('5.1.0'))
+    def test_request_unsupported_keystoneauth(self):
+        client = BrokerClient.from_client_config(self.client_config)
+        response = client.request(self.client_config)
+        self.assertEqual(response['auth_state'], 'test_state')
+        self.assertEqual(response['discovery'], {})
+
+    @mock.patch('openstack.connect')
+    def test_pool_fallback_to_direct_connection(self, mock_connect):
+        self.broker_connection.authorize.side_effect = Exception('error')
+        connection = mock.MagicMock()
+        mock_connect.return_value = connection
+        self.assertIs(ConnectionPool().get(self.client_config), connection)
+        connection.session.auth.set_auth_state.assert_not_called()
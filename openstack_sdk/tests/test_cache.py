@@ -0,0 +1,236 @@
+# #######
+# Copyright (c) 2019 Cloudify Platform Ltd. All rights reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Standard imports
+import os
+import time
+import shutil
+import datetime
+import tempfile
+import unittest
+import mock
+from distutils.version import LooseVersion
+
+# Third party imports
+from keystoneauth1 import discover
+
+# Local imports
+from openstack_sdk.cache import DiscoveryCache, FileCache, TokenCache
+from openstack_sdk.pool import ConnectionPool
+
+
+class FileCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super(FileCacheTestCase, self).setUp()
+        self.path = tempfile.mkdtemp()
+        self.cache = FileCache(self.path, 'test_secret')
+
+    def tearDown(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+        super(FileCacheTestCase, self).tearDown()
+
+    def test_store_and_load(self):
+        self.cache.store('test_key', {'a': 'b'})
+        self.assertEqual(self.cache.load('test_key'), {'a': 'b'})
+
+    def test_encrypted_at_rest(self):
+        self.cache.store('test_key', {'token': 'test_token'})
+        with open(os.path.join(self.path, 'test_key.cache'), 'rb') as f:
+            self.assertNotIn(b'test_token', f.read())
+
+    def test_load_with_wrong_secret(self):
+        self.cache.store('test_key', {'a': 'b'})
+        other_cache = FileCache(self.path, 'other_secret')
+        self.assertIsNone(other_cache.load('test_key'))
+
+    def test_load_tampered_entry(self):
+        self.cache.store('test_key', {'a': 'b'})
+        cache_file = os.path.join(self.path, 'test_key.cache')
+        with open(cache_file, 'rb') as f:
+            data = bytearray(f.read())
+        data[-1] ^= 1
+        with open(cache_file, 'wb') as f:
+            f.write(bytes(data))
+        self.assertIsNone(self.cache.load('test_key'))
+
+    def test_load_expired_entry(self):
+        self.cache.store('test_key', {'a': 'b'}, expires_at=time.time() - 1)
+        self.assertIsNone(self.cache.load('test_key'))
+
+    def test_invalidate(self):
+        self.cache.store('test_key', {'a': 'b'})
+        self.cache.invalidate('test_key')
+        self.assertIsNone(self.cache.load('test_key'))
+
+
+class DiscoveryCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super(DiscoveryCacheTestCase, self).setUp()
+        self.path = tempfile.mkdtemp()
+        self.file_cache = FileCache(self.path, 'test_secret')
+
+    def tearDown(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+        super(DiscoveryCacheTestCase, self).tearDown()
+
+    def _get_discover(self, url, version='v2.1'):
+        disc = discover.Discover.__new__(discover.Discover)
+        disc._url = url
+        disc._data = [{'id': version, 'status': 'CURRENT',
+                       'min_version': '2.1', 'version': '2.72',
+                       'links': [{'href': url, 'rel': 'self'}]}]
+        return disc
+
+    def _get_response(self, status_code, content_type):
+        response = mock.MagicMock()
+        response.status_code = status_code
+        response.headers = {'Content-Type': content_type}
+        return response
+
+    def test_discovery_shared_between_caches(self):
+        session = mock.MagicMock()
+        session.session.hooks = {'response': []}
+        first = DiscoveryCache(self.file_cache, 'test_key')
+        first.attach(session)
+        first['http://compute'] = self._get_discover('http://compute')
+
+        second = DiscoveryCache(self.file_cache, 'test_key')
+        second.attach(session)
+        self.assertEqual(second['http://compute']._data,
+                         first['http://compute']._data)
+        self.assertIs(session._discovery_cache, second)
+        self.assertEqual(
+            second['http://compute'].version_data()[0]['max_microversion'],
+            (2, 72))
+
+    @mock.patch('openstack_sdk.cache.KEYSTONEAUTH_VERSION',
+                LooseVersion('5.1.0'))
+    def test_discovery_unsupported_keystoneauth(self):
+        session = mock.MagicMock()
+        session.session.hooks = {'response': []}
+        cache = DiscoveryCache(self.file_cache, 'test_key')
+        self.assertFalse(cache.attach(session))
+        self.assertIsNot(session._discovery_cache, cache)
+        self.assertEqual(session.session.hooks['response'], [])
+
+    def test_persist_only_changed_discovery(self):
+        cache = DiscoveryCache(self.file_cache, 'test_key')
+        with mock.patch.object(cache, 'persist') as mock_persist:
+            cache['http://compute'] = self._get_discover('http://compute')
+            cache['http://compute'] = self._get_discover('http://compute')
+        mock_persist.assert_called_once_with()
+
+    @mock.patch('openstack_sdk.cache.time.time')
+    def test_discovery_expired(self, mock_time):
+        mock_time.return_value = 100
+        cache = DiscoveryCache(self.file_cache, 'test_key', ttl=10)
+        cache['http://compute'] = self._get_discover('http://compute')
+
+        mock_time.return_value = 111
+        expired = DiscoveryCache(self.file_cache, 'test_key', ttl=10)
+        expired.load()
+        self.assertEqual(expired, {})
+
+    def test_response_hook_invalidates(self):
+        cache = DiscoveryCache(self.file_cache, 'test_key')
+        cache['http://compute'] = self._get_discover('http://compute')
+
+        cache.response_hook(self._get_response(404, 'application/json'))
+        self.assertIn('http://compute', cache)
+
+        cache.response_hook(self._get_response(404, 'text/html'))
+        self.assertEqual(cache, {})
+
+        cache['http://compute'] = self._get_discover('http://compute')
+        cache.response_hook(self._get_response(300, 'application/json'))
+        self.assertEqual(cache, {})
+        self.assertIsNone(self.file_cache.load('test_key'))
+
+
+class TokenCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super(TokenCacheTestCase, self).setUp()
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+        super(TokenCacheTestCase, self).tearDown()
+
+    @property
+    def client_config(self):
+        return {
+            'auth_url': 'test_auth_url',
+            'username': 'test_username',
+            'password': 'test_password',
+            'project_name': 'test_project_name',
+            'region_name': 'test_region_name',
+            'token_cache': {
+                'enabled': True,
+                'path': self.path,
+                'expiry_margin': 60
+            }
+        }
+
+    def _get_connection(self, expires_in):
+        connection = mock.MagicMock()
+        connection.session.auth.auth_ref.expires = \
+            datetime.datetime.utcnow() + datetime.timedelta(seconds=expires_in)
+        connection.session.auth.get_auth_state.return_value = 'test_state'
+        return connection
+
+    def test_from_client_config_disabled(self):
+        client_config = self.client_config
+        del client_config['token_cache']
+        self.assertIsNone(TokenCache.from_client_config(client_config))
+
+    def test_key_ignores_non_identity_keys(self):
+        other_config = self.client_config
+        other_config['region_name'] = 'other_region_name'
+        self.assertEqual(
+            TokenCache.from_client_config(self.client_config).key,
+            TokenCache.from_client_config(other_config).key)
+
+    def test_authorize_reuses_cached_token(self):
+        first = self._get_connection(3600)
+        TokenCache.from_client_config(self.client_config).authorize(first)
+        first.authorize.assert_called_once_with()
+
+        second = self._get_connection(3600)
+        TokenCache.from_client_config(self.client_config).authorize(second)
+        second.authorize.assert_not_called()
+        second.session.auth.set_auth_state.assert_called_once_with(
+            'test_state')
+
+    def test_authorize_token_within_expiry_margin(self):
+        first = self._get_connection(30)
+        TokenCache.from_client_config(self.client_config).authorize(first)
+
+        second = self._get_connection(3600)
+        TokenCache.from_client_config(self.client_config).authorize(second)
+        second.authorize.assert_called_once_with()
+        second.session.auth.set_auth_state.assert_not_called()
+
+    @mock.patch('openstack.connect')
+    def test_pool_uses_token_cache(self, mock_connect):
+        mock_connect.return_value = self._get_connection(3600)
+        ConnectionPool().get(self.client_config)
+
+        client_config = self.client_config
+        del client_config['token_cache']
+        mock_connect.assert_called_once_with(**client_config)
+        mock_connect.return_value.authorize.assert_called_once_with()
@@ -0,0 +1,191 @@
+# #######
+# Copyright (c) 2019 Cloudify Platform Ltd. All rights reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Standard imports
+import os
+import shutil
+import tempfile
+import unittest
+import mock
+
+# Third party imports
+from keystoneauth1.exceptions import ConnectFailure
+
+# Local imports
+from openstack_sdk.circuit_breaker import (CircuitBreaker,
+                                           CircuitOpenError,
+                                           add_circuit_breaker_listener,
+                                           remove_circuit_breaker_listener)
+from openstack_sdk.pool import ConnectionPool
+from openstack_sdk.retry import RetryPolicy
+
+
+def get_response(status_code):
+    response = mock.MagicMock()
+    response.status_code = status_code
+    return response
+
+
+@mock.patch('openstack_sdk.circuit_breaker.time.time')
+class CircuitBreakerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super(CircuitBreakerTestCase, self).setUp()
+        self.path = tempfile.mkdtemp()
+        self.events = []
+        add_circuit_breaker_listener(self.events.append)
+
+    def tearDown(self):
+        remove_circuit_breaker_listener(self.events.append)
+        shutil.rmtree(self.path, ignore_errors=True)
+        super(CircuitBreakerTestCase, self).tearDown()
+
+    @property
+    def client_config(self):
+        return {
+            'auth_url': 'test_auth_url',
+            'username': 'test_username',
+            'password': 'test_password',
+            'project_name': 'test_project_name',
+            'region_name': 'test_region_name',
+            'circuit_breaker': {
+                'enabled': True,
+                'path': os.path.join(self.path, 'state.db'),
+                'failure_threshold': 2,
+                'cooldown': 10
+            }
+        }
+
+    def _get_request(self, breaker, *responses):
+        request = mock.MagicMock(side_effect=responses)
+        return request, breaker(request)
+
+    def _send(self, wrapped_request, service_type='volume'):
+        return wrapped_request(
+            'volumes', 'GET',
+            endpoint_filter={'service_type': service_type})
+
+    def test_from_client_config_disabled(self, _):
+        client_config = self.client_config
+        del client_config['circuit_breaker']
+        self.assertIsNone(CircuitBreaker.from_client_config(client_config))
+
+    def test_opens_after_consecutive_failures(self, mock_time):
+        mock_time.return_value = 100
+        breaker = CircuitBreaker.from_client_config(self.client_config)
+        request, wrapped_request = self._get_request(
+            breaker, get_response(503), get_response(200),
+            get_response(503), ConnectFailure())
+
+        self._send(wrapped_request)
+        self._send(wrapped_request)
+        self._send(wrapped_request)
+        with self.assertRaises(ConnectFailure):
+            self._send(wrapped_request)
+
+        with self.assertRaises(CircuitOpenError) as error:
+            self._send(wrapped_request)
+        self.assertEqual(error.exception.retry_after, 10)
+        self.assertEqual(request.call_count, 4)
+        self.assertTrue(RetryPolicy.is_transient(error.exception))
+        self.assertEqual(
+            [(event['from_state'], event['to_state'])
+             for event in self.events],
+            [('closed', 'open')])
+
+        # Other services are not affected
+        request.side_effect = [get_response(200)]
+        self._send(wrapped_request, service_type='compute')
+
+    def test_closed_breaker_does_not_write(self, mock_time):
+        mock_time.return_value = 100
+        breaker = CircuitBreaker.from_client_config(self.client_config)
+        _, wrapped_request = self._get_request(
+            breaker, get_response(200), get_response(503), get_response(200))
+
+        with mock.patch.object(breaker.state, 'transaction',
+                               wraps=breaker.state.transaction) as write:
+            self._send(wrapped_request)
+            write.assert_not_called()
+
+            # Failure count changes, so it is written
+            self._send(wrapped_request)
+            self._send(wrapped_request)
+            self.assertEqual(write.call_count, 2)
+
+    def test_shared_between_breakers(self, mock_time):
+        mock_time.return_value = 100
+        first = CircuitBreaker.from_client_config(self.client_config)
+        first.record_failure('volume')
+        first.record_failure('volume')
+
+        second = CircuitBreaker.from_client_config(self.client_config)
+        with self.assertRaises(CircuitOpenError):
+            second.before_request('volume')
+
+    def test_half_open_probe_success(self, mock_time):
+        mock_time.return_value = 100
+        breaker = CircuitBreaker.from_client_config(self.client_config)
+        breaker.record_failure('volume')
+        breaker.record_failure('volume')
+
+        mock_time.return_value = 111
+        breaker.before_request('volume')
+        # Only one probe is allowed per cooldown period
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_request('volume')
+
+        breaker.record_success('volume')
+        breaker.before_request('volume')
+        self.assertEqual(
+            [(event['from_state'], event['to_state'])
+             for event in self.events],
+            [('closed', 'open'), ('open', 'half_open'),
+             ('half_open', 'closed')])
+
+    def test_half_open_probe_failure(self, mock_time):
+        mock_time.return_value = 100
+        breaker = CircuitBreaker.from_client_config(self.client_config)
+        breaker.record_failure('volume')
+        breaker.record_failure('volume')
+
+        mock_time.return_value = 111
+        breaker.before_request('volume')
+        breaker.record_failure('volume')
+
+        mock_time.return_value = 115
+        with self.assertRaises(CircuitOpenError) as error:
+            breaker.before_request('volume')
+        self.assertEqual(error.exception.retry_after, 6)
+        self.assertEqual(self.events[-1]['to_state'], 'open')
+
+    @mock.patch('openstack_sdk.retry.time.sleep')
+    @mock.patch('openstack.connect')
+    def test_pool_installs_circuit_breaker(self,
+                                           mock_connect,
+                                           mock_sleep,
+                                           mock_time):
+        mock_time.return_value = 100
+        request = mock.MagicMock(return_value=get_response(500))
+        mock_connect.return_value.session.request = request
+        connection = ConnectionPool().get(self.client_config)
+
+        self._send(connection.session.request)
+        self._send(connection.session.request)
+        # Breaker records the outcome of the request once its retries are
+        # exhausted
+        self.assertEqual(request.call_count, 6)
+        with self.assertRaises(CircuitOpenError):
+            self._send(connection.session.request)
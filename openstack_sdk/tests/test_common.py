@@ -19,10 +19,21 @@ import mock
 
 # Third part imports
 import openstack.compute.v2.server
+import openstack.network.v2.network
+from openstack import exceptions
 
 # Local imports
 from openstack_sdk.resources import get_server_password
-from openstack_sdk.common import OpenstackResource
+from openstack_sdk.common import (OpenstackResource,
+                                  raise_for_failures,
+                                  resource_cache)
+from openstack_sdk.executor import ExecutorError
+from openstack_sdk.resources.compute import (OpenstackHostAggregate,
+                                             OpenstackServer)
+from openstack_sdk.resources.identity import OpenstackProject
+from openstack_sdk.resources.networks import OpenstackNetwork
+from openstack_sdk.resources.volume import OpenstackVolume
+from openstack_sdk.pool import connection_pool
 
 
 @mock.patch('openstack.connect')
@@ -30,6 +41,7 @@ class OpenStackCommonBase(unittest.TestCase):
 
     def setUp(self):
         super(OpenStackCommonBase, self).setUp()
+        connection_pool.clear()
 
     @mock.patch('openstack.proxy.Proxy')
     def test_get_server(self, mock_proxy, _):
@@ -136,3 +148,342 @@ class OpenStackCommonBase(unittest.TestCase):
         )
         with self.assertRaises(NotImplementedError):
             resource.list()
+
+    def test_lazy_connection(self, mock_connect):
+        resource = OpenstackResource(
+            client_config={'foo': 'foo', 'bar': 'bar'},
+            resource_config={'name': 'foo-name'}
+        )
+        mock_connect.assert_not_called()
+
+        self.assertIs(resource.connection, mock_connect.return_value)
+        self.assertIs(resource.connection, mock_connect.return_value)
+        mock_connect.assert_called_once_with(foo='foo', bar='bar')
+
+
+@mock.patch('openstack.connect')
+class ResourceCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super(ResourceCacheTestCase, self).setUp()
+        connection_pool.clear()
+
+    def _get_network(self, mock_connect, **config):
+        network = OpenstackNetwork(client_config={'foo': 'foo'},
+                                   resource_config=config,
+                                   logger=mock.MagicMock())
+        get_network = mock_connect.return_value.network.get_network
+        get_network.return_value = mock.MagicMock(
+            id='a95b5509-c122-4c2f-823e-884bb559afe9')
+        return network, get_network
+
+    def test_get_not_cached_outside_scope(self, mock_connect):
+        network, get_network = self._get_network(
+            mock_connect, id='a95b5509-c122-4c2f-823e-884bb559afe9')
+        network.get()
+        network.get()
+        self.assertEqual(get_network.call_count, 2)
+
+    def test_get_cached_in_scope(self, mock_connect):
+        network, get_network = self._get_network(
+            mock_connect, id='a95b5509-c122-4c2f-823e-884bb559afe9')
+        other_network, _ = self._get_network(
+            mock_connect, id='a95b5509-c122-4c2f-823e-884bb559afe9')
+        with resource_cache.scope():
+            self.assertIs(network.get(), other_network.get())
+            get_network.assert_called_once_with(
+                'a95b5509-c122-4c2f-823e-884bb559afe9')
+
+            # Polling bypass the cache
+            network.get(fresh=True)
+            self.assertEqual(get_network.call_count, 2)
+        network.get()
+        self.assertEqual(get_network.call_count, 3)
+
+    def test_get_invalidated_by_mutation(self, mock_connect):
+        network, get_network = self._get_network(
+            mock_connect, id='a95b5509-c122-4c2f-823e-884bb559afe9')
+        with resource_cache.scope():
+            network.get()
+            network.update({'name': 'new_name'})
+            network.get()
+        self.assertEqual(get_network.call_count, 2)
+
+    def test_get_by_name_invalidated_by_mutation(self, mock_connect):
+        network, get_network = self._get_network(mock_connect,
+                                                 name='test_network')
+        other_network, _ = self._get_network(
+            mock_connect, id='a95b5509-c122-4c2f-823e-884bb559afe9')
+        with resource_cache.scope():
+            network.get()
+            other_network.get()
+            self.assertEqual(get_network.call_count, 1)
+
+            network.delete()
+            other_network.get()
+        self.assertEqual(get_network.call_count, 2)
+
+
+@mock.patch('openstack.connect')
+class GetManyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super(GetManyTestCase, self).setUp()
+        connection_pool.clear()
+
+    def test_get_many_by_id_filter(self, mock_connect):
+        network = OpenstackNetwork(client_config={'foo': 'foo'},
+                                   logger=mock.MagicMock())
+        response = mock.MagicMock(status_code=200)
+        response.json.return_value = {
+            'networks': [{'id': 'a95b5509-c122-4c2f-823e-884bb559afe2',
+                          'router:external': True}]
+        }
+        mock_connect.return_value.network.get.return_value = response
+
+        first, second = network.get_many(
+            ['a95b5509-c122-4c2f-823e-884bb559afe1',
+             'a95b5509-c122-4c2f-823e-884bb559afe2'])
+        mock_connect.return_value.network.get.assert_called_once_with(
+            '/networks',
+            params={'id': ['a95b5509-c122-4c2f-823e-884bb559afe1',
+                           'a95b5509-c122-4c2f-823e-884bb559afe2']})
+        self.assertEqual(first.id, 'a95b5509-c122-4c2f-823e-884bb559afe1')
+        self.assertIsNone(first.resource)
+        self.assertIsInstance(first.error, exceptions.ResourceNotFound)
+        self.assertEqual(second.id, 'a95b5509-c122-4c2f-823e-884bb559afe2')
+        self.assertTrue(second.resource.is_router_external)
+        self.assertIsNone(second.error)
+
+    def test_get_many_concurrently(self, mock_connect):
+        volume = OpenstackVolume(client_config={'foo': 'foo'},
+                                 logger=mock.MagicMock())
+        error = exceptions.ResourceNotFound()
+
+        def _get_volume(volume_id):
+            if volume_id == 'a95b5509-c122-4c2f-823e-884bb559afe2':
+                raise error
+            return mock.MagicMock(id=volume_id)
+
+        mock_connect.return_value.block_storage.get_volume.side_effect = \
+            _get_volume
+        ids = ['a95b5509-c122-4c2f-823e-884bb559afe{0}'.format(index)
+               for index in range(1, 6)]
+        results = volume.get_many(ids)
+
+        self.assertEqual([result.id for result in results], ids)
+        self.assertIs(results[1].error, error)
+        self.assertEqual(results[0].resource.id, ids[0])
+        self.assertIsNone(results[0].error)
+        self.assertIsNone(volume.resource_id)
+
+    def test_delete_many(self, mock_connect):
+        network = OpenstackNetwork(client_config={'foo': 'foo'},
+                                   logger=mock.MagicMock())
+        error = exceptions.HttpException(http_status=409)
+
+        def _delete_network(network_id):
+            if network_id == 'a95b5509-c122-4c2f-823e-884bb559afe2':
+                raise error
+
+        mock_connect.return_value.network.delete_network.side_effect = \
+            _delete_network
+        ids = ['a95b5509-c122-4c2f-823e-884bb559afe1',
+               'a95b5509-c122-4c2f-823e-884bb559afe2']
+        results = network.delete_many(ids)
+
+        self.assertEqual([result.id for result in results], ids)
+        self.assertIsNone(results[0].error)
+        self.assertIs(results[1].error, error)
+        with self.assertRaises(ExecutorError) as raised:
+            raise_for_failures(results)
+        self.assertEqual(raised.exception.errors, {1: error})
+
+    def test_list_many(self, mock_connect):
+        network = OpenstackNetwork(client_config={'foo': 'foo'},
+                                   logger=mock.MagicMock())
+        mock_connect.return_value.network.networks.side_effect = \
+            lambda **query: iter([mock.MagicMock(project_id=query[
+                'project_id'])])
+
+        networks = network.list_many([{'project_id': 'first'},
+                                      {'project_id': 'second'}])
+        self.assertEqual(
+            [[item.project_id for item in items] for items in networks],
+            [['first'], ['second']])
+
+    def test_list_many_servers(self, mock_connect):
+        server = OpenstackServer(client_config={'foo': 'foo'},
+                                 logger=mock.MagicMock())
+        mock_connect.return_value.compute.servers.return_value = iter([])
+
+        server.list_many([{'project_id': 'first'}])
+        mock_connect.return_value.compute.servers.assert_called_once_with(
+            True, False, project_id='first')
+
+    def test_list_many_without_query_support(self, mock_connect):
+        aggregate = OpenstackHostAggregate(client_config={'foo': 'foo'},
+                                           logger=mock.MagicMock())
+        mock_connect.return_value.compute.aggregates.side_effect = \
+            lambda: iter([mock.MagicMock(id='1')])
+
+        self.assertEqual(
+            [[item.id for item in items]
+             for items in aggregate.list_many([None, {}])],
+            [['1'], ['1']])
+        with self.assertRaises(exceptions.InvalidResourceQuery):
+            aggregate.list_many([{'project_id': 'first'}])
+
+
+@mock.patch('openstack.connect')
+class IterateTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super(IterateTestCase, self).setUp()
+        connection_pool.clear()
+        self.fetched = []
+
+    def _networks(self, **query):
+        for index in range(5):
+            self.fetched.append(index)
+            yield mock.MagicMock(id=str(index))
+
+    def _get_network(self, mock_connect):
+        mock_connect.return_value.network.networks.side_effect = \
+            self._networks
+        return OpenstackNetwork(client_config={'foo': 'foo'},
+                                logger=mock.MagicMock())
+
+    def test_iterate_page_size(self, mock_connect):
+        network = self._get_network(mock_connect)
+        resources = network.iterate(query={'name': 'test'}, page_size=2,
+                                    max_items=3)
+
+        self.assertEqual([item.id for item in resources], ['0', '1', '2'])
+        mock_connect.return_value.network.networks.assert_called_once_with(
+            name='test', limit=2)
+        self.assertEqual(self.fetched, [0, 1, 2])
+
+    def test_iterate_without_pagination(self, mock_connect):
+        project = OpenstackProject(client_config={'foo': 'foo'},
+                                   logger=mock.MagicMock())
+        mock_connect.return_value.identity.projects.return_value = \
+            iter([mock.MagicMock(id='1')])
+
+        self.assertEqual(len(list(project.iterate(page_size=2))), 1)
+        mock_connect.return_value.identity.projects.assert_called_once_with()
+
+    def test_first_match(self, mock_connect):
+        network = self._get_network(mock_connect)
+
+        matched = network.first_match(lambda item: item.id == '1')
+        self.assertEqual(matched.id, '1')
+        self.assertEqual(self.fetched, [0, 1])
+        self.assertIsNone(network.first_match(lambda item: False))
+
+    def test_count(self, mock_connect):
+        network = self._get_network(mock_connect)
+
+        self.assertEqual(network.count(), 5)
+        self.fetched = []
+        self.assertEqual(network.count(max_items=2), 2)
+        self.assertEqual(self.fetched, [0, 1])
+
+
+@mock.patch('openstack.connect')
+class ProjectedTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super(ProjectedTestCase, self).setUp()
+        connection_pool.clear()
+
+    def _get_response(self, body):
+        response = mock.MagicMock(status_code=200)
+        response.json.return_value = body
+        return response
+
+    def test_list_fields_selected_by_api(self, mock_connect):
+        network = OpenstackNetwork(client_config={'foo': 'foo'},
+                                   logger=mock.MagicMock())
+        mock_connect.return_value.network.get.side_effect = [
+            self._get_response({
+                'networks': [{'id': 'a95b5509-c122-4c2f-823e-884bb559afe1',
+                              'router:external': True}],
+                'networks_links': [{'rel': 'next',
+                                    'href': 'http://network/next'}]
+            }),
+            self._get_response({
+                'networks': [{'id': 'a95b5509-c122-4c2f-823e-884bb559afe2',
+                              'router:external': False}]
+            })
+        ]
+
+        networks = list(network.list({'project_id': 'test_project'},
+                                     fields=['id', 'is_router_external']))
+        self.assertEqual(networks, [
+            {'id': 'a95b5509-c122-4c2f-823e-884bb559afe1',
+             'is_router_external': True},
+            {'id': 'a95b5509-c122-4c2f-823e-884bb559afe2',
+             'is_router_external': False}])
+        get = mock_connect.return_value.network.get
+        get.assert_any_call('/networks',
+                            params={'project_id': 'test_project',
+                                    'fields': ['id', 'router:external']})
+        get.assert_called_with('http://network/next', params=None)
+        mock_connect.return_value.network.networks.assert_not_called()
+
+    def test_get_fields_selected_by_api(self, mock_connect):
+        network = OpenstackNetwork(
+            client_config={'foo': 'foo'},
+            resource_config={'id': 'a95b5509-c122-4c2f-823e-884bb559afe1'},
+            logger=mock.MagicMock())
+        mock_connect.return_value.network.get.return_value = \
+            self._get_response({
+                'network': {'id': 'a95b5509-c122-4c2f-823e-884bb559afe1',
+                            'status': 'ACTIVE'}
+            })
+        self.assertEqual(network.get(fields=['status']),
+                         {'status': 'ACTIVE'})
+        mock_connect.return_value.network.get.assert_called_once_with(
+            '/networks/a95b5509-c122-4c2f-823e-884bb559afe1',
+            params={'fields': ['status']})
+
+    def test_list_fields_projected_on_client(self, mock_connect):
+        volume = OpenstackVolume(client_config={'foo': 'foo'},
+                                 logger=mock.MagicMock())
+        remote_volume = mock.MagicMock()
+        remote_volume.to_dict.return_value = {
+            'id': 'a95b5509-c122-4c2f-823e-884bb559afe1',
+            'name': 'test_volume',
+            'status': 'available'
+        }
+        mock_connect.return_value.block_storage.volumes.return_value = \
+            [remote_volume]
+        self.assertEqual(list(volume.list(fields=['id', 'status'])),
+                         [{'id': 'a95b5509-c122-4c2f-823e-884bb559afe1',
+                           'status': 'available'}])
+
+
+class GetChangesTestCase(unittest.TestCase):
+
+    def test_get_changes(self):
+        remote_network = openstack.network.v2.network.Network(**{
+            'id': 'a95b5509-c122-4c2f-823e-884bb559afe1',
+            'name': 'test_network',
+            'description': '',
+            'admin_state_up': True,
+            'router:external': False,
+        })
+        changes = OpenstackResource.get_changes(remote_network, {
+            'name': 'test_network',
+            'description': None,
+            'admin_state_up': False,
+            'is_router_external': False,
+            'router:external': True,
+            'unknown_attribute': 'value'
+        })
+        self.assertEqual(changes, {
+            'admin_state_up': (True, False),
+            'router:external': (False, True),
+            'unknown_attribute': (None, 'value')
+        })
@@ -0,0 +1,126 @@
+# #######
+# Copyright (c) 2019 Cloudify Platform Ltd. All rights reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Standard imports
+import unittest
+
+# Local imports
+from openstack_sdk.console_probe import ConsoleProbe
+
+FINISHED_MARKER = 'finished at'
+
+
+class FakeConsole(object):
+    """
+    Local stand-in of server console log, which returns the last lines of
+    the log just like the compute API does
+    """
+
+    def __init__(self):
+        self.lines = []
+        self.requested_lengths = []
+
+    def write(self, *lines):
+        self.lines.extend(lines)
+
+    def get_console_output(self, length=None):
+        self.requested_lengths.append(length)
+        lines = self.lines[-length:] if length else self.lines
+        return ''.join(line + '\n' for line in lines)
+
+
+class ConsoleProbeTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super(ConsoleProbeTestCase, self).setUp()
+        self.console = FakeConsole()
+
+    def _boot(self, count, start=0):
+        self.console.write(*['Starting unit {0}'.format(index)
+                             for index in range(start, start + count)])
+
+    def test_ready_once_marker_written(self):
+        probe = ConsoleProbe(self.console, [FINISHED_MARKER], tail_lines=5)
+        self._boot(3)
+        self.assertFalse(probe.check())
+
+        self.console.write('Cloud-init v. 18.5 finished at Mon, 01 Jul 2019')
+        self.assertTrue(probe.check())
+
+    def test_only_tail_fetched(self):
+        probe = ConsoleProbe(self.console, [FINISHED_MARKER], tail_lines=5)
+        self._boot(10)
+        self.assertFalse(probe.check())
+        # The first check reads the whole log once
+        self.assertEqual(self.console.requested_lengths, [5, None])
+
+        self.console.requested_lengths = []
+        for index in range(10, 20, 2):
+            self._boot(2, start=index)
+            self.assertFalse(probe.check())
+        self.assertEqual(self.console.requested_lengths, [5] * 5)
+        self.assertEqual(probe.offset, len(self.console.get_console_output()))
+
+    def test_whole_log_fetched_when_tail_missed_lines(self):
+        probe = ConsoleProbe(self.console, [FINISHED_MARKER], tail_lines=5)
+        self._boot(10)
+        self.assertFalse(probe.check())
+
+        # Marker is not part of the tail anymore
+        self.console.write('Cloud-init v. 18.5 finished at Mon, 01 Jul 2019')
+        self._boot(10, start=10)
+        self.console.requested_lengths = []
+        self.assertTrue(probe.check())
+        self.assertEqual(self.console.requested_lengths, [5, None])
+
+    def test_marker_written_across_checks(self):
+        probe = ConsoleProbe(self.console, [FINISHED_MARKER], tail_lines=5)
+        self._boot(2)
+        self.console.lines.append('Cloud-init v. 18.5 finis')
+        self.assertFalse(probe.check())
+
+        self.console.lines[-1] += 'hed at Mon, 01 Jul 2019'
+        self.assertTrue(probe.check())
+
+    def test_repeated_anchor(self):
+        probe = ConsoleProbe(self.console, [FINISHED_MARKER], tail_lines=5)
+        self._boot(4)
+        self.console.write('login:')
+        self.assertFalse(probe.check())
+
+        # Anchor line is written again after the marker
+        self.console.write('Cloud-init v. 18.5 finished at Mon, 01 Jul 2019',
+                           'login:')
+        self.console.requested_lengths = []
+        self.assertTrue(probe.check())
+        self.assertEqual(self.console.requested_lengths, [5, None])
+        self.assertEqual(probe.offset, len(self.console.get_console_output()))
+
+    def test_resumed_from_state(self):
+        probe = ConsoleProbe(self.console, [FINISHED_MARKER], tail_lines=5)
+        self._boot(10)
+        self.assertFalse(probe.check())
+
+        self.console.write('Cloud-init v. 18.5 finished at Mon, 01 Jul 2019')
+        probe = ConsoleProbe.from_state(
+            self.console, [FINISHED_MARKER], 5, probe.state)
+        self.console.requested_lengths = []
+        self.assertTrue(probe.check())
+
+        # Lines which were read by the previous probes are not scanned again
+        probe = ConsoleProbe.from_state(
+            self.console, ['Starting unit 2'], 5, probe.state)
+        self.assertFalse(probe.check())
+        self.assertEqual(self.console.requested_lengths, [5, 5])
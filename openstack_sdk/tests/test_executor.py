@@ -0,0 +1,111 @@
+# #######
+# Copyright (c) 2019 Cloudify Platform Ltd. All rights reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Standard imports
+import threading
+import time
+import unittest
+
+# Third party imports
+from openstack import exceptions
+
+# Local imports
+from openstack_sdk.executor import Executor, ExecutorError
+from openstack_sdk.retry import RetryPolicy
+
+
+class ExecutorTestCase(unittest.TestCase):
+
+    def test_from_client_config(self):
+        executor = Executor.from_client_config(
+            {'executor': {'max_workers': 3, 'timeout': 20}})
+        self.assertEqual(executor.max_workers, 3)
+        self.assertEqual(executor.timeout, 20)
+
+        executor = Executor.from_client_config({})
+        self.assertEqual(executor.max_workers, 10)
+        self.assertEqual(executor.timeout, 300)
+
+    def test_map_keeps_order(self):
+        def _call(item):
+            # Let the first items finish last
+            time.sleep(0.01 * (5 - item))
+            return item * 2
+
+        results = Executor(max_workers=5).map(_call, range(5))
+        self.assertEqual(results, [0, 2, 4, 6, 8])
+
+    def test_map_bounded_concurrency(self):
+        lock = threading.Lock()
+        running = []
+        peak = []
+
+        def _call(item):
+            with lock:
+                running.append(item)
+                peak.append(len(running))
+            time.sleep(0.01)
+            with lock:
+                running.remove(item)
+
+        Executor(max_workers=2).map(_call, range(6))
+        self.assertEqual(max(peak), 2)
+
+    def test_map_aggregates_errors(self):
+        def _call(item):
+            if item % 2:
+                raise exceptions.ResourceNotFound('{0} not found'.format(item))
+            return item
+
+        with self.assertRaises(ExecutorError) as error:
+            Executor().map(_call, range(4))
+        self.assertEqual(sorted(error.exception.errors), [1, 3])
+        self.assertIn('2 of the calls failed', str(error.exception))
+
+    def test_run_returns_results_and_errors(self):
+        def _call(item):
+            if item == 'b':
+                raise exceptions.HttpException('failed')
+            return item.upper()
+
+        results, errors = Executor().run(_call, ['a', 'b', 'c'])
+        self.assertEqual(results, ['A', None, 'C'])
+        self.assertEqual(list(errors), [1])
+
+    def test_run_timeout(self):
+        event = threading.Event()
+
+        def _call(item):
+            if item:
+                event.wait(1)
+            return item
+
+        results, errors = Executor(timeout=0.05).run(_call, [0, 1])
+        event.set()
+        self.assertEqual(results, [0, None])
+        self.assertIsInstance(errors[1], exceptions.ResourceTimeout)
+
+    def test_run_without_items(self):
+        self.assertEqual(Executor().run(lambda item: item, []), ([], {}))
+
+    def test_is_transient(self):
+        self.assertTrue(RetryPolicy.is_transient(ExecutorError({
+            0: exceptions.HttpException(http_status=503),
+            2: exceptions.HttpException(http_status=429)
+        })))
+        self.assertFalse(RetryPolicy.is_transient(ExecutorError({
+            0: exceptions.HttpException(http_status=503),
+            1: exceptions.ResourceNotFound()
+        })))
@@ -0,0 +1,101 @@
+# #######
+# Copyright (c) 2019 Cloudify Platform Ltd. All rights reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Standard imports
+import os
+import shutil
+import tempfile
+import unittest
+
+# Local imports
+from openstack_sdk.latency_model import (LatencyModel,
+                                         get_quantile,
+                                         get_size_bucket)
+
+
+class LatencyModelTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super(LatencyModelTestCase, self).setUp()
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+        super(LatencyModelTestCase, self).tearDown()
+
+    def _get_model(self, **config):
+        config.update(enabled=True, path=os.path.join(self.path, 'state.db'))
+        return LatencyModel.from_client_config({
+            'auth_url': 'test_auth_url',
+            'project_name': 'test_project_name',
+            'region_name': 'test_region_name',
+            'latency_model': config
+        })
+
+    def test_from_client_config(self):
+        self.assertIsNone(LatencyModel.from_client_config({}))
+        model = self._get_model(max_retry_after=60)
+        self.assertEqual(model.max_retry_after, 60)
+        self.assertEqual(model.scope,
+                         'test_auth_url:test_region_name:test_project_name')
+
+    def test_get_size_bucket(self):
+        self.assertIsNone(get_size_bucket(None))
+        self.assertIsNone(get_size_bucket('large'))
+        self.assertEqual(get_size_bucket(1), 1)
+        self.assertEqual(get_size_bucket(5), 8)
+        self.assertEqual(get_size_bucket('16'), 16)
+
+    def test_get_quantile(self):
+        durations = [10, 20, 30, 40]
+        self.assertEqual(get_quantile(durations, 0.5), 20)
+        self.assertEqual(get_quantile(durations, 0.75), 30)
+        self.assertEqual(get_quantile(durations, 0.99), 40)
+
+    def test_record_keeps_recent_samples(self):
+        model = self._get_model(max_samples=3)
+        for duration in [100, 10, 20, 30]:
+            model.record('volume', 'delete', 8, duration)
+        self.assertEqual(model.get_durations('volume', 'delete', 8),
+                         [10, 20, 30])
+        self.assertEqual(model.get_durations('volume', 'delete', 16), [])
+
+    def test_get_retry_after_without_samples(self):
+        model = self._get_model()
+        model.record('server', 'stop', 'small', 10)
+        self.assertEqual(
+            model.get_retry_after('server', 'stop', 'small', 0, default=30),
+            30)
+
+    def test_get_retry_after(self):
+        model = self._get_model(min_retry_after=5, max_retry_after=100)
+        for duration in [10, 20, 30, 40, 400]:
+            model.record('server', 'stop', 'small', duration)
+
+        # Retry at the median completion time first
+        self.assertEqual(
+            model.get_retry_after('server', 'stop', 'small', 0), 30)
+        # Then at the next quantile which is not reached yet
+        self.assertEqual(
+            model.get_retry_after('server', 'stop', 'small', 32), 8)
+        # Retries are bounded
+        self.assertEqual(
+            model.get_retry_after('server', 'stop', 'small', 38), 5)
+        self.assertEqual(
+            model.get_retry_after('server', 'stop', 'small', 45), 100)
+        # Slower than all completion times
+        self.assertEqual(
+            model.get_retry_after('server', 'stop', 'small', 500, default=30),
+            30)
@@ -0,0 +1,153 @@
+# #######
+# Copyright (c) 2019 Cloudify Platform Ltd. All rights reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Standard imports
+import os
+import shutil
+import tempfile
+import unittest
+import mock
+
+# Third party imports
+from openstack import exceptions
+
+# Local imports
+from openstack_sdk.name_cache import NameCache
+from openstack_sdk.resources.networks import OpenstackNetwork
+
+
+class NameCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super(NameCacheTestCase, self).setUp()
+        self.path = tempfile.mkdtemp()
+        self.connection = mock.MagicMock()
+
+    def tearDown(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+        super(NameCacheTestCase, self).tearDown()
+
+    @property
+    def client_config(self):
+        return {
+            'auth_url': 'test_auth_url',
+            'username': 'test_username',
+            'password': 'test_password',
+            'project_name': 'test_project_name',
+            'region_name': 'test_region_name',
+            'name_cache': {
+                'enabled': True,
+                'path': os.path.join(self.path, 'state.db'),
+                'ttl': 10
+            }
+        }
+
+    def _get_network(self, resource_config=None):
+        network = OpenstackNetwork(client_config=self.client_config,
+                                   resource_config=resource_config,
+                                   logger=mock.MagicMock())
+        network.connection = self.connection
+        return network
+
+    def test_from_client_config_disabled(self):
+        client_config = self.client_config
+        del client_config['name_cache']
+        self.assertIsNone(NameCache.from_client_config(client_config))
+
+    @mock.patch('openstack_sdk.name_cache.time.time')
+    def test_get_expired(self, mock_time):
+        mock_time.return_value = 100
+        cache = NameCache.from_client_config(self.client_config)
+        cache.set('network', 'ext-net', 'a95b5509-c122-4c2f-823e-884bb559afe8')
+        self.assertEqual(cache.get('network', 'ext-net'),
+                         'a95b5509-c122-4c2f-823e-884bb559afe8')
+        self.assertIsNone(cache.get('subnet', 'ext-net'))
+
+        mock_time.return_value = 111
+        self.assertIsNone(cache.get('network', 'ext-net'))
+
+    def test_scoped_per_project(self):
+        NameCache.from_client_config(self.client_config).set(
+            'network', 'ext-net', 'a95b5509-c122-4c2f-823e-884bb559afe8')
+        client_config = self.client_config
+        client_config['project_name'] = 'other_project_name'
+        self.assertIsNone(
+            NameCache.from_client_config(client_config).get('network',
+                                                            'ext-net'))
+
+    def test_find_network_id_resolved_once(self):
+        self.connection.network.find_network.return_value = \
+            mock.MagicMock(id='a95b5509-c122-4c2f-823e-884bb559afe8')
+        for _ in range(3):
+            network = self._get_network()
+            network.name = 'ext-net'
+            self.assertEqual(network.find_network_id(),
+                             'a95b5509-c122-4c2f-823e-884bb559afe8')
+        self.connection.network.find_network.assert_called_once_with(
+            'ext-net')
+
+    def test_find_network_id_not_found(self):
+        self.connection.network.find_network.return_value = None
+        network = self._get_network()
+        network.name = 'ext-net'
+        self.assertIsNone(network.find_network_id())
+        self.assertIsNone(network.name_cache.get('network', 'ext-net'))
+
+    def test_invalidated_on_create_and_delete(self):
+        network = self._get_network({'name': 'ext-net'})
+        network.name_cache.set(
+            'network', 'ext-net', 'a95b5509-c122-4c2f-823e-884bb559afe8')
+        network.create()
+        self.assertIsNone(network.name_cache.get('network', 'ext-net'))
+
+        network.name_cache.set(
+            'network', 'ext-net', 'a95b5509-c122-4c2f-823e-884bb559afe8')
+        network = self._get_network()
+        network.resource_id = 'a95b5509-c122-4c2f-823e-884bb559afe8'
+        network.delete()
+        self.assertIsNone(network.name_cache.get('network', 'ext-net'))
+
+    def test_invalidated_on_rename_only(self):
+        network = self._get_network({'name': 'ext-net'})
+        network.resource_id = 'a95b5509-c122-4c2f-823e-884bb559afe8'
+        network.name_cache.set(
+            'network', 'ext-net', 'a95b5509-c122-4c2f-823e-884bb559afe8')
+        network.update({'description': 'external network'})
+        self.assertEqual(network.name_cache.get('network', 'ext-net'),
+                         'a95b5509-c122-4c2f-823e-884bb559afe8')
+
+        network.update({'name': 'public-net'})
+        self.assertIsNone(network.name_cache.get('network', 'ext-net'))
+
+    def test_get_by_cached_name(self):
+        network = self._get_network({'name': 'ext-net'})
+        network.name_cache.set(
+            'network', 'ext-net', 'a95b5509-c122-4c2f-823e-884bb559afe8')
+        network.get()
+        self.connection.network.get_network.assert_called_once_with(
+            'a95b5509-c122-4c2f-823e-884bb559afe8')
+        self.assertIsNone(network.resource_id)
+
+    def test_get_by_stale_cached_name(self):
+        self.connection.network.get_network.side_effect = [
+            exceptions.ResourceNotFound(),
+            mock.MagicMock(id='f2f8c3c9-3da5-4a8e-bd3c-1e5d4f27ab3c')]
+        network = self._get_network({'name': 'ext-net'})
+        network.name_cache.set(
+            'network', 'ext-net', 'a95b5509-c122-4c2f-823e-884bb559afe8')
+        network.get()
+        self.connection.network.get_network.assert_called_with('ext-net')
+        self.assertEqual(network.name_cache.get('network', 'ext-net'),
+                         'f2f8c3c9-3da5-4a8e-bd3c-1e5d4f27ab3c')
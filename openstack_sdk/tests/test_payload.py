@@ -0,0 +1,94 @@
+# #######
+# Copyright (c) 2019 Cloudify Platform Ltd. All rights reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Standard imports
+import logging
+import unittest
+import mock
+from StringIO import StringIO
+
+# Third party imports
+import openstack.compute.v2.server
+
+# Local imports
+from openstack_sdk.payload import Payload, redact, REDACTED_VALUE
+from openstack_sdk.pool import connection_pool
+from openstack_sdk.resources.compute import OpenstackServer
+
+
+class PayloadTestCase(unittest.TestCase):
+
+    def test_redact(self):
+        self.assertEqual(
+            redact({
+                'name': 'test',
+                'adminPass': 'secret',
+                'networks': [{'uuid': '1', 'auth_token': 'token'}],
+                'user_data': None
+            }),
+            {
+                'name': 'test',
+                'adminPass': REDACTED_VALUE,
+                'networks': [{'uuid': '1', 'auth_token': REDACTED_VALUE}],
+                'user_data': None
+            })
+
+    def test_render_resource(self):
+        server = openstack.compute.v2.server.Server(
+            id='a95b5509-c122-4c2f-823e-884bb559afe8',
+            admin_password='secret')
+        text = str(Payload(server))
+        self.assertIn('a95b5509-c122-4c2f-823e-884bb559afe8', text)
+        self.assertNotIn('secret', text)
+
+    def test_render_truncated(self):
+        text = str(Payload('x' * 30, max_length=10))
+        self.assertEqual(text, 'x' * 10 + '... (20 more characters)')
+        self.assertEqual(str(Payload('x' * 30, max_length=0)), 'x' * 30)
+
+    def test_get_max_length(self):
+        self.assertEqual(Payload.get_max_length({}), 2048)
+        self.assertEqual(
+            Payload.get_max_length({'logging': {'max_payload_length': 10}}),
+            10)
+
+
+@mock.patch('openstack.connect')
+class LazyLoggingTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super(LazyLoggingTestCase, self).setUp()
+        connection_pool.clear()
+        self.logger = logging.getLogger('openstack_sdk.tests.payload')
+        self.logger.propagate = False
+        self.logger.handlers = [logging.StreamHandler(StringIO())]
+
+    def _create_server(self):
+        server = OpenstackServer(client_config={'foo': 'foo'},
+                                 resource_config={'name': 'test'},
+                                 logger=self.logger)
+        server.create()
+
+    @mock.patch.object(Payload, 'render', return_value='')
+    def test_not_rendered_when_disabled(self, mock_render, _):
+        self.logger.setLevel(logging.WARNING)
+        self._create_server()
+        mock_render.assert_not_called()
+
+    @mock.patch.object(Payload, 'render', return_value='')
+    def test_rendered_when_enabled(self, mock_render, _):
+        self.logger.setLevel(logging.DEBUG)
+        self._create_server()
+        self.assertEqual(mock_render.call_count, 2)
@@ -0,0 +1,78 @@
+# #######
+# Copyright (c) 2019 Cloudify Platform Ltd. All rights reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Standard imports
+import unittest
+import mock
+
+# Local imports
+from openstack_sdk.poller import Poller, poller_stats
+
+
+@mock.patch('openstack_sdk.poller.time.sleep')
+class PollerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super(PollerTestCase, self).setUp()
+        poller_stats.clear()
+
+    def _get_check(self, ready_on):
+        checks = []
+
+        def _check():
+            checks.append(None)
+            return len(checks), len(checks) >= ready_on
+        return _check
+
+    def test_from_client_config(self, _):
+        poller = Poller.from_client_config(
+            {'polling': {'budget': 5, 'base_delay': 2, 'max_delay': 3}})
+        self.assertEqual(poller.budget, 5)
+        self.assertEqual(poller.base_delay, 2)
+        self.assertEqual(poller.max_delay, 3)
+
+    def test_get_delay(self, _):
+        poller = Poller(base_delay=1, max_delay=4)
+        for attempt, delay in [(1, 1), (2, 2), (3, 4), (6, 4)]:
+            self.assertTrue(
+                delay / 2.0 <= poller.get_delay(attempt) <= delay)
+
+    def test_poll_ready_in_process(self, mock_sleep):
+        result, ready = Poller(budget=20).poll(self._get_check(3))
+
+        self.assertEqual((result, ready), (3, True))
+        self.assertEqual(mock_sleep.call_count, 2)
+        self.assertEqual(poller_stats.stats(), {
+            'polls': 1,
+            'checks': 3,
+            'ready_in_process': 1,
+            'operation_retries': 0,
+            'avoided_retries': 2
+        })
+
+    def test_poll_budget_spent(self, mock_sleep):
+        result, ready = Poller(budget=10, base_delay=2, max_delay=2).poll(
+            self._get_check(100))
+
+        self.assertFalse(ready)
+        # Every delay is at least 1 second, so no more than 10 sleeps fit
+        self.assertTrue(1 <= mock_sleep.call_count <= 10)
+        self.assertEqual(result, mock_sleep.call_count + 1)
+        self.assertEqual(poller_stats.stats()['operation_retries'], 1)
+
+    def test_poll_without_budget(self, mock_sleep):
+        self.assertEqual(Poller(budget=0).poll(self._get_check(2)),
+                         (1, False))
+        mock_sleep.assert_not_called()
@@ -0,0 +1,145 @@
+# #######
+# Copyright (c) 2019 Cloudify Platform Ltd. All rights reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Standard imports
+import unittest
+import mock
+
+# Local imports
+from openstack_sdk.pool import ConnectionPool
+from openstack_sdk.resources.networks import (OpenstackNetwork,
+                                              OpenstackPort)
+
+
+@mock.patch('openstack.connect')
+class ConnectionPoolTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super(ConnectionPoolTestCase, self).setUp()
+        self.pool = ConnectionPool()
+
+    @property
+    def client_config(self):
+        return {
+            'auth_url': 'test_auth_url',
+            'username': 'test_username',
+            'password': 'test_password',
+            'project_name': 'test_project_name',
+            'region_name': 'test_region_name'
+        }
+
+    def test_generate_key_ignores_keys_order(self, _):
+        reversed_config = \
+            dict(reversed(sorted(self.client_config.items())))
+        self.assertEqual(self.pool.generate_key(self.client_config),
+                         self.pool.generate_key(reversed_config))
+
+    def test_get_reuses_connection(self, mock_connect):
+        mock_connect.side_effect = [mock.MagicMock(), mock.MagicMock()]
+        first = self.pool.get(self.client_config)
+        second = self.pool.get(self.client_config)
+
+        self.assertIs(first, second)
+        mock_connect.assert_called_once_with(**self.client_config)
+        self.assertEqual(self.pool.stats(),
+                         {'hits': 1, 'misses': 1, 'size': 1})
+
+    def test_get_different_configs(self, mock_connect):
+        mock_connect.side_effect = [mock.MagicMock(), mock.MagicMock()]
+        other_config = self.client_config
+        other_config['project_name'] = 'other_project_name'
+
+        first = self.pool.get(self.client_config)
+        second = self.pool.get(other_config)
+
+        self.assertIsNot(first, second)
+        self.assertEqual(self.pool.stats(),
+                         {'hits': 0, 'misses': 2, 'size': 2})
+
+    @mock.patch('openstack_sdk.pool.time.time')
+    def test_evict_idle(self, mock_time, mock_connect):
+        connection = mock.MagicMock()
+        mock_connect.return_value = connection
+        self.pool.idle_timeout = 10
+
+        mock_time.return_value = 100
+        self.pool.get(self.client_config)
+
+        mock_time.return_value = 111
+        self.pool.evict_idle()
+
+        connection.close.assert_called_once_with()
+        self.assertEqual(self.pool.stats()['size'], 0)
+
+    @mock.patch('openstack_sdk.pool.time.time')
+    def test_evict_idle_keeps_used_connection(self, mock_time, mock_connect):
+        connection = mock.MagicMock()
+        connection.session.request.return_value = \
+            mock.MagicMock(status_code=200)
+        mock_connect.return_value = connection
+        self.pool.idle_timeout = 10
+
+        mock_time.return_value = 100
+        self.pool.get(self.client_config)
+
+        # Connection is used by a resource without getting it again
+        mock_time.return_value = 108
+        connection.session.request('servers', 'GET')
+
+        mock_time.return_value = 111
+        self.pool.evict_idle()
+
+        connection.close.assert_not_called()
+        self.assertEqual(self.pool.stats()['size'], 1)
+
+    @mock.patch('openstack_sdk.retry.time.sleep')
+    def test_hooks_log_through_current_resource(self, _, mock_connect):
+        connection = mock.MagicMock()
+        connection.session.request.side_effect = [
+            mock.MagicMock(status_code=503), mock.MagicMock(status_code=200)]
+        mock_connect.return_value = connection
+        first_logger = mock.MagicMock()
+        second_logger = mock.MagicMock()
+
+        self.pool.get(self.client_config, logger=first_logger)
+        self.pool.get(self.client_config, logger=second_logger)
+        connection.session.request('servers', 'GET')
+
+        first_logger.warning.assert_not_called()
+        second_logger.warning.assert_called_once()
+
+    def test_clear(self, mock_connect):
+        connection = mock.MagicMock()
+        mock_connect.return_value = connection
+        self.pool.get(self.client_config)
+
+        self.pool.clear()
+
+        connection.close.assert_called_once_with()
+        self.assertEqual(self.pool.stats(),
+                         {'hits': 0, 'misses': 0, 'size': 0})
+
+    def test_resources_share_connection(self, mock_connect):
+        with mock.patch('openstack_sdk.common.get_connection',
+                        self.pool.get):
+            network = OpenstackNetwork(client_config=self.client_config,
+                                       logger=mock.MagicMock())
+            port = OpenstackPort(client_config=self.client_config,
+                                 logger=mock.MagicMock())
+            mock_connect.assert_not_called()
+            self.assertIs(network.connection, port.connection)
+
+        self.assertEqual(mock_connect.call_count, 1)
+        self.assertEqual(self.pool.stats()['hits'], 1)
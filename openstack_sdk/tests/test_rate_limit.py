@@ -0,0 +1,118 @@
+# #######
+# Copyright (c) 2019 Cloudify Platform Ltd. All rights reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Standard imports
+import os
+import shutil
+import tempfile
+import unittest
+import mock
+
+# Local imports
+from openstack_sdk.pool import ConnectionPool
+from openstack_sdk.rate_limit import RateLimiter
+
+
+class RateLimiterTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super(RateLimiterTestCase, self).setUp()
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+        super(RateLimiterTestCase, self).tearDown()
+
+    @property
+    def client_config(self):
+        return {
+            'auth_url': 'test_auth_url',
+            'username': 'test_username',
+            'password': 'test_password',
+            'project_name': 'test_project_name',
+            'region_name': 'test_region_name',
+            'rate_limit': {
+                'path': os.path.join(self.path, 'state.db'),
+                'services': {
+                    'compute': {'rate': 2, 'burst': 2}
+                }
+            }
+        }
+
+    def test_from_client_config_disabled(self):
+        client_config = self.client_config
+        del client_config['rate_limit']
+        self.assertIsNone(RateLimiter.from_client_config(client_config))
+
+    @mock.patch('openstack_sdk.rate_limit.time.time')
+    def test_reserve(self, mock_time):
+        mock_time.return_value = 100
+        limiter = RateLimiter.from_client_config(self.client_config)
+        # Burst is allowed without waiting
+        self.assertEqual(limiter.reserve('compute'), 0)
+        self.assertEqual(limiter.reserve('compute'), 0)
+        # Every next request waits for its own token
+        self.assertEqual(limiter.reserve('compute'), 0.5)
+        self.assertEqual(limiter.reserve('compute'), 1)
+        # Services without configured rate are not limited
+        self.assertEqual(limiter.reserve('network'), 0)
+
+        mock_time.return_value = 102
+        self.assertEqual(limiter.reserve('compute'), 0)
+
+    @mock.patch('openstack_sdk.rate_limit.time.time')
+    def test_reserve_shared_between_limiters(self, mock_time):
+        mock_time.return_value = 100
+        first = RateLimiter.from_client_config(self.client_config)
+        second = RateLimiter.from_client_config(self.client_config)
+        first.reserve('compute')
+        first.reserve('compute')
+        self.assertEqual(second.reserve('compute'), 0.5)
+
+        client_config = self.client_config
+        client_config['region_name'] = 'other_region_name'
+        other_cloud = RateLimiter.from_client_config(client_config)
+        self.assertEqual(other_cloud.reserve('compute'), 0)
+
+    @mock.patch('openstack_sdk.rate_limit.time.sleep')
+    @mock.patch('openstack_sdk.rate_limit.time.time')
+    def test_acquire_logs_throttled_time(self, mock_time, mock_sleep):
+        mock_time.return_value = 100
+        logger = mock.MagicMock()
+        limiter = RateLimiter.from_client_config(self.client_config, logger)
+        for _ in range(4):
+            limiter.acquire('compute')
+
+        self.assertEqual(mock_sleep.call_args_list,
+                         [mock.call(0.5), mock.call(1)])
+        self.assertEqual(limiter.throttled_time, {'compute': 1.5})
+        self.assertEqual(logger.info.call_count, 2)
+
+    @mock.patch('openstack_sdk.rate_limit.RateLimiter.acquire')
+    @mock.patch('openstack.connect')
+    def test_pool_installs_rate_limiter(self, mock_connect, mock_acquire):
+        response = mock.MagicMock(status_code=200)
+        request = mock.MagicMock(return_value=response)
+        mock_connect.return_value.session.request = request
+        connection = ConnectionPool().get(self.client_config)
+
+        self.assertEqual(
+            connection.session.request(
+                'servers', 'GET',
+                endpoint_filter={'service_type': 'compute'}),
+            response)
+        mock_acquire.assert_called_once_with('compute')
+        request.assert_called_once_with(
+            'servers', 'GET', endpoint_filter={'service_type': 'compute'})
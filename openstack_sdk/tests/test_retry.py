@@ -0,0 +1,172 @@
+# #######
+# Copyright (c) 2019 Cloudify Platform Ltd. All rights reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Standard imports
+import unittest
+import mock
+
+# Third party imports
+from keystoneauth1.exceptions import (ConnectFailure,
+                                      ServiceUnavailable,
+                                      SSLError)
+from openstack import exceptions
+
+# Local imports
+from openstack_sdk.circuit_breaker import CircuitOpenError
+from openstack_sdk.retry import RetryPolicy
+
+
+def get_response(status_code, headers=None):
+    response = mock.MagicMock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    return response
+
+
+def get_http_exception(status_code, headers=None, method=None):
+    response = mock.MagicMock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.request.method = method
+    return exceptions.HttpException(response=response)
+
+
+@mock.patch('openstack_sdk.retry.time.sleep')
+class RetryPolicyTestCase(unittest.TestCase):
+
+    def test_from_client_config(self, _):
+        policy = RetryPolicy.from_client_config(
+            {'retry_policy': {'max_attempts': 5,
+                              'operation_retry_interval': 10}})
+        self.assertEqual(policy.max_attempts, 5)
+        self.assertEqual(policy.operation_retry_interval, 10)
+        self.assertEqual(policy.max_delay, 30)
+
+    def test_is_transient(self, _):
+        for status_code in (429, 500, 503, 504):
+            self.assertTrue(
+                RetryPolicy.is_transient(get_http_exception(status_code)))
+        for status_code in (400, 401, 403, 404, 409):
+            self.assertFalse(
+                RetryPolicy.is_transient(get_http_exception(status_code)))
+        self.assertTrue(RetryPolicy.is_transient(ServiceUnavailable()))
+        self.assertTrue(RetryPolicy.is_transient(ConnectFailure()))
+        self.assertFalse(RetryPolicy.is_transient(SSLError()))
+        self.assertFalse(
+            RetryPolicy.is_transient(exceptions.ResourceTimeout()))
+
+    def test_should_retry_operation(self, _):
+        for method in ('GET', 'PUT', 'DELETE'):
+            self.assertTrue(RetryPolicy.should_retry_operation(
+                get_http_exception(503, method=method)))
+        self.assertFalse(RetryPolicy.should_retry_operation(
+            get_http_exception(503, method='POST')))
+        self.assertFalse(RetryPolicy.should_retry_operation(
+            get_http_exception(503)))
+        self.assertFalse(RetryPolicy.should_retry_operation(
+            get_http_exception(400, method='GET')))
+        self.assertTrue(RetryPolicy.should_retry_operation(
+            get_http_exception(429, method='POST')))
+        self.assertTrue(RetryPolicy.should_retry_operation(
+            CircuitOpenError(retry_after=45)))
+
+    def test_should_retry_operation_conflict(self, _):
+        error = get_http_exception(409, method='DELETE')
+        self.assertFalse(RetryPolicy.should_retry_operation(error))
+        self.assertTrue(
+            RetryPolicy.should_retry_operation(error, retry_conflicts=True))
+
+    def test_get_delay(self, _):
+        policy = RetryPolicy(base_delay=2, max_delay=10)
+        for attempt, delay in ((1, 2), (2, 4), (3, 8), (5, 10)):
+            self.assertTrue(
+                delay / 2.0 <= policy.get_delay(attempt) <= delay)
+
+    def test_get_delay_retry_after(self, _):
+        policy = RetryPolicy()
+        error = get_http_exception(429, {'Retry-After': '7'})
+        self.assertEqual(policy.get_delay(1, error), 7)
+        self.assertEqual(policy.get_operation_retry_interval(error), 30)
+
+        error = get_http_exception(503, {'Retry-After': '120'})
+        self.assertEqual(policy.get_operation_retry_interval(error), 120)
+
+    @mock.patch('openstack_sdk.retry.time.time')
+    def test_get_delay_retry_after_date(self, mock_time, _):
+        mock_time.return_value = 1445412480
+        error = get_http_exception(
+            503, {'Retry-After': 'Wed, 21 Oct 2015 07:28:30 GMT'})
+        self.assertEqual(RetryPolicy().get_delay(1, error), 30)
+
+    def test_hook_retries_transient_error(self, mock_sleep):
+        request = mock.MagicMock(
+            side_effect=[get_response(503), ConnectFailure(),
+                         get_response(200)])
+        response = RetryPolicy()(request)('/servers', 'GET', a='b')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(request.call_count, 3)
+        request.assert_called_with('/servers', 'GET', a='b')
+        self.assertEqual(mock_sleep.call_count, 2)
+
+    def test_hook_retry_after(self, mock_sleep):
+        request = mock.MagicMock(
+            side_effect=[get_response(429, {'Retry-After': '7'}),
+                         get_response(200)])
+        RetryPolicy()(request)('/servers', 'GET')
+        mock_sleep.assert_called_once_with(7)
+
+    def test_hook_exhausted(self, mock_sleep):
+        request = mock.MagicMock(return_value=get_response(503))
+        response = RetryPolicy(max_attempts=2)(request)('/servers', 'GET')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(request.call_count, 2)
+        self.assertEqual(mock_sleep.call_count, 1)
+
+        request = mock.MagicMock(side_effect=ConnectFailure())
+        with self.assertRaises(ConnectFailure):
+            RetryPolicy(max_attempts=2)(request)('/servers', 'GET')
+        self.assertEqual(request.call_count, 2)
+
+    def test_hook_permanent_error(self, mock_sleep):
+        request = mock.MagicMock(return_value=get_response(409))
+        response = RetryPolicy()(request)('/servers', 'GET')
+        self.assertEqual(response.status_code, 409)
+        request.assert_called_once_with('/servers', 'GET')
+        mock_sleep.assert_not_called()
+
+    def test_hook_non_idempotent_request(self, mock_sleep):
+        for method in ('POST', 'PUT', 'PATCH', 'DELETE'):
+            request = mock.MagicMock(return_value=get_response(504))
+            response = RetryPolicy()(request)('/servers', method)
+            self.assertEqual(response.status_code, 504)
+            request.assert_called_once_with('/servers', method)
+
+            request = mock.MagicMock(side_effect=ConnectFailure())
+            with self.assertRaises(ConnectFailure) as error:
+                RetryPolicy()(request)('/servers', method)
+            request.assert_called_once_with('/servers', method)
+            self.assertEqual(
+                RetryPolicy.get_request_method(error.exception), method)
+        mock_sleep.assert_not_called()
+
+    def test_hook_circuit_open(self, mock_sleep):
+        request = mock.MagicMock(side_effect=CircuitOpenError(retry_after=45))
+        policy = RetryPolicy()
+        with self.assertRaises(CircuitOpenError) as error:
+            policy(request)('/servers', 'GET')
+        request.assert_called_once_with('/servers', 'GET')
+        mock_sleep.assert_not_called()
+        self.assertEqual(
+            policy.get_operation_retry_interval(error.exception), 45)
@@ -0,0 +1,193 @@
+# #######
+# Copyright (c) 2019 Cloudify Platform Ltd. All rights reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Standard imports
+import os
+import shutil
+import tempfile
+import unittest
+import mock
+
+# Third party imports
+import openstack.block_storage.v2.volume
+from openstack import exceptions
+
+# Local imports
+from openstack_sdk.pool import connection_pool
+from openstack_sdk.resources.networks import OpenstackNetwork
+from openstack_sdk.resources.volume import OpenstackVolume
+from openstack_sdk.status_multiplexer import StatusMultiplexer
+
+
+@mock.patch('openstack.connect')
+class StatusMultiplexerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super(StatusMultiplexerTestCase, self).setUp()
+        connection_pool.clear()
+        self.path = tempfile.mkdtemp()
+        self.now = 1000.0
+        patcher = mock.patch('openstack_sdk.status_multiplexer.time.time',
+                             side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+        super(StatusMultiplexerTestCase, self).tearDown()
+
+    @property
+    def client_config(self):
+        return {
+            'auth_url': 'test_auth_url',
+            'username': 'test_username',
+            'password': 'test_password',
+            'project_name': 'test_project_name',
+            'region_name': 'test_region_name',
+            'status_multiplexer': {
+                'enabled': True,
+                'path': os.path.join(self.path, 'state.db'),
+                'tick': 2,
+                'direct_fetch_limit': 0
+            }
+        }
+
+    def _get_resource(self, class_decl, resource_id):
+        resource = class_decl(client_config=self.client_config,
+                              logger=mock.MagicMock())
+        resource.resource_id = resource_id
+        return resource
+
+    def _get_volume(self, volume_id, status):
+        return openstack.block_storage.v2.volume.Volume(id=volume_id,
+                                                        status=status)
+
+    def test_from_client_config(self, _):
+        self.assertIsNone(StatusMultiplexer.from_client_config({}))
+        multiplexer = StatusMultiplexer.from_client_config(self.client_config)
+        self.assertEqual(multiplexer.tick, 2)
+        self.assertEqual(multiplexer.scope,
+                         'test_auth_url:test_region_name:test_project_name')
+
+    def test_single_list_request_per_tick(self, mock_connect):
+        block_storage = mock_connect.return_value.block_storage
+        block_storage.get_volume.return_value = \
+            self._get_volume('2', 'creating')
+        block_storage.volumes.side_effect = lambda **query: iter([
+            self._get_volume('1', 'creating'),
+            self._get_volume('2', 'available'),
+            self._get_volume('3', 'available')])
+        first = self._get_resource(OpenstackVolume, '1')
+        second = self._get_resource(OpenstackVolume, '2')
+
+        # First waiting operation takes the lease and polls, the second one
+        # has no published status yet
+        self.assertEqual(first.get_fresh().status, 'creating')
+        self.assertEqual(second.get_fresh().status, 'creating')
+        self.assertEqual(block_storage.volumes.call_count, 1)
+        self.assertEqual(block_storage.get_volume.call_count, 1)
+
+        # On next tick both statuses are fetched by single list request
+        self.now += 2
+        self.assertEqual(first.get_fresh().status, 'creating')
+        self.assertEqual(second.get_fresh().status, 'available')
+        self.assertEqual(block_storage.volumes.call_count, 2)
+        self.assertEqual(block_storage.get_volume.call_count, 1)
+
+    def test_few_resources_fetched_directly(self, mock_connect):
+        block_storage = mock_connect.return_value.block_storage
+        block_storage.get_volume.side_effect = lambda volume_id: \
+            self._get_volume(volume_id, 'available')
+        client_config = self.client_config
+        client_config['status_multiplexer']['direct_fetch_limit'] = 2
+        volume = OpenstackVolume(client_config=client_config,
+                                 logger=mock.MagicMock())
+        volume.resource_id = '1'
+
+        self.assertEqual(volume.get_fresh().status, 'available')
+        block_storage.volumes.assert_not_called()
+        block_storage.get_volume.assert_called_once_with('1')
+
+    def test_lease_held_by_other_poller(self, mock_connect):
+        block_storage = mock_connect.return_value.block_storage
+        block_storage.get_volume.return_value = \
+            self._get_volume('1', 'creating')
+        volume = self._get_resource(OpenstackVolume, '1')
+
+        with mock.patch('openstack_sdk.status_multiplexer.get_owner',
+                        return_value='other'):
+            with volume.status_multiplexer.state.transaction() as connection:
+                volume.status_multiplexer._acquire_lease(
+                    connection, 'volume', self.now)
+
+        volume.get_fresh()
+        block_storage.volumes.assert_not_called()
+        block_storage.get_volume.assert_called_once()
+
+        # Once the lease expires, it is taken over
+        self.now += 10
+        block_storage.volumes.return_value = iter([])
+        with self.assertRaises(exceptions.ResourceNotFound):
+            volume.get_fresh()
+        block_storage.volumes.assert_called_once()
+
+    def test_id_filter_and_stop_waiting(self, mock_connect):
+        response = mock.MagicMock(status_code=200)
+        response.json.return_value = {'networks': [{'id': '1',
+                                                    'status': 'ACTIVE'}]}
+        mock_connect.return_value.network.get.return_value = response
+        network = self._get_resource(OpenstackNetwork, '1')
+
+        self.assertEqual(network.get_fresh().status, 'ACTIVE')
+        mock_connect.return_value.network.get.assert_called_once_with(
+            '/networks', params={'id': ['1']})
+
+        network.stop_waiting()
+        with network.status_multiplexer.state.transaction() as connection:
+            self.assertEqual(connection.execute(
+                'SELECT COUNT(*) FROM pending_statuses').fetchone()[0], 0)
+            self.assertEqual(connection.execute(
+                'SELECT COUNT(*) FROM status_pollers').fetchone()[0], 0)
+
+    def test_changed_resource_is_not_served_outdated(self, mock_connect):
+        block_storage = mock_connect.return_value.block_storage
+        block_storage.volumes.side_effect = lambda **query: iter([
+            self._get_volume('1', 'available')])
+        volume = self._get_resource(OpenstackVolume, '1')
+        self.assertEqual(volume.get_fresh().status, 'available')
+
+        # Published status is dropped once the volume is changed, so it is
+        # fetched directly even though the poller is waiting for next tick
+        volume.delete()
+        block_storage.get_volume.return_value = \
+            self._get_volume('1', 'deleting')
+        self.assertEqual(volume.get_fresh().status, 'deleting')
+        self.assertEqual(block_storage.volumes.call_count, 1)
+
+    def test_status_fetched_before_change_is_not_published(self,
+                                                           mock_connect):
+        block_storage = mock_connect.return_value.block_storage
+        volume = self._get_resource(OpenstackVolume, '1')
+
+        def volumes(**query):
+            # Volume is changed while its status is being listed
+            volume.invalidate_cache()
+            return iter([self._get_volume('1', 'available')])
+
+        block_storage.volumes.side_effect = volumes
+        block_storage.get_volume.return_value = \
+            self._get_volume('1', 'deleting')
+        self.assertEqual(volume.get_fresh().status, 'deleting')
+        block_storage.volumes.assert_called_once()
@@ -106,3 +106,14 @@ class VolumeTestCase(base.OpenStackSDKTestBase):
 
         response = self.volume_instance.delete()
         self.assertIsNone(response)
+
+    def test_delete_volume_by_id_single_call(self):
+        self.volume_instance.resource_id = \
+            'a95b5509-c122-4c2f-823e-884bb559afe8'
+        self.fake_client.get_volume = mock.MagicMock()
+        self.fake_client.delete_volume = mock.MagicMock(return_value=None)
+
+        self.volume_instance.delete()
+        self.fake_client.get_volume.assert_not_called()
+        self.fake_client.delete_volume.assert_called_once_with(
+            'a95b5509-c122-4c2f-823e-884bb559afe8')
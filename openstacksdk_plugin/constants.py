@@ -22,11 +22,11 @@ USE_EXTERNAL_RESOURCE_PROPERTY = 'use_external_resource'
 SERVER_TASK_CREATE = 'create_server_task'
 SERVER_TASK_STOP = 'stop_server_task'
 SERVER_TASK_DELETE = 'delete_server_task'
-SERVER_TASK_START = 'start_server_task'
 SERVER_TASK_STATE = 'task_state'
-SERVER_TASK_BACKUP_DONE = 'backup_done'
-SERVER_TASK_RESTORE_STATE = 'restore_state'
+SERVER_SNAPSHOT_STATE = 'snapshot_state'
+SERVER_SNAPSHOT_IMAGES = 'snapshot_images'
 SERVER_INTERFACE_IDS = 'interfaces'
+SERVER_CONSOLE_PROBE = 'console_probe'
 VOLUME_TASK_DELETE = 'delete_volume_task'
 VOLUME_ATTACHMENT_TASK = 'attach_volume_task'
 VOLUME_DETACHMENT_TASK = 'detach_volume_task'
@@ -34,7 +34,9 @@ VOLUME_BACKUP_TASK = 'backup_volume_task'
 VOLUME_SNAPSHOT_TASK = 'snapshot_volume_task'
 VOLUME_SNAPSHOT_ID = 'snapshot_id'
 VOLUME_BACKUP_ID = 'backup_id'
+VOLUME_CLEANUP_PENDING_IDS = 'pending_{0}_deletes'
 VOLUME_ATTACHMENT_ID = 'attachment_id'
+TRANSITION_STARTED_AT = '{0}_{1}_started_at'
 
 # Openstack Server status constants.
 # Full lists here: https://bit.ly/2UyB5V5 # NOQA
@@ -123,6 +125,18 @@ SERVER_ACTION_STATUS_DONE = 'DONE'
 SERVER_ACTION_STATUS_PENDING = 'PENDING'
 SERVER_REBUILD_STATUS = 'rebuild_done'
 SERVER_REBUILD_SPAWNING_STATUS = 'rebuild_spawning'
+SERVER_SNAPSHOT_CREATE = 'create'
+SERVER_SNAPSHOT_APPLY = 'apply'
+SERVER_SNAPSHOT_PHASE_BACKUP = 'backup'
+SERVER_SNAPSHOT_PHASE_STOP = 'stop'
+SERVER_SNAPSHOT_PHASE_REBUILD = 'rebuild'
+SERVER_SNAPSHOT_PHASE_START = 'start'
+SERVER_SNAPSHOT_PHASES = {
+    SERVER_SNAPSHOT_CREATE: (SERVER_SNAPSHOT_PHASE_BACKUP,),
+    SERVER_SNAPSHOT_APPLY: (SERVER_SNAPSHOT_PHASE_STOP,
+                            SERVER_SNAPSHOT_PHASE_REBUILD,
+                            SERVER_SNAPSHOT_PHASE_START)
+}
 SERVER_ADMIN_PASSWORD = 'password'
 IDENTITY_USERS = 'users'
 IDENTITY_ROLES = 'roles'
@@ -139,3 +153,7 @@ CLOUDIFY_NEW_NODE_OPERATIONS = [CLOUDIFY_CREATE_OPERATION,
                                 CLOUDIFY_START_OPERATION,
                                 CLOUDIFY_STOP_OPERATION,
                                 CLOUDIFY_DELETE_OPERATION]
+CLOUDIFY_UNLINK_OPERATION = \
+    'cloudify.interfaces.relationship_lifecycle.unlink'
+CLOUDIFY_CONFLICT_RETRY_OPERATIONS = [CLOUDIFY_DELETE_OPERATION,
+                                      CLOUDIFY_UNLINK_OPERATION]
@@ -19,11 +19,14 @@ import sys
 # Third party imports
 from openstack import exceptions
 from cloudify import ctx as CloudifyContext
-from cloudify.exceptions import NonRecoverableError
+from cloudify.exceptions import NonRecoverableError, OperationRetry
 from cloudify.utils import exception_to_error_cause
 
 # Local imports
-from openstacksdk_plugin.constants import USE_EXTERNAL_RESOURCE_PROPERTY
+from openstack_sdk.common import resource_cache
+from openstack_sdk.retry import RetryPolicy
+from openstacksdk_plugin.constants import \
+    (USE_EXTERNAL_RESOURCE_PROPERTY, CLOUDIFY_CONFLICT_RETRY_OPERATIONS)
 from openstacksdk_plugin.utils \
     import (resolve_ctx,
             get_current_operation,
@@ -48,6 +51,9 @@ def with_openstack_resource(class_decl,
     """
 
     def wrapper_outer(func):
+        # Resources fetched during the operation are cached until it ends,
+        # unless they are changed in between
+        @resource_cache.scoped
         def wrapper_inner(**kwargs):
             # Get the context for the current task operation
             ctx = kwargs.pop('ctx', CloudifyContext)
@@ -82,14 +88,33 @@ def with_openstack_resource(class_decl,
                         resource)
 
                     return
+            # Transient API errors of idempotent requests are retried in
+            # process by the connection, and once the retry budget is
+            # exhausted the whole operation is retried. Errors of other
+            # requests are only retried when the request was rejected, since
+            # the API may have processed it, i.e. created the resource
+            retry_policy = RetryPolicy.from_client_config(
+                resource.client_config, logger=ctx.logger)
             try:
                 kwargs['openstack_resource'] = resource
                 func(**kwargs)
                 update_runtime_properties_for_operation_task(operation_name,
                                                              ctx_node,
                                                              resource)
-            except exceptions.SDKException as error:
+            except Exception as error:
                 _, _, tb = sys.exc_info()
+                if retry_policy.should_retry_operation(
+                        error,
+                        retry_conflicts=operation_name in
+                        CLOUDIFY_CONFLICT_RETRY_OPERATIONS):
+                    raise OperationRetry(
+                        'Transient failure while trying to request '
+                        'Openstack API: {}'.format(error),
+                        retry_after=retry_policy.get_operation_retry_interval(
+                            error),
+                        causes=[exception_to_error_cause(error, tb)])
+                if not isinstance(error, exceptions.SDKException):
+                    raise
                 raise NonRecoverableError(
                     'Failure while trying to request '
                     'Openstack API: {}'.format(error.message),
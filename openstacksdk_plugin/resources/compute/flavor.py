@@ -36,15 +36,18 @@ def create(openstack_resource):
 
 
 @with_openstack_resource(OpenstackFlavor)
-def list_flavors(openstack_resource, query=None, details=True):
+def list_flavors(openstack_resource, query=None, details=True, fields=None):
     """
 
     :param openstack_resource:
     :param query:
     :param details:
+    :param fields:
     :return:
     """
-    flavors = openstack_resource.list(details=details, query=query)
+    flavors = openstack_resource.list(details=details,
+                                      query=query,
+                                      fields=fields)
     add_resource_list_to_runtime_properties(FLAVOR_OPENSTACK_TYPE, flavors)
 
 
@@ -22,7 +22,8 @@ from openstack_sdk.resources.compute import OpenstackHostAggregate
 from openstacksdk_plugin.decorators import with_openstack_resource
 from openstacksdk_plugin.constants import (RESOURCE_ID,
                                            HOST_AGGREGATE_OPENSTACK_TYPE)
-from openstacksdk_plugin.utils import add_resource_list_to_runtime_properties
+from openstacksdk_plugin.utils import (add_resource_list_to_runtime_properties,
+                                       run_concurrently)
 
 
 @with_openstack_resource(OpenstackHostAggregate)
@@ -74,12 +75,14 @@ def update(openstack_resource, args):
 
 
 @with_openstack_resource(OpenstackHostAggregate)
-def list_aggregates(openstack_resource):
+def list_aggregates(openstack_resource, fields=None):
     """
     List openstack host aggregate
     :param openstack_resource: Instance of openstack host aggregate resource.
+    :param list fields: Optional names of the attributes to return for
+            every resource instead of the whole resource.
     """
-    aggregates = openstack_resource.list()
+    aggregates = openstack_resource.list(fields=fields)
     add_resource_list_to_runtime_properties(HOST_AGGREGATE_OPENSTACK_TYPE,
                                             aggregates)
 
@@ -102,9 +105,10 @@ def add_hosts(openstack_resource, hosts):
     aggregate resource
     """
     if isinstance(hosts, list):
-        for host in hosts:
-            # Add host to the target host aggregate
-            openstack_resource.add_host(host)
+        # Add hosts to the target host aggregate
+        run_concurrently(openstack_resource.client_config,
+                         openstack_resource.add_host,
+                         hosts)
     else:
         raise NonRecoverableError(
             'invalid data type {0} for hosts'.format(type(hosts)))
@@ -49,12 +49,14 @@ def delete(openstack_resource):
 
 
 @with_openstack_resource(OpenstackKeyPair)
-def list_keypairs(openstack_resource):
+def list_keypairs(openstack_resource, fields=None):
     """
     List openstack keypairs
     :param openstack_resource: Instance of openstack keypair.
+    :param list fields: Optional names of the attributes to return for
+            every resource instead of the whole resource.
     """
-    keypairs = openstack_resource.list()
+    keypairs = openstack_resource.list(fields=fields)
     add_resource_list_to_runtime_properties(KEYPAIR_OPENSTACK_TYPE, keypairs)
 
 
@@ -26,6 +26,9 @@ from cloudify.exceptions import (OperationRetry,
                                  NonRecoverableError)
 
 # Local imports
+from openstack_sdk.console_probe import ConsoleProbe
+from openstack_sdk.latency_model import get_size_bucket
+from openstack_sdk.poller import Poller
 from openstack_sdk.resources.compute import OpenstackServer
 from openstack_sdk.resources.compute import OpenstackKeyPair
 from openstack_sdk.resources.images import OpenstackImage
@@ -42,23 +45,26 @@ from openstacksdk_plugin.constants import (RESOURCE_ID,
                                            SERVER_STATUS_ERROR,
                                            SERVER_TASK_DELETE,
                                            SERVER_TASK_STOP,
-                                           SERVER_TASK_START,
-                                           SERVER_TASK_RESTORE_STATE,
-                                           SERVER_TASK_BACKUP_DONE,
+                                           SERVER_SNAPSHOT_STATE,
+                                           SERVER_SNAPSHOT_IMAGES,
+                                           SERVER_SNAPSHOT_CREATE,
+                                           SERVER_SNAPSHOT_APPLY,
+                                           SERVER_SNAPSHOT_PHASES,
+                                           SERVER_SNAPSHOT_PHASE_BACKUP,
+                                           SERVER_SNAPSHOT_PHASE_STOP,
+                                           SERVER_SNAPSHOT_PHASE_REBUILD,
+                                           SERVER_SNAPSHOT_PHASE_START,
                                            SERVER_OPENSTACK_TYPE,
                                            SERVER_GROUP_NODE_TYPE,
                                            SERVER_REBOOT_HARD,
                                            SERVER_REBOOT_SOFT,
                                            SERVER_ACTION_STATUS_PENDING,
                                            SERVER_ACTION_STATUS_DONE,
-                                           SERVER_REBUILD_SPAWNING_STATUS,
-                                           SERVER_REBUILD_STATUS,
                                            SERVER_TASK_STATE,
                                            SERVER_INTERFACE_IDS,
+                                           SERVER_CONSOLE_PROBE,
                                            SERVER_ADMIN_PASSWORD,
-                                           IMAGE_UPLOADING_PENDING,
                                            IMAGE_STATUS_ACTIVE,
-                                           IMAGE_UPLOADING,
                                            INSTANCE_OPENSTACK_TYPE,
                                            VOLUME_DEVICE_NAME_PROPERTY,
                                            VOLUME_OPENSTACK_TYPE,
@@ -80,6 +86,12 @@ from openstacksdk_plugin.constants import (RESOURCE_ID,
 
 from openstacksdk_plugin.utils import \
     (handle_userdata,
+     finish_transition,
+     get_transition_retry_after,
+     poll_resource_deleted,
+     poll_resource_status,
+     run_concurrently,
+     start_transition,
      validate_resource_quota,
      wait_until_status,
      add_resource_list_to_runtime_properties,
@@ -97,60 +109,45 @@ def _stop_server(server):
     Stop server instance
     :param server: Instance of openstack resource (OpenstackServer)
     """
+    flavor = _get_flavor_bucket(server)
     server_resource = server.get()
     if server_resource.status != SERVER_STATUS_SHUTOFF:
         # Trigger stop server API only if it is not stopped before
         if SERVER_TASK_STOP not in ctx.instance.runtime_properties:
             server.stop()
+            start_transition(server, 'stop')
             ctx.instance.runtime_properties[SERVER_TASK_STOP]\
                 = SERVER_ACTION_STATUS_PENDING
 
         # Get the server instance to check the status of the server
-        server_resource = server.get()
+        server_resource = server.get(fresh=True)
         if server_resource.status != SERVER_STATUS_SHUTOFF:
-            raise OperationRetry(message='Server has {} state.'.format(
-                server_resource.status), retry_after=30)
+            raise OperationRetry(
+                message='Server has {} state.'.format(server_resource.status),
+                retry_after=get_transition_retry_after(
+                    server, 'stop', flavor, default=30))
 
         else:
             ctx.logger.info('Server {0} is already stopped'
                             ''.format(server.resource_id))
+            finish_transition(server, 'stop', flavor)
             ctx.instance.runtime_properties[SERVER_TASK_STOP] \
                 = SERVER_ACTION_STATUS_DONE
     else:
         ctx.logger.info('Server {0} is already stopped'
                         ''.format(server.resource_id))
+        finish_transition(server, 'stop', flavor)
         ctx.instance.runtime_properties[SERVER_TASK_STOP]\
             = SERVER_ACTION_STATUS_DONE
 
 
-def _start_server(server):
+def _get_flavor_bucket(server):
     """
-    Start server instance
+    Get the bucket used to group completion times of server transitions
     :param server: Instance of openstack resource (OpenstackServer)
+    :return str: Flavor of the server or None when it is unknown
     """
-    server_resource = server.get()
-    if server_resource.status != SERVER_STATUS_ACTIVE:
-        # Trigger stop server API only if it is not stopped before
-        if SERVER_TASK_START not in ctx.instance.runtime_properties:
-            server.start()
-            ctx.instance.runtime_properties[SERVER_TASK_START]\
-                = SERVER_ACTION_STATUS_PENDING
-
-        # Get the server instance to check the status of the server
-        server = server.get()
-        if server.status != SERVER_STATUS_ACTIVE:
-            raise OperationRetry(message='Server has {} state.'.format(
-                server.status), retry_after=30)
-
-        else:
-            ctx.logger.info('Server is already started')
-            ctx.instance.runtime_properties[SERVER_TASK_START] \
-                = SERVER_ACTION_STATUS_DONE
-
-    else:
-        ctx.logger.info('Server is already started')
-        ctx.instance.runtime_properties[SERVER_TASK_START]\
-            = SERVER_ACTION_STATUS_DONE
+    return server.config.get('flavor_id')
 
 
 def _set_server_ips_runtime_properties(server):
@@ -278,104 +275,145 @@ def _handle_server_group(openstack_resource):
         openstack_resource.config['scheduler_hints'] = scheduler_hints
 
 
-def _handle_generate_snapshot(server,
-                              snapshot_name,
-                              snapshot_type,
-                              snapshot_rotation,
-                              snapshot_incremental):
+def _get_snapshot_state(operation, snapshot_name):
     """
-    This method will generate snapshot for server
-    :param server: instance of openstack resource (OpenstackServer)
+    Get the state of server snapshot operation which was started by a
+    previous invocation of the same operation for the same snapshot
+    :param str operation: Snapshot operation, i.e. create or apply
     :param str snapshot_name: Snapshot name
-    :param str snapshot_type: Snapshot type e.g (daily, weekly)
-    :param int snapshot_rotation: Snapshot rotation period
-    :param bool snapshot_incremental: Flag to create an incremental snapshots
-     or full backup
+    :return dict: Copy of the snapshot state or None to start over
     """
+    state = ctx.instance.runtime_properties.get(SERVER_SNAPSHOT_STATE)
+    if state and state.get('operation') == operation \
+            and state.get('name') == snapshot_name:
+        return dict(state)
+    return None
+
 
-    # # we save backupstate for get last state of creation
-    backup_done = ctx.instance.runtime_properties.get(SERVER_TASK_BACKUP_DONE)
-    if not backup_done:
-        if not snapshot_incremental:
-            server.backup(snapshot_name, snapshot_type, snapshot_rotation)
+def _start_snapshot_phase(server, state, phase, server_resource=None):
+    """
+    Trigger the server action of snapshot phase and keep the phase as part
+    of the snapshot state, so that operation retries continue from it
+    :param server: instance of openstack server resource (OpenstackServer)
+    :param dict state: Snapshot state
+    :param str phase: Snapshot phase which should be started
+    :param server_resource: Last known openstack.compute.v2.server.Server,
+     used to skip stop/start when the server is already in that status
+    """
+    if phase == SERVER_SNAPSHOT_PHASE_BACKUP:
+        if not state.get('incremental'):
+            server.backup(state['name'],
+                          state.get('backup_type'),
+                          state.get('rotation'))
             ctx.logger.info(
-                'Server backup {0} creation started'.format(snapshot_name))
+                'Server backup {0} creation started'.format(state['name']))
         else:
-            server.create_image(snapshot_name)
+            server.create_image(state['name'])
             ctx.logger.info('Server snapshot {} creation started'
-                            .format(snapshot_name))
-
-        # Set initial value for backup status
-        ctx.instance.runtime_properties[SERVER_TASK_BACKUP_DONE] \
-            = SERVER_ACTION_STATUS_PENDING
-
-    # Wait for finish upload
-    is_finished = \
-        _check_finished_server_task(server,
-                                    [IMAGE_UPLOADING,
-                                     IMAGE_UPLOADING_PENDING])
+                            .format(state['name']))
+    elif phase == SERVER_SNAPSHOT_PHASE_STOP:
+        if server_resource.status != SERVER_STATUS_SHUTOFF:
+            server.stop()
+    elif phase == SERVER_SNAPSHOT_PHASE_REBUILD:
+        ctx.logger.info(
+            'Rebuild {0} with {1}'.format(server.resource_id, state['name']))
+        server.rebuild(image=state['image_id'])
+    elif phase == SERVER_SNAPSHOT_PHASE_START:
+        if server_resource.status != SERVER_STATUS_ACTIVE:
+            server.start()
 
-    if is_finished:
-        ctx.instance.runtime_properties[SERVER_TASK_BACKUP_DONE]\
-            = SERVER_ACTION_STATUS_DONE
+    start_transition(server, phase)
+    state['phase'] = phase
+    ctx.instance.runtime_properties[SERVER_SNAPSHOT_STATE] = state
 
 
-def _handle_snapshot_restore(server, image_id, snapshot_name):
+def _check_snapshot_phase(server, phase, direct=False):
     """
-    This method will handle the actual snapshot restore for certain image
+    Check if the server action of snapshot phase is finished
     :param server: instance of openstack server resource (OpenstackServer)
-    :param str image_id: Image id that should we restore from
-    :param str snapshot_name: Snapshot name
-    """
-    # Get the restore state
-    restore_state =\
-        ctx.instance.runtime_properties.get(SERVER_TASK_RESTORE_STATE)
-
-    # Get the server status in order to decide to stop it or not
-    server_status = ctx.instance.runtime_properties.get(SERVER_TASK_STOP)
-
-    # If restore is not set then we need to stop it and then try to rebuild
-    # the server after server stopped successfully
-    if not restore_state:
-        # Stop server before rebuild it
-        _stop_server(server)
-
-        # Get the server status in order to decide to stop it or not
-        server_status = ctx.instance.runtime_properties.get(SERVER_TASK_STOP)
-
-        # Only continue to next step if the server status is actually
-        # stopped, so that we can rebuild the server
-        if server_status == SERVER_ACTION_STATUS_DONE:
-            ctx.logger.info(
-                'Rebuild {0} with {1}'.format(
-                    server.resource_id, snapshot_name)
-            )
+    :param str phase: Current snapshot phase
+    :param bool direct: Fetch the server directly instead of using the
+     status multiplexer
+    :return tuple: Fetched openstack.compute.v2.server.Server and True when
+     the phase is finished
+    """
+    server_resource = \
+        server.get(fresh=True) if direct else server.get_fresh()
+    if server_resource.status == SERVER_STATUS_ERROR:
+        raise NonRecoverableError(
+            'Server {0} is in {1} status.'.format(server.resource_id,
+                                                  server_resource.status))
+    if phase == SERVER_SNAPSHOT_PHASE_STOP:
+        finished = server_resource.status == SERVER_STATUS_SHUTOFF
+    elif phase == SERVER_SNAPSHOT_PHASE_START:
+        finished = server_resource.status == SERVER_STATUS_ACTIVE
+    else:
+        # Image upload and rebuild are finished once the server has no
+        # task running
+        finished = getattr(server_resource, SERVER_TASK_STATE) is None
+    return server_resource, finished
 
-            # Rebuild server after server stopped successfully
-            server.rebuild(image=image_id)
 
-            # Set the initial status of restore state
-            ctx.instance.runtime_properties[SERVER_TASK_RESTORE_STATE] \
-                = SERVER_ACTION_STATUS_PENDING
+def _run_snapshot_phases(server, state):
+    """
+    Run the phases of server snapshot operation in order, starting from the
+    current phase of the snapshot state. Phases which finish within the
+    polling budget are run by the same operation invocation, otherwise the
+    operation is retried and continues from the unfinished phase
+    :param server: instance of openstack server resource (OpenstackServer)
+    :param dict state: Snapshot state
+    """
+    flavor = _get_flavor_bucket(server)
+    phases = SERVER_SNAPSHOT_PHASES[state['operation']]
+    poller = Poller.from_client_config(server.client_config,
+                                       logger=ctx.logger)
+    while True:
+        phase = state['phase']
+        checked = []
+
+        def check():
+            # The first check of the phase bypasses the status multiplexer,
+            # which may still hold the status published before the action
+            result = _check_snapshot_phase(server, phase, direct=not checked)
+            checked.append(phase)
+            return result
+
+        server_resource, finished = poller.poll(check)
+        if not finished:
+            raise OperationRetry(
+                message='Snapshot {0} is in {1} phase, server has {2}/{3} '
+                        'state.'.format(state['name'],
+                                        phase,
+                                        server_resource.status,
+                                        getattr(server_resource,
+                                                SERVER_TASK_STATE)),
+                retry_after=get_transition_retry_after(
+                    server, phase, flavor, default=30))
 
-    # Only check this logic if the server is already stopped
-    if server_status == SERVER_ACTION_STATUS_DONE:
-        # Check if the rebuild task is done or not
-        is_finished = \
-            _check_finished_server_task(server,
-                                        [SERVER_REBUILD_SPAWNING_STATUS])
+        finish_transition(server, phase, flavor)
+        index = phases.index(phase) + 1
+        if index == len(phases):
+            break
+        _start_snapshot_phase(server, state, phases[index], server_resource)
 
-        if is_finished:
-            ctx.instance.runtime_properties[SERVER_TASK_RESTORE_STATE]\
-                = SERVER_REBUILD_STATUS
+    server.stop_waiting()
+    del ctx.instance.runtime_properties[SERVER_SNAPSHOT_STATE]
 
-            # Try to start server to be available for usage
-            _start_server(server)
 
-            server_status = ctx.instance.runtime_properties[SERVER_TASK_START]
-            if server_status == SERVER_ACTION_STATUS_DONE:
-                ctx.instance.runtime_properties[SERVER_TASK_RESTORE_STATE]\
-                    = SERVER_ACTION_STATUS_DONE
+def _record_snapshot_image(snapshot_name, image_id):
+    """
+    Keep the image id of server snapshot, so that it is not looked up by
+    name again when the snapshot is applied
+    :param str snapshot_name: Snapshot name
+    :param str image_id: Image id of the snapshot
+    """
+    images = \
+        dict(ctx.instance.runtime_properties.get(SERVER_SNAPSHOT_IMAGES) or {})
+    if image_id:
+        images[snapshot_name] = image_id
+    else:
+        images.pop(snapshot_name, None)
+    ctx.instance.runtime_properties[SERVER_SNAPSHOT_IMAGES] = images
 
 
 def _get_image(image_resource, snapshot_name):
@@ -386,32 +424,48 @@ def _get_image(image_resource, snapshot_name):
     :param str snapshot_name: The snapshot name
     :return: instance of openstack image openstack.compute.v2.image.ImageDetail
     """
-    for image in image_resource.list(query={'name': snapshot_name}):
+    image = image_resource.first_match(
+        lambda image: image.name == snapshot_name,
+        query={'name': snapshot_name})
+    if image:
         ctx.logger.info('Found image {0}'.format(repr(image)))
-        if image.name == snapshot_name:
-            return image
-
-    return None
+    return image
 
 
-def _check_finished_server_task(server_resource, waiting_list):
+def _check_console_markers(openstack_resource, flavor):
     """
-    Check if the current server task is done or not
-    :param server_resource: instance of openstack server resource
-     (OpenstackServer)
-    :param waiting_list: list of status that should be checked on
-    :return: True if task is done, otherwise this should be retired again
+    Check if the console log of the server shows that it finished booting,
+    based on the markers of "readiness_probe" node property. The console
+    log is polled in process until the polling budget is spent, and the
+    read offset is kept for the next operation retry
+    :param openstack_resource: instance of openstack server resource
+    :param str flavor: Flavor bucket of the server
+    :return bool: True when the server is ready or no markers are configured
     """
-    ctx.logger.info("Check server task state....")
-
-    server = server_resource.get()
-    state = getattr(server, SERVER_TASK_STATE)
-    if state not in waiting_list:
+    config = ctx.node.properties.get('readiness_probe') or {}
+    markers = config.get('markers')
+    if not markers:
         return True
 
-    return ctx.operation.retry(
-        message='Server has {0}/{1} state.'
-                ''.format(server.status, state), retry_after=30)
+    start_transition(openstack_resource, 'boot')
+    probe = ConsoleProbe.from_state(
+        openstack_resource,
+        markers,
+        config.get('tail_lines'),
+        ctx.instance.runtime_properties.get(SERVER_CONSOLE_PROBE))
+    poller = Poller.from_client_config(openstack_resource.client_config,
+                                       logger=ctx.logger)
+    _, ready = poller.poll(lambda: (None, probe.check()))
+    if not ready:
+        ctx.instance.runtime_properties[SERVER_CONSOLE_PROBE] = probe.state
+        return False
+
+    ctx.logger.info('Server {0} finished booting'
+                    ''.format(openstack_resource.resource_id))
+    if SERVER_CONSOLE_PROBE in ctx.instance.runtime_properties:
+        del ctx.instance.runtime_properties[SERVER_CONSOLE_PROBE]
+    finish_transition(openstack_resource, 'boot', flavor)
+    return True
 
 
 def _get_bootable_indexed_volumes(mapping_devices):
@@ -773,14 +827,19 @@ def _connect_networks_to_external_server(openstack_resource):
 
     # If we reach here that means we can connect ports & networks to the
     # external server and the validation passed successfully
-    for port_id in ports:
+    def _attach_port(port_id):
         ctx.logger.info('Attaching port {0}...'.format(port_id))
         interface = \
             openstack_resource.create_server_interface({'port_id': port_id})
         ctx.logger.info(
             'Successfully attached port {0} to device (server) id {1}.'
             .format(port_id, openstack_resource.resource_id))
-        added_interfaces.append(interface.id)
+        return interface.id
+
+    added_interfaces.extend(
+        run_concurrently(openstack_resource.client_config,
+                         _attach_port,
+                         ports))
 
     # Check again the server after attaching the ports so that we can do
     # another check if already checked networks
@@ -791,21 +850,30 @@ def _connect_networks_to_external_server(openstack_resource):
             for network in interfaces if network.get(OPENSTACK_NETWORK_ID)
         ]
 
+    def _attach_network(net_id):
+        ctx.logger.info('Attaching network {0}...'.format(net_id))
+        interface = \
+            openstack_resource.create_server_interface({'net_id': net_id})
+        ctx.logger.info(
+            'Successfully attached network {0} to device (server) id {1}.'
+            .format(net_id, openstack_resource.resource_id))
+        return interface.id
+
+    networks_to_attach = []
     for net_id in networks:
         if net_id not in attached_networks:
-            ctx.logger.info('Attaching network {0}...'.format(net_id))
-            interface = \
-                openstack_resource.create_server_interface({'net_id': net_id})
-            ctx.logger.info(
-                'Successfully attached network {0} to device (server) id {1}.'
-                .format(net_id, openstack_resource.resource_id))
-            added_interfaces.append(interface.id)
+            networks_to_attach.append(net_id)
         else:
             ctx.logger.info(
                 'Skipping network {0} attachment, because it is already '
                 'attached to device (server) id {1}.'
                 .format(net_id, openstack_resource.resource_id))
 
+    added_interfaces.extend(
+        run_concurrently(openstack_resource.client_config,
+                         _attach_network,
+                         networks_to_attach))
+
     # Check if there are interfaces added to the external server and add
     # them as runtime properties
     if added_interfaces:
@@ -967,18 +1035,24 @@ def _disconnect_security_group_from_server_ports(client_config,
             network[PORT_OPENSTACK_TYPE]
             for network in networks if network.get(PORT_OPENSTACK_TYPE)
         ]
-    for port_id in server_ports:
-        port = OpenstackPort(client_config=client_config,
-                             logger=ctx.logger)
-        port.resource_id = port_id
-        remote_port = port.get()
-        port_security_groups = remote_port.security_group_ids
-        if security_group_id in remote_port.security_group_ids:
+    port = OpenstackPort(client_config=client_config,
+                         logger=ctx.logger)
+
+    def _remove_security_group(remote_port):
+        port_security_groups = list(remote_port.security_group_ids)
+        if security_group_id in port_security_groups:
             port_security_groups.remove(security_group_id)
 
-        port.update({
+        return {
             'security_groups': port_security_groups
-        })
+        }
+
+    for result in port.get_many(server_ports):
+        if result.error:
+            raise result.error
+        port.resource_id = result.id
+        port.conditional_update(_remove_security_group,
+                                remote_resource=result.resource)
 
 
 @with_openstack_resource(
@@ -1010,6 +1084,7 @@ def create(openstack_resource):
 
     # Update the resource_id with the new "id" returned from API
     openstack_resource.resource_id = created_resource.id
+    start_transition(openstack_resource, 'create')
 
     # Assign runtime properties for server
     assign_resource_payload_as_runtime_properties(ctx,
@@ -1023,24 +1098,33 @@ def configure(openstack_resource):
     Populate required runtime properties for server when it is in active status
     :param openstack_resource: instance of openstack server resource
     """
-    # Get the details for the created servers instance
-    server = openstack_resource.get()
+    # Get the details for the created servers instance until it is active
+    server, _ = poll_resource_status(openstack_resource,
+                                     SERVER_OPENSTACK_TYPE,
+                                     SERVER_STATUS_ACTIVE,
+                                     [SERVER_STATUS_ERROR])
 
     # Get the server status
     status = server.status
+    flavor = _get_flavor_bucket(openstack_resource)
     if status == SERVER_STATUS_ACTIVE:
         ctx.logger.info('Server {0} is already started'.format(server.id))
+        finish_transition(openstack_resource, 'create', flavor)
+        if not _check_console_markers(openstack_resource, flavor):
+            raise OperationRetry(
+                message='Waiting for server {0} to finish booting. '
+                        'Retrying...'.format(server.id),
+                retry_after=get_transition_retry_after(
+                    openstack_resource, 'boot', flavor))
         _set_server_ips_runtime_properties(server)
         _get_user_password(openstack_resource)
         return
-    elif status == SERVER_STATUS_ERROR:
-        raise NonRecoverableError(
-            'Server {0} cannot be started, '
-            'because it is on error state'.format(server.id))
     else:
         raise OperationRetry(
             message='Waiting for server to be in {0} state but is in {1} '
-                    'state. Retrying...'.format(SERVER_STATUS_ACTIVE, status))
+                    'state. Retrying...'.format(SERVER_STATUS_ACTIVE, status),
+            retry_after=get_transition_retry_after(
+                openstack_resource, 'create', flavor))
 
 
 @with_openstack_resource(OpenstackServer)
@@ -1049,6 +1133,7 @@ def delete(openstack_resource):
     Delete current openstack server
     :param openstack_resource: instance of openstack server resource
     """
+    flavor = _get_flavor_bucket(openstack_resource)
     # Get the details for the created server instance
     try:
         server = openstack_resource.get()
@@ -1060,17 +1145,28 @@ def delete(openstack_resource):
 
         ctx.logger.info('Server {0} is deleted successfully'
                         .format(openstack_resource.resource_id))
+        finish_transition(openstack_resource, 'delete', flavor)
         return
 
     # Check if delete operation triggered or not before
     if SERVER_TASK_DELETE not in ctx.instance.runtime_properties:
         openstack_resource.delete()
+        start_transition(openstack_resource, 'delete')
         ctx.instance.runtime_properties[SERVER_TASK_DELETE] = True
 
     ctx.logger.info('Waiting for server "{0}" to be deleted.'
                     ' current status: {1}'.format(server.id, server.status))
 
-    raise OperationRetry(message='Server has {0} state.'.format(server.status))
+    if poll_resource_deleted(openstack_resource):
+        ctx.logger.info('Server {0} is deleted successfully'
+                        .format(openstack_resource.resource_id))
+        finish_transition(openstack_resource, 'delete', flavor)
+        return
+
+    raise OperationRetry(
+        message='Server has {0} state.'.format(server.status),
+        retry_after=get_transition_retry_after(
+            openstack_resource, 'delete', flavor))
 
 
 @with_openstack_resource(
@@ -1107,20 +1203,24 @@ def reboot(openstack_resource, reboot_type='soft'):
                 'Unexpected reboot type: {}. '
                 'Valid values: SOFT or HARD.'.format(reboot_type))
         openstack_resource.reboot(reboot_type.upper())
+        start_transition(openstack_resource, 'reboot')
 
     # Get the details for the rebooted server instance
     server = openstack_resource.get()
+    flavor = _get_flavor_bucket(openstack_resource)
 
     if server.status in [SERVER_STATUS_REBOOT,
                          SERVER_STATUS_HARD_REBOOT,
                          SERVER_STATUS_UNKNOWN]:
         return ctx.operation.retry(
             message="Server has {0} state. Waiting.".format(server.status),
-            retry_after=30)
+            retry_after=get_transition_retry_after(
+                openstack_resource, 'reboot', flavor, default=30))
 
     elif server.status == SERVER_STATUS_ACTIVE:
         ctx.logger.info(
             'Reboot operation finished in {} state.'.format(server.status))
+        finish_transition(openstack_resource, 'reboot', flavor)
 
     elif server.status == SERVER_STATUS_ERROR:
         raise NonRecoverableError(
@@ -1183,23 +1283,29 @@ def snapshot_create(openstack_resource, **kwargs):
         logger=ctx.logger
     )
 
-    # Try to lookup the image from openstack
-    retry_number = ctx.operation.retry_number
-    target_image = _get_image(image_resource, snapshot_name)
+    state = _get_snapshot_state(SERVER_SNAPSHOT_CREATE, snapshot_name)
+    if not state:
+        if _get_image(image_resource, snapshot_name):
+            raise NonRecoverableError(
+                'Snapshot {} already exists.'.format(snapshot_name))
+
+        state = {
+            'operation': SERVER_SNAPSHOT_CREATE,
+            'name': snapshot_name,
+            'incremental': snapshot_incremental,
+            'backup_type': snapshot_type,
+            'rotation': snapshot_rotation,
+        }
+        _start_snapshot_phase(openstack_resource,
+                              state,
+                              SERVER_SNAPSHOT_PHASE_BACKUP)
 
-    # If retry_number == 0 and image exists then we should raise error,
-    # otherwise if retry_number exceeds 0 then that means the image is still
-    # uploading
-    if retry_number == 0 and target_image:
-        raise NonRecoverableError(
-            'Snapshot {} already exists.'.format(snapshot_name))
+    _run_snapshot_phases(openstack_resource, state)
 
-    # Handle snapshot here
-    _handle_generate_snapshot(openstack_resource,
-                              snapshot_name,
-                              snapshot_type,
-                              snapshot_rotation,
-                              snapshot_incremental)
+    # Look up the uploaded image once, snapshot apply uses its id afterwards
+    target_image = _get_image(image_resource, snapshot_name)
+    _record_snapshot_image(snapshot_name,
+                           target_image.id if target_image else None)
 
 
 @with_openstack_resource(OpenstackServer)
@@ -1220,22 +1326,36 @@ def snapshot_apply(openstack_resource, **kwargs):
                           snapshot_name,
                           snapshot_incremental)
 
-    # Create an instance if openstack image in order to check if the image
-    # already exists or not
-    image_resource = OpenstackImage(
-        client_config=openstack_resource.client_config,
-        logger=ctx.logger
-    )
-
-    # Check if the image need to be restored is existed
-    target_image = _get_image(image_resource, snapshot_name)
-    if not target_image:
-        raise NonRecoverableError(
-            'No snapshot found with name: {0}'.format(snapshot_name))
+    state = _get_snapshot_state(SERVER_SNAPSHOT_APPLY, snapshot_name)
+    if not state:
+        images = \
+            ctx.instance.runtime_properties.get(SERVER_SNAPSHOT_IMAGES) or {}
+        image_id = images.get(snapshot_name)
+        if not image_id:
+            # The snapshot was not created by this node instance, so the
+            # image is looked up by its name
+            image_resource = OpenstackImage(
+                client_config=openstack_resource.client_config,
+                logger=ctx.logger
+            )
+            target_image = _get_image(image_resource, snapshot_name)
+            if not target_image:
+                raise NonRecoverableError(
+                    'No snapshot found with name: {0}'.format(snapshot_name))
+            image_id = target_image.id
+
+        state = {
+            'operation': SERVER_SNAPSHOT_APPLY,
+            'name': snapshot_name,
+            'image_id': image_id,
+        }
+        # Stop server before rebuild it
+        _start_snapshot_phase(openstack_resource,
+                              state,
+                              SERVER_SNAPSHOT_PHASE_STOP,
+                              openstack_resource.get())
 
-    _handle_snapshot_restore(openstack_resource,
-                             target_image.id,
-                             snapshot_name)
+    _run_snapshot_phases(openstack_resource, state)
 
 
 @with_openstack_resource(OpenstackServer)
@@ -1269,32 +1389,33 @@ def snapshot_delete(openstack_resource, **kwargs):
         raise NonRecoverableError(
             'No snapshot found with name: {0}'.format(snapshot_name))
 
+    # Images are grouped by their size in bytes
+    size = get_size_bucket(target_image.size)
     if target_image.status == IMAGE_STATUS_ACTIVE:
         image_resource.resource_id = target_image.id
         image_resource.delete()
+        start_transition(image_resource, 'delete')
 
     # Check if the image need to be deleted is existed
     target_image = _get_image(image_resource, snapshot_name)
     if target_image:
         return ctx.operation.retry(
-            message='{} is still alive'
-                    ''.format(target_image.id), retry_after=30)
+            message='{} is still alive'.format(target_image.id),
+            retry_after=get_transition_retry_after(
+                image_resource, 'delete', size, default=30))
     else:
+        finish_transition(image_resource, 'delete', size)
         # If image is remove then we need to reset the following
         # runtime properties:
-        # - backup_done
-        # - restore_state
         # - stop_server_task
-        # - start_server_task
+        # - snapshot_state
+        # - image id of the snapshot
 
         # The reason for reset the above runtime properties is because of
         # the user want to start over again after running delete snapshot
         # operation # "cloudify.interfaces.snapshot.delete"
-        for attr in [SERVER_TASK_BACKUP_DONE,
-                     SERVER_TASK_RESTORE_STATE,
-                     SERVER_TASK_STOP,
-                     SERVER_TASK_START]:
-
+        _record_snapshot_image(snapshot_name, None)
+        for attr in [SERVER_SNAPSHOT_STATE, SERVER_TASK_STOP]:
             if attr in ctx.instance.runtime_properties:
                 del ctx.instance.runtime_properties[attr]
 
@@ -1518,7 +1639,8 @@ def update(openstack_resource, args):
 def list_servers(openstack_resource,
                  query=None,
                  all_projects=False,
-                 details=True):
+                 details=True,
+                 fields=None):
     """
     List openstack servers based on filters applied
     :param openstack_resource: Instance of current openstack server
@@ -1531,8 +1653,11 @@ def list_servers(openstack_resource,
                 will be returned. The default, ``True``, will cause
                 :class:`~openstack.compute.v2.server.ServerDetail`
                 instances to be returned.
+    :param list fields: Optional names of the attributes to return for
+            every resource instead of the whole resource.
     """
-    servers = openstack_resource.list(details, all_projects, query)
+    servers = openstack_resource.list(details, all_projects, query,
+                                      fields=fields)
     add_resource_list_to_runtime_properties(SERVER_OPENSTACK_TYPE, servers)
 
 
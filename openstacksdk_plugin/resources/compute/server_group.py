@@ -61,12 +61,14 @@ def update(openstack_resource, args):
 
 
 @with_openstack_resource(OpenstackServerGroup)
-def list_server_groups(openstack_resource, query=None):
+def list_server_groups(openstack_resource, query=None, fields=None):
     """
     List openstack server groups
     :param openstack_resource: Instance of openstack sever group.
+    :param list fields: Optional names of the attributes to return for
+            every resource instead of the whole resource.
     """
-    server_groups = openstack_resource.list(query)
+    server_groups = openstack_resource.list(query, fields=fields)
     add_resource_list_to_runtime_properties(SERVER_GROUP_OPENSTACK_TYPE,
                                             server_groups)
 
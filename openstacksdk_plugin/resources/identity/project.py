@@ -29,6 +29,7 @@ from openstacksdk_plugin.constants import (RESOURCE_ID,
                                            IDENTITY_QUOTA)
 from openstacksdk_plugin.utils import (validate_resource_quota,
                                        reset_dict_empty_keys,
+                                       run_concurrently,
                                        add_resource_list_to_runtime_properties)
 
 
@@ -50,27 +51,35 @@ def _assign_users(project_resource, users):
         logger=ctx.logger
     )
 
+    assignments = []
     for user in users:
         user_roles = user.get(IDENTITY_ROLES, [])
-        user_item = user_resource.find_user(user.get('name'))
-        if not user_item:
+        user_id = user_resource.find_user_id(user.get('name'))
+        if not user_id:
             raise NonRecoverableError('User {0} is not found'
                                       ''.format(user['name']))
 
         for role in user_roles:
-            user_role = role_resource.find_role(role)
-            if not user_role:
+            role_id = role_resource.find_role_id(role)
+            if not role_id:
                 raise NonRecoverableError('Role {0} is not found'.format(role))
+            assignments.append((user_id, role_id))
 
-            # Assign project role to user
-            role_resource.assign_project_role_to_user(
-                project_id=project_resource.resource_id,
-                user_id=user_item.id,
-                role_id=user_role.id)
+    def _assign_role(assignment):
+        user_id, role_id = assignment
+        # Assign project role to user
+        role_resource.assign_project_role_to_user(
+            project_id=project_resource.resource_id,
+            user_id=user_id,
+            role_id=role_id)
 
-            ctx.logger.info(
-                'Assigned user {0} to project {1} with role {2}'.format(
-                    user_item.id, project_resource.resource_id, user_role.id))
+        ctx.logger.info(
+            'Assigned user {0} to project {1} with role {2}'.format(
+                user_id, project_resource.resource_id, role_id))
+
+    run_concurrently(project_resource.client_config,
+                     _assign_role,
+                     assignments)
 
 
 def _validate_users(client_config, users):
@@ -96,8 +105,7 @@ def _validate_users(client_config, users):
         raise NonRecoverableError(' Provided users are not unique')
 
     for user_name in user_names:
-        user = user_resource.find_user(user_name)
-        if not user:
+        if not user_resource.find_user_id(user_name):
             raise NonRecoverableError(
                 'User {0} is not found'.format(user_name))
 
@@ -108,8 +116,7 @@ def _validate_users(client_config, users):
 
     role_names = {role for user in users for role in user.get(IDENTITY_ROLES)}
     for role_name in role_names:
-        user_role = role_resource.find_role(role_name)
-        if not user_role:
+        if not role_resource.find_role_id(role_name):
             raise NonRecoverableError(
                 'Role {0} is not found'.format(role_name))
 
@@ -170,18 +177,20 @@ def update(openstack_resource, args):
     :param args: dict of information need to be updated
     """
     args = reset_dict_empty_keys(args)
-    openstack_resource.update(args)
+    openstack_resource.update_changes(args)
 
 
 @with_openstack_resource(OpenstackProject)
-def list_projects(openstack_resource, query=None):
+def list_projects(openstack_resource, query=None, fields=None):
     """
     List openstack projects
     :param openstack_resource: Instance of openstack project.
     :param kwargs query: Optional query parameters to be sent to limit
                                  the resources being returned.
+    :param list fields: Optional names of the attributes to return for
+            every resource instead of the whole resource.
     """
-    projects = openstack_resource.list(query)
+    projects = openstack_resource.list(query, fields=fields)
     add_resource_list_to_runtime_properties(PROJECT_OPENSTACK_TYPE, projects)
 
 
@@ -52,16 +52,18 @@ def update(openstack_resource, args):
     :param args: dict of information need to be updated
     """
     args = reset_dict_empty_keys(args)
-    openstack_resource.update(args)
+    openstack_resource.update_changes(args)
 
 
 @with_openstack_resource(OpenstackUser)
-def list_users(openstack_resource, query=None):
+def list_users(openstack_resource, query=None, fields=None):
     """
     List openstack users
     :param openstack_resource: Instance of openstack user.
     :param kwargs query: Optional query parameters to be sent to limit
                                  the resources being returned.
+    :param list fields: Optional names of the attributes to return for
+            every resource instead of the whole resource.
     """
-    users = openstack_resource.list(query)
+    users = openstack_resource.list(query, fields=fields)
     add_resource_list_to_runtime_properties(USER_OPENSTACK_TYPE, users)
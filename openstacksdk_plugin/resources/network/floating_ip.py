@@ -165,13 +165,11 @@ def _update_floating_ip_network(floating_ip_resource):
             logger=ctx.logger)
         # Set the network name provided in "resource_config"
         network.name = floating_network_name
-        # Lookup remote network
-        remote_network = network.find_network()
-        if not remote_network:
+        # Lookup remote network id
+        floating_network_id = network.find_network_id()
+        if not floating_network_id:
             raise NonRecoverableError('Floating IP network {0} not found'
                                       ''.format(floating_network_name))
-        # Set "floating_network_id" to the remote network id
-        floating_network_id = remote_network.id
         # Clean "floating_network_name" from floating_ip_config since it is
         # not part of the payload request for creating floating ip
         del floating_ip_config['floating_network_name']
@@ -241,14 +239,16 @@ def update(openstack_resource, args):
 
 
 @with_openstack_resource(OpenstackFloatingIP)
-def list_floating_ips(openstack_resource, query=None):
+def list_floating_ips(openstack_resource, query=None, fields=None):
     """
     List openstack floating ips based on filters applied
     :param openstack_resource: Instance of current openstack floating ip
     :param kwargs query: Optional query parameters to be sent to limit
             the floating ips being returned.
+    :param list fields: Optional names of the attributes to return for
+            every resource instead of the whole resource.
     """
-    floating_ips = openstack_resource.list(query)
+    floating_ips = openstack_resource.list(query, fields=fields)
     add_resource_list_to_runtime_properties(
         FLOATING_IP_OPENSTACK_TYPE, floating_ips)
 
@@ -54,18 +54,20 @@ def update(openstack_resource, args):
     :param args: dict of information need to be updated
     """
     args = reset_dict_empty_keys(args)
-    openstack_resource.update(args)
+    openstack_resource.update_changes(args)
 
 
 @with_openstack_resource(OpenstackNetwork)
-def list_networks(openstack_resource, query=None):
+def list_networks(openstack_resource, query=None, fields=None):
     """
     List openstack networks based on filters applied
     :param openstack_resource: Instance of current openstack network
     :param kwargs query: Optional query parameters to be sent to limit
             the networks being returned.
+    :param list fields: Optional names of the attributes to return for
+            every resource instead of the whole resource.
     """
-    networks = openstack_resource.list(query)
+    networks = openstack_resource.list(query, fields=fields)
     add_resource_list_to_runtime_properties(NETWORK_OPENSTACK_TYPE, networks)
 
 
@@ -107,40 +107,42 @@ def _update_external_port(openstack_resource):
     :param openstack_resource: Instance Of OpenstackPort in order to
     use it
     """
-    # Get the external port using the resource id provided via port node
-    external_port = openstack_resource.get()
     # Check if the current port node has allowed_address_pairs as part of
     # resource_config
     addresses_to_add = openstack_resource.config.get('allowed_address_pairs')
     if addresses_to_add:
-        old_addresses = external_port.get('allowed_address_pairs') or []
 
-        # Get the old ips from the each pair
-        old_ips = \
-            [
-                old_address['ip_address']
-                for old_address
-                in old_addresses if old_address.get('ip_address')
-            ]
-        # Get the ips need to be added to the external port
-        ips_to_add = \
-            [
-                address_to_add['ip_address']
-                for address_to_add
-                in addresses_to_add if address_to_add.get('ip_address')
-            ]
-
-        # Check if there are a common ips between old ips and the one we
-        # should add via node
-        common_ips = set(old_ips) & set(ips_to_add)
-        if common_ips:
-            raise NonRecoverableError(
-                'Ips {0} are already assigned to {1}'
-                ''.format(common_ips, external_port.id))
-
-        # Update port for allowed paris
-        updated_port = openstack_resource.update(
-            {'allowed_address_pairs':  addresses_to_add})
+        def _add_addresses(external_port):
+            old_addresses = external_port.get('allowed_address_pairs') or []
+
+            # Get the old ips from the each pair
+            old_ips = \
+                [
+                    old_address['ip_address']
+                    for old_address
+                    in old_addresses if old_address.get('ip_address')
+                ]
+            # Get the ips need to be added to the external port
+            ips_to_add = \
+                [
+                    address_to_add['ip_address']
+                    for address_to_add
+                    in addresses_to_add if address_to_add.get('ip_address')
+                ]
+
+            # Check if there are a common ips between old ips and the one we
+            # should add via node
+            common_ips = set(old_ips) & set(ips_to_add)
+            if common_ips:
+                raise NonRecoverableError(
+                    'Ips {0} are already assigned to {1}'
+                    ''.format(common_ips, external_port.id))
+
+            return {'allowed_address_pairs': old_addresses + addresses_to_add}
+
+        # Update port for allowed paris, other nodes could add their pairs
+        # to the same external port concurrently
+        updated_port = openstack_resource.conditional_update(_add_addresses)
         # Update runtime properties
         update_runtime_properties(
             {
@@ -169,23 +171,12 @@ def _clean_addresses_from_external_port(openstack_resource):
     while the port node created at install workflow
     :param openstack_resource:
     """
-    # Get the external port using the resource id provided via port node
-    external_port = openstack_resource.get()
     # Check if the current port node has allowed_address_pairs as part of
     # resource_config
     addresses_to_remove = openstack_resource.config.get(
         'allowed_address_pairs')
 
     if addresses_to_remove:
-        remote_addresses = external_port.allowed_address_pairs or []
-        # Get the remote ips from the each pair
-        remote_ips = \
-            [
-                remote_address['ip_address']
-                for remote_address
-                in remote_addresses if remote_address.get('ip_address')
-            ]
-
         # Get the ips need to be removed to the external port
         ips_to_remove = \
             [
@@ -194,16 +185,19 @@ def _clean_addresses_from_external_port(openstack_resource):
                 in addresses_to_remove if address_to_remove.get('ip_address')
             ]
 
-        # Check if there are a common ips between old ips and the one we
-        # should remove via node
-        diff_ips = set(remote_ips) - set(ips_to_remove)
-        diff_ips = list(diff_ips) if diff_ips else []
-        updated_pairs = []
-        for ip_address in diff_ips:
-            updated_pairs.append({'ip_address': ip_address})
+        def _remove_addresses(external_port):
+            remote_addresses = external_port.allowed_address_pairs or []
+            # Keep the pairs which were not added via node
+            return {
+                'allowed_address_pairs': [
+                    remote_address
+                    for remote_address in remote_addresses
+                    if remote_address.get('ip_address') not in ips_to_remove
+                ]
+            }
 
         # Update port for allowed paris
-        openstack_resource.update({'allowed_address_pairs':  updated_pairs})
+        openstack_resource.conditional_update(_remove_addresses)
 
 
 @with_openstack_resource(
@@ -251,18 +245,20 @@ def update(openstack_resource, args):
     :param args: dict of information need to be updated
     """
     args = reset_dict_empty_keys(args)
-    openstack_resource.update(args)
+    openstack_resource.update_changes(args)
 
 
 @with_openstack_resource(OpenstackPort)
-def list_ports(openstack_resource, query=None):
+def list_ports(openstack_resource, query=None, fields=None):
     """
     List openstack ports based on filters applied
     :param openstack_resource: Instance of current openstack port
     :param kwargs query: Optional query parameters to be sent to limit
             the ports being returned.
+    :param list fields: Optional names of the attributes to return for
+            every resource instead of the whole resource.
     """
-    ports = openstack_resource.list(query)
+    ports = openstack_resource.list(query, fields=fields)
     add_resource_list_to_runtime_properties(PORT_OPENSTACK_TYPE, ports)
 
 
@@ -32,6 +32,7 @@ from openstacksdk_plugin.constants import (RESOURCE_ID,
 
 from openstacksdk_plugin.utils import (reset_dict_empty_keys,
                                        merge_resource_config,
+                                       run_concurrently,
                                        validate_resource_quota,
                                        add_resource_list_to_runtime_properties,
                                        find_relationships_by_relationship_type)
@@ -203,13 +204,14 @@ def _disable_dhcp_for_subnets(client_config, resource_id):
     network_item = network.get()
     # Disable dhcp option for all attached subnets associated with
     # current network
-    for subnet_id in network_item.subnet_ids:
-        subnet = OpenstackSubnet(client_config, logger=ctx.logger)
-        subnet.resource_id = subnet_id
-        subnet_item = subnet.get()
+    subnet = OpenstackSubnet(client_config, logger=ctx.logger)
+    for result in subnet.get_many(network_item.subnet_ids):
+        if result.error:
+            raise result.error
         # Disable dhcp for subnets if its already enabled, since this
         # will prevent rbac policy from deletion
-        if subnet_item.is_dhcp_enabled:
+        if result.resource.is_dhcp_enabled:
+            subnet.resource_id = result.id
             subnet.update(new_config={'enable_dhcp': False})
 
 
@@ -227,10 +229,16 @@ def _clean_ports_from_network(client_config, resource_id):
     # need to remove ports ourselves if resource is not created using
     # cloudify
     port = OpenstackPort(client_config, logger=ctx.logger)
-    for port_item in port.list(query={'network_id': resource_id}):
-        port.resource_id = port_item.id
-        port.update(new_config={'device_id': 'none'})
-        port.delete()
+
+    def _clean_port(port_item):
+        network_port = OpenstackPort(client_config, logger=ctx.logger)
+        network_port.resource_id = port_item.id
+        network_port.update(new_config={'device_id': 'none'})
+        network_port.delete()
+
+    run_concurrently(client_config,
+                     _clean_port,
+                     port.list(query={'network_id': resource_id}))
 
 
 def _clean_resources_from_target_object(client_config,
@@ -296,15 +304,17 @@ def update(openstack_resource, args):
 
 
 @with_openstack_resource(OpenstackRBACPolicy)
-def list_rbac_policies(openstack_resource, query=None):
+def list_rbac_policies(openstack_resource, query=None, fields=None):
     """
     List openstack rbac policies based on filters applied
     :param openstack_resource: Instance of current openstack rbac policy
     :param kwargs query: Optional query parameters to be sent to limit
             the rbac policies being returned.
+    :param list fields: Optional names of the attributes to return for
+            every resource instead of the whole resource.
     """
 
-    rbac_policies = openstack_resource.list(query)
+    rbac_policies = openstack_resource.list(query, fields=fields)
     add_resource_list_to_runtime_properties(RBAC_POLICY_OPENSTACK_TYPE,
                                             rbac_policies)
 
@@ -333,9 +343,14 @@ def find_and_delete(openstack_resource,
     # rbac policy based on the configuration provided by operation task and
     # then remove it
     rbac_policy_config.pop('id')
-    rbac_policies = openstack_resource.list()
 
-    for rbac_policy in rbac_policies:
+    # We need to do a mapping between "target_project_id" and
+    # "target_tenant" to do the comparison
+    def _parse_item(item):
+        return (item[0], item[1]) if item[0] != 'target_project_id'\
+            else ('target_tenant', item[1])
+
+    def _is_matched(rbac_policy):
         # In order to find the rbac policy we need to filter the rbac policy
         # based on the following params
         # - object_type
@@ -359,37 +374,33 @@ def find_and_delete(openstack_resource,
         # - object_id
         # - action
         # - target_project_id
-
-        # We need to do a mapping between "target_project_id" and
-        # "target_tenant" to do the comparison
-        def _parse_item(item):
-            return (item[0], item[1]) if item[0] != 'target_project_id'\
-                else ('target_tenant', item[1])
-
         rbac_policy = dict(map(_parse_item, rbac_policy.iteritems()))
-        if all(item in rbac_policy.items()
-               for item in rbac_policy_config.items()):
+        return all(item in rbac_policy.items()
+                   for item in rbac_policy_config.items())
 
-            # Found the target object which should be deleted
-            ctx.logger.info(
-                'Found RBAC policy with ID: {0} - deleting ...'
-                ''.format(rbac_policy['id'])
-            )
+    # Stop listing rbac policies as soon as the target one is found
+    rbac_policy = openstack_resource.first_match(_is_matched)
+    if not rbac_policy:
+        ctx.logger.warn('No suitable RBAC policy found')
+        return
 
-            # Call clean method
-            _clean_resources_from_target_object(
-                openstack_resource.client_config,
-                rbac_policy['object_id'],
-                NETWORK_OPENSTACK_TYPE,
-                disable_dhcp,
-                clean_ports
-            )
-            # We need to delete the matched object
-            openstack_resource.resource_id = rbac_policy['id']
-            openstack_resource.delete()
-            return
+    # Found the target object which should be deleted
+    ctx.logger.info(
+        'Found RBAC policy with ID: {0} - deleting ...'
+        ''.format(rbac_policy['id'])
+    )
 
-    ctx.logger.warn('No suitable RBAC policy found')
+    # Call clean method
+    _clean_resources_from_target_object(
+        openstack_resource.client_config,
+        rbac_policy['object_id'],
+        NETWORK_OPENSTACK_TYPE,
+        disable_dhcp,
+        clean_ports
+    )
+    # We need to delete the matched object
+    openstack_resource.resource_id = rbac_policy['id']
+    openstack_resource.delete()
 
 
 @with_openstack_resource(OpenstackRBACPolicy)
@@ -58,11 +58,11 @@ def _get_connected_external_network_from_relationship(network_resource):
     # List to save all external networks connected to router
     external_network_ids = []
 
-    for net_id in networks:
-        network_resource.resource_id = net_id
-        remote_network = network_resource.get()
-        if remote_network.is_router_external:
-            external_network_ids.append(net_id)
+    for result in network_resource.get_many(networks):
+        if result.error:
+            raise result.error
+        if result.resource.is_router_external:
+            external_network_ids.append(result.id)
 
     if len(external_network_ids) > 1:
         raise NonRecoverableError(
@@ -163,18 +163,20 @@ def update(openstack_resource, args):
     :param args: dict of information need to be updated
     """
     args = reset_dict_empty_keys(args)
-    openstack_resource.update(args)
+    openstack_resource.update_changes(args)
 
 
 @with_openstack_resource(OpenstackRouter)
-def list_routers(openstack_resource, query=None):
+def list_routers(openstack_resource, query=None, fields=None):
     """
     List openstack routers based on filters applied
     :param openstack_resource: Instance of current openstack router
     :param kwargs query: Optional query parameters to be sent to limit
             the routers being returned.
+    :param list fields: Optional names of the attributes to return for
+            every resource instead of the whole resource.
     """
-    routers = openstack_resource.list(query)
+    routers = openstack_resource.list(query, fields=fields)
     add_resource_list_to_runtime_properties(ROUTER_OPENSTACK_TYPE, routers)
 
 
@@ -241,15 +243,14 @@ def stop(openstack_resource):
         # Routes need to be removed
         routes_to_delete = ctx.instance.runtime_properties['routes']
 
-        # Get the remote router info
-        router = openstack_resource.get()
-
-        updated_routes = []
-        remote_routes = router['routes'] or {}
-        for remote_route in remote_routes:
-            if remote_route not in routes_to_delete:
-                updated_routes.append(remote_route)
-
-        routes = dict()
-        routes['routes'] = updated_routes
-        openstack_resource.update(routes)
+        def _remove_routes(router):
+            updated_routes = []
+            remote_routes = router['routes'] or []
+            for remote_route in remote_routes:
+                if remote_route not in routes_to_delete:
+                    updated_routes.append(remote_route)
+            return {'routes': updated_routes}
+
+        # Routes could be changed concurrently by other nodes, so only
+        # update them if the router was not changed since it was read
+        openstack_resource.conditional_update(_remove_routes)
@@ -17,12 +17,14 @@
 from cloudify import ctx
 
 # Local imports
+from openstack_sdk.common import raise_for_failures
 from openstack_sdk.resources.networks import OpenstackSecurityGroup
 from openstack_sdk.resources.networks import OpenstackSecurityGroupRule
 from openstacksdk_plugin.decorators import with_openstack_resource
 from openstacksdk_plugin.constants import (RESOURCE_ID,
                                            SECURITY_GROUP_OPENSTACK_TYPE)
 from openstacksdk_plugin.utils import (reset_dict_empty_keys,
+                                       run_concurrently,
                                        validate_resource_quota,
                                        add_resource_list_to_runtime_properties)
 
@@ -56,24 +58,26 @@ def configure(openstack_resource, security_group_rules=None):
     # Check if the "disable_default_egress_rules" is enabled or not so that
     # we can remove default egress rules for current security group
     if ctx.node.properties.get('disable_default_egress_rules'):
-        for sg_rule in security_group_rule.list(
-                query={'security_group_id': security_group_id}):
+        raise_for_failures(
+            security_group_rule.delete_many(
+                sg_rule.id for sg_rule in security_group_rule.list(
+                    query={'security_group_id': security_group_id})))
 
-            security_group_rule.resource_id = sg_rule.id
-            security_group_rule.delete()
-
-    security_group_rule.resource_id = None
     # Check the existing rules attached to current security groups
     # in order to apply them to that group
-    for rule_config in security_group_rules:
+    def _create_rule(rule_config):
         # Check if the config contains the security group id or not
         if not rule_config.get('security_group_id'):
             rule_config['security_group_id'] = security_group_id
 
-        # Create new instance for each security group id
-        security_group_rule.config = rule_config
+        # Create new instance for each security group rule
+        rule = OpenstackSecurityGroupRule(client_config=client_config,
+                                          logger=ctx.logger,
+                                          resource_config=rule_config)
         # Create security group rule
-        security_group_rule.create()
+        return rule.create()
+
+    run_concurrently(client_config, _create_rule, security_group_rules or [])
 
 
 @with_openstack_resource(OpenstackSecurityGroup)
@@ -98,15 +102,17 @@ def update(openstack_resource, args):
 
 
 @with_openstack_resource(OpenstackSecurityGroup)
-def list_security_groups(openstack_resource, query=None):
+def list_security_groups(openstack_resource, query=None, fields=None):
     """
     List openstack security groups based on filters applied
     :param openstack_resource: Instance of current openstack security group
     :param kwargs query: Optional query parameters to be sent to limit
             the security groups being returned.
+    :param list fields: Optional names of the attributes to return for
+            every resource instead of the whole resource.
     """
 
-    security_groups = openstack_resource.list(query)
+    security_groups = openstack_resource.list(query, fields=fields)
     add_resource_list_to_runtime_properties(SECURITY_GROUP_OPENSTACK_TYPE,
                                             security_groups)
 
@@ -47,16 +47,18 @@ def delete(openstack_resource):
 
 
 @with_openstack_resource(OpenstackSecurityGroupRule)
-def list_security_group_rules(openstack_resource, query=None):
+def list_security_group_rules(openstack_resource, query=None, fields=None):
     """
     List openstack security group rules based on filters applied
     :param openstack_resource: Instance of current openstack security group
     rule
     :param kwargs query: Optional query parameters to be sent to limit
     the security group rules being returned.
+    :param list fields: Optional names of the attributes to return for
+            every resource instead of the whole resource.
     """
 
-    security_group_rules = openstack_resource.list(query)
+    security_group_rules = openstack_resource.list(query, fields=fields)
     add_resource_list_to_runtime_properties(SECURITY_GROUP_RULE_OPENSTACK_TYPE,
                                             security_group_rules)
 
@@ -118,18 +118,20 @@ def update(openstack_resource, args):
     :param args: dict of information need to be updated
     """
     args = reset_dict_empty_keys(args)
-    openstack_resource.update(args)
+    openstack_resource.update_changes(args)
 
 
 @with_openstack_resource(OpenstackSubnet)
-def list_subnets(openstack_resource, query=None):
+def list_subnets(openstack_resource, query=None, fields=None):
     """
     List openstack subnets based on filters applied
     :param openstack_resource: Instance of current openstack network
     :param kwargs query: Optional query parameters to be sent to limit
             the networks being returned.
+    :param list fields: Optional names of the attributes to return for
+            every resource instead of the whole resource.
     """
-    subnets = openstack_resource.list(query)
+    subnets = openstack_resource.list(query, fields=fields)
     add_resource_list_to_runtime_properties(SUBNET_OPENSTACK_TYPE, subnets)
 
 
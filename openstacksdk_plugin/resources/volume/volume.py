@@ -13,15 +13,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-# Standard imports
-import time
-
 # Third party imports
 from cloudify import ctx
 from cloudify.exceptions import (OperationRetry, NonRecoverableError)
-import openstack.exceptions
 
 # Local imports
+from openstack_sdk.common import raise_for_failures
+from openstack_sdk.latency_model import get_size_bucket
 from openstack_sdk.resources.volume import (OpenstackVolume,
                                             OpenstackVolumeBackup,
                                             OpenstackVolumeSnapshot)
@@ -37,13 +35,18 @@ from openstacksdk_plugin.constants import (RESOURCE_ID,
                                            VOLUME_SNAPSHOT_TASK,
                                            VOLUME_BACKUP_ID,
                                            VOLUME_SNAPSHOT_ID,
+                                           VOLUME_CLEANUP_PENDING_IDS,
                                            VOLUME_BOOTABLE,
                                            VOLUME_BACKUP_OPENSTACK_TYPE,
                                            VOLUME_SNAPSHOT_OPENSTACK_TYPE)
 from openstacksdk_plugin.utils import\
     (validate_resource_quota,
      merge_resource_config,
-     get_ready_resource_status,
+     finish_transition,
+     get_transition_retry_after,
+     poll_resource_status,
+     poll_resource_deleted,
+     start_transition,
      wait_until_status,
      get_snapshot_name,
      add_resource_list_to_runtime_properties,
@@ -176,19 +179,24 @@ def _create_volume_backup(volume_resource, backup_name):
         backup_response = backup.create()
         backup_id = backup_response.id
         backup.resource_id = backup_id
+        start_transition(backup, 'create')
         ctx.instance.runtime_properties[VOLUME_BACKUP_TASK] = True
         ctx.instance.runtime_properties[VOLUME_BACKUP_ID] = backup_id
 
     backup_resource, ready = \
-        get_ready_resource_status(backup,
-                                  VOLUME_BACKUP_OPENSTACK_TYPE,
-                                  VOLUME_STATUS_AVAILABLE,
-                                  VOLUME_ERROR_STATUSES)
+        poll_resource_status(backup,
+                             VOLUME_BACKUP_OPENSTACK_TYPE,
+                             VOLUME_STATUS_AVAILABLE,
+                             VOLUME_ERROR_STATUSES)
 
+    size = get_size_bucket(volume_resource.config.get('size'))
     if not ready:
-        raise OperationRetry('Volume backup is still in {0} status'.format(
-            backup_resource.status))
+        raise OperationRetry(
+            'Volume backup is still in {0} status'.format(
+                backup_resource.status),
+            retry_after=get_transition_retry_after(backup, 'create', size))
     else:
+        finish_transition(backup, 'create', size)
         del ctx.instance.runtime_properties[VOLUME_BACKUP_TASK]
         del ctx.instance.runtime_properties[VOLUME_BACKUP_ID]
 
@@ -230,20 +238,25 @@ def _create_volume_snapshot(volume_resource, snapshot_name, snapshot_type):
         snapshot_response = snapshot.create()
         snapshot_id = snapshot_response.id
         snapshot.resource_id = snapshot_id
+        start_transition(snapshot, 'create')
         ctx.instance.runtime_properties[VOLUME_SNAPSHOT_TASK] = True
         ctx.instance.runtime_properties[VOLUME_SNAPSHOT_ID] = snapshot_id
 
     # Check the status of the snapshot process
     snapshot_resource, ready = \
-        get_ready_resource_status(snapshot,
-                                  VOLUME_SNAPSHOT_OPENSTACK_TYPE,
-                                  VOLUME_STATUS_AVAILABLE,
-                                  VOLUME_ERROR_STATUSES)
+        poll_resource_status(snapshot,
+                             VOLUME_SNAPSHOT_OPENSTACK_TYPE,
+                             VOLUME_STATUS_AVAILABLE,
+                             VOLUME_ERROR_STATUSES)
 
+    size = get_size_bucket(volume_resource.config.get('size'))
     if not ready:
-        raise OperationRetry('Volume snapshot is still in {0} status'.format(
-            snapshot_resource.status))
+        raise OperationRetry(
+            'Volume snapshot is still in {0} status'.format(
+                snapshot_resource.status),
+            retry_after=get_transition_retry_after(snapshot, 'create', size))
     else:
+        finish_transition(snapshot, 'create', size)
         # Once the snapshot is ready to user, we should clear volume
         # snapshot task & snapshot volume id from runtime properties in order
         # to allow trigger the operation multiple times
@@ -251,10 +264,55 @@ def _create_volume_snapshot(volume_resource, snapshot_name, snapshot_type):
         del ctx.instance.runtime_properties[VOLUME_SNAPSHOT_ID]
 
 
+def _get_backup_query(backup_type, search_opts):
+    """
+    Get the query used to list backups | snapshots volume
+    :param str backup_type: The type of volume backup (Full backup or snapshot)
+    :param dict search_opts: Search criteria used in order to lookup the
+    backups
+    :return dict: Query supported by the backup type
+    """
+    # Since list backups volume does not support query filters for volume
+    # id & name, then we need to take that into consideration since
+    # passing volume_id & name to the backups api will raise
+    # InvalidResourceQuery error
+    if backup_type == VOLUME_SNAPSHOT_OPENSTACK_TYPE:
+        return search_opts
+    return {}
+
+
+def _get_pending_volume_backups(backup_instance,
+                                backup_type,
+                                search_opts,
+                                backup_ids):
+    """
+    This method will check which of the deleted backups | snapshots volume
+    still exist, using a single list request filtered by volume id when the
+    backup type supports it
+    :param backup_instance: This is an instance of volume backup or
+    volume snapshot (OpenstackVolumeBackup | OpenstackVolumeSnapshot)
+    :param str backup_type: The type of volume backup (Full backup or snapshot)
+    :param dict search_opts: Search criteria used in order to lookup the
+    backups
+    :param list backup_ids: Ids of the deleted backups | snapshots
+    :return list: Backups | snapshots which are still alive
+    """
+    query = {}
+    if search_opts.get('volume_id'):
+        query = _get_backup_query(
+            backup_type, {'volume_id': search_opts['volume_id']})
+    backup_ids = set(backup_ids)
+    return [backup for backup in backup_instance.list(query=query)
+            if backup.id in backup_ids]
+
+
 def _clean_volume_backups(backup_instance, backup_type, search_opts):
     """
     This method will clean all backups | snapshots volume based on provided
-    backup type and on filter criteria
+    backup type and on filter criteria. The deletes are triggered once and
+    the ids of the deleted backups | snapshots are kept as runtime
+    properties together with the search criteria, so that operation retries
+    with the same criteria only check those ids until they are all gone
     :param backup_instance: This is an instance of volume backup or
     volume snapshot (OpenstackVolumeBackup | OpenstackVolumeSnapshot)
     required in order to clean all volume backups/snapshots
@@ -262,44 +320,61 @@ def _clean_volume_backups(backup_instance, backup_type, search_opts):
     :param dict search_opts: Search criteria used in order to lookup the
     backups
     """
-    if all([search_opts, backup_instance]):
+    if not all([search_opts, backup_instance]):
+        raise NonRecoverableError('volume_id, name, backup_instance '
+                                  'variables cannot all set to None')
+
+    pending_key = VOLUME_CLEANUP_PENDING_IDS.format(backup_type)
+    cleanup = ctx.instance.runtime_properties.get(pending_key)
+    # Cleanup left by a previous call with other search criteria, i.e. an
+    # aborted snapshot delete, is started over
+    if not isinstance(cleanup, dict) \
+            or cleanup.get('search_opts') != search_opts:
         name = search_opts.get('name')
         volume_id = search_opts.get('volume_id')
-        # Since list backups volume does not support query filters for volume
-        # id & name, then we need to take that into consideration since
-        # passing volume_id & name to the backups api will raise
-        # InvalidResourceQuery error
-        search_query = {}
-        if backup_type == VOLUME_SNAPSHOT_OPENSTACK_TYPE:
-            search_query = search_opts
 
         # Right now list volume backup does not support to list backups
         # using backup name and volume id, so that we need to list all
         # volumes backups and then just do a compare to match the one we
         # need to delete
-        for backup in backup_instance.list(query=search_query):
+        backups_to_delete = []
+        for backup in backup_instance.list(
+                query=_get_backup_query(backup_type, search_opts)):
             if _is_volume_backup_matched(backup, volume_id, name):
                 ctx.logger.debug(
                     'Check {0} before delete: {1}:{2}'
                     ' with state {3}'.format(backup_type, backup.id,
                                              backup.name, backup.status))
-                backup_instance.resource_id = backup.id
-                backup_instance.delete()
-
-        # wait 10 seconds before next check
-        time.sleep(10)
-
-        for backup in backup_instance.list(query=search_query):
+                backups_to_delete.append(backup.id)
+        if not backups_to_delete:
+            if pending_key in ctx.instance.runtime_properties:
+                del ctx.instance.runtime_properties[pending_key]
+            return
+
+        raise_for_failures(backup_instance.delete_many(backups_to_delete))
+        start_transition(backup_instance, 'delete')
+        cleanup = {'search_opts': dict(search_opts), 'ids': backups_to_delete}
+        ctx.instance.runtime_properties[pending_key] = cleanup
+
+    pending = _get_pending_volume_backups(
+        backup_instance, backup_type, search_opts, cleanup['ids'])
+    if pending:
+        for backup in pending:
             ctx.logger.debug('Check {0} after delete: {1}:{2} with state {3}'
                              .format(backup_type, backup.id,
                                      backup.name, backup.status))
-            if _is_volume_backup_matched(backup, volume_id, name):
-                return ctx.operation.retry(
-                    message='{0} is still alive'.format(backup.name),
-                    retry_after=30)
-    else:
-        raise NonRecoverableError('volume_id, name, backup_instance '
-                                  'variables cannot all set to None')
+        ctx.instance.runtime_properties[pending_key] = {
+            'search_opts': dict(search_opts),
+            'ids': [backup.id for backup in pending]
+        }
+        raise OperationRetry(
+            '{0} is still alive'.format(
+                ', '.join(backup.name or backup.id for backup in pending)),
+            retry_after=get_transition_retry_after(
+                backup_instance, 'delete', default=30))
+
+    del ctx.instance.runtime_properties[pending_key]
+    finish_transition(backup_instance, 'delete')
 
 
 def _delete_volume_backup(volume_resource, search_opts):
@@ -340,17 +415,17 @@ def _restore_volume_from_backup(volume_resource, backup_name):
     # Since backup volume does not allow to filter backup volume, we are
     # iterating over all volume backup in order to match the backup name &
     # volume id so that we can restore it
-    for backup in backup_volume.list():
-        # if returned more than one backup, use first
-        if backup.name == backup_name:
-            ctx.logger.debug(
-                'Used first with {0} to {1}'.format(backup.id, volume_id))
-            name = 'volume-restore-{0}'.format(backup.id)
-            backup_volume.restore(backup.id, volume_id, name)
-            break
-    else:
+    # if returned more than one backup, use first
+    backup = backup_volume.first_match(
+        lambda backup: backup.name == backup_name)
+    if not backup:
         raise NonRecoverableError('No such {0} backup.'.format(backup_name))
 
+    ctx.logger.debug(
+        'Used first with {0} to {1}'.format(backup.id, volume_id))
+    name = 'volume-restore-{0}'.format(backup.id)
+    backup_volume.restore(backup.id, volume_id, name)
+
 
 @with_openstack_resource(OpenstackVolume)
 def create(openstack_resource, args={}):
@@ -372,6 +447,7 @@ def create(openstack_resource, args={}):
 
     created_resource = openstack_resource.create()
     ctx.instance.runtime_properties[RESOURCE_ID] = created_resource.id
+    start_transition(openstack_resource, 'create')
 
 
 @with_openstack_resource(OpenstackVolume)
@@ -382,10 +458,13 @@ def start(openstack_resource, **kwargs):
     :param openstack_resource: current openstack volume instance
     :param kwargs: Extra information provided by operation input
     """
-    volume = wait_until_status(openstack_resource,
-                               VOLUME_OPENSTACK_TYPE,
-                               VOLUME_STATUS_AVAILABLE,
-                               VOLUME_ERROR_STATUSES)
+    volume = wait_until_status(
+        openstack_resource,
+        VOLUME_OPENSTACK_TYPE,
+        VOLUME_STATUS_AVAILABLE,
+        VOLUME_ERROR_STATUSES,
+        transition='create',
+        bucket=get_size_bucket(openstack_resource.config.get('size')))
 
     # Set volume runtime properties needed when attach bootable volume to
     # server
@@ -491,27 +570,34 @@ def delete(openstack_resource):
     if VOLUME_TASK_DELETE not in ctx.instance.runtime_properties:
         # Delete volume resource
         openstack_resource.delete()
+        start_transition(openstack_resource, 'delete')
         ctx.instance.runtime_properties[VOLUME_TASK_DELETE] = True
 
     # Make sure that volume are deleting
-    try:
-        openstack_resource.get()
-        raise OperationRetry('Volume {0} is still deleting'.format(
-            openstack_resource.resource_id))
-    except openstack.exceptions.ResourceNotFound:
-        ctx.logger.info('Volume {0} is deleted successfully'.format(
-            openstack_resource.resource_id))
+    size = get_size_bucket(openstack_resource.config.get('size'))
+    deleted = poll_resource_deleted(openstack_resource)
+    if not deleted:
+        raise OperationRetry(
+            'Volume {0} is still deleting'.format(
+                openstack_resource.resource_id),
+            retry_after=get_transition_retry_after(
+                openstack_resource, 'delete', size))
+    finish_transition(openstack_resource, 'delete', size)
+    ctx.logger.info('Volume {0} is deleted successfully'.format(
+        openstack_resource.resource_id))
 
 
 @with_openstack_resource(OpenstackVolume)
-def list_volumes(openstack_resource, query=None):
+def list_volumes(openstack_resource, query=None, fields=None):
     """
     List openstack volumes based on filters applied
     :param openstack_resource: Instance of current openstack volume
     :param kwargs query: Optional query parameters to be sent to limit
             the volumes being returned.
+    :param list fields: Optional names of the attributes to return for
+            every resource instead of the whole resource.
     """
-    volumes = openstack_resource.list(query)
+    volumes = openstack_resource.list(query, fields=fields)
     add_resource_list_to_runtime_properties(VOLUME_OPENSTACK_TYPE, volumes)
 
 
@@ -17,6 +17,7 @@
 import copy
 import uuid
 import unittest
+import mock
 
 # Third party imports
 from cloudify.manager import DirtyTrackingDict
@@ -29,6 +30,9 @@ from cloudify.mocks import (
     MockRelationshipSubjectContext,
 )
 
+# Local imports
+from openstack_sdk.pool import connection_pool
+
 
 class CustomMockNodeContext(MockNodeContext):
     def __init__(self,
@@ -54,6 +58,13 @@ class OpenStackTestBase(unittest.TestCase):
 
     def setUp(self):
         super(OpenStackTestBase, self).setUp()
+        connection_pool.clear()
+        # Operations check resource status only once unless a test enables
+        # in process polling through client config
+        polling_budget = mock.patch(
+            'openstack_sdk.poller.DEFAULT_POLLING_BUDGET', 0)
+        polling_budget.start()
+        self.addCleanup(polling_budget.stop)
 
     def tearDown(self):
         current_ctx.clear()
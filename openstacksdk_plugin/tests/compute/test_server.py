@@ -52,16 +52,15 @@ from openstacksdk_plugin.constants import (RESOURCE_ID,
                                            VOLUME_NODE_TYPE,
                                            SERVER_GROUP_NODE_TYPE,
                                            SERVER_TASK_DELETE,
-                                           SERVER_TASK_START,
                                            SERVER_TASK_STOP,
                                            SERVER_INTERFACE_IDS,
-                                           SERVER_TASK_BACKUP_DONE,
-                                           SERVER_TASK_RESTORE_STATE,
+                                           SERVER_CONSOLE_PROBE,
+                                           SERVER_SNAPSHOT_STATE,
+                                           SERVER_SNAPSHOT_IMAGES,
                                            VOLUME_ATTACHMENT_TASK,
                                            VOLUME_DETACHMENT_TASK,
                                            VOLUME_ATTACHMENT_ID,
-                                           SERVER_ACTION_STATUS_DONE,
-                                           SERVER_ACTION_STATUS_PENDING)
+                                           SERVER_ACTION_STATUS_DONE)
 
 
 @mock.patch('openstack.connect')
@@ -516,6 +515,58 @@ class ServerTestCase(OpenStackTestBase):
         mock_ips_runtime_properties.assert_called()
         mock_user_password.assert_called()
 
+    @mock.patch('openstacksdk_plugin.resources.compute.server'
+                '._get_user_password')
+    @mock.patch('openstacksdk_plugin.resources.compute.server'
+                '._set_server_ips_runtime_properties')
+    def test_configure_with_readiness_probe(self,
+                                            mock_ips_runtime_properties,
+                                            mock_user_password,
+                                            mock_connection):
+        # Prepare the context for configure operation which waits for
+        # cloud-init to finish
+        properties = dict(self.node_properties)
+        properties['readiness_probe'] = {'markers': ['finished at'],
+                                         'tail_lines': 10}
+        self._prepare_context_for_operation(
+            test_name='ServerTestCase',
+            test_properties=properties,
+            ctx_operation_name='cloudify.interfaces.lifecycle.configure',
+            type_hierarchy=self.type_hierarchy)
+        self._ctx.instance.runtime_properties[RESOURCE_ID] = \
+            'a95b5509-c122-4c2f-823e-884bb559afe8'
+        server_instance = openstack.compute.v2.server.Server(**{
+            'id': 'a95b5509-c122-4c2f-823e-884bb559afe8',
+            'name': 'test_server',
+            'status': 'ACTIVE'
+        })
+        mock_connection().compute.get_server = \
+            mock.MagicMock(return_value=server_instance)
+        mock_connection().compute.get_server_console_output = \
+            mock.MagicMock(side_effect=[
+                {'output': 'Starting cloud-init\n'},
+                {'output': 'Starting cloud-init\n'
+                           'Cloud-init v. 18.5 finished at Mon, 01 Jul\n'}
+            ])
+
+        # Cloud-init is still running
+        with self.assertRaises(OperationRetry):
+            server.configure()
+        mock_ips_runtime_properties.assert_not_called()
+        self.assertEqual(
+            self._ctx.instance.runtime_properties[SERVER_CONSOLE_PROBE],
+            {'offset': 20, 'anchor': 'Starting cloud-init\n'})
+
+        # Cloud-init finished
+        server.configure()
+        mock_ips_runtime_properties.assert_called()
+        mock_user_password.assert_called()
+        self.assertNotIn(SERVER_CONSOLE_PROBE,
+                         self._ctx.instance.runtime_properties)
+        mock_connection().compute.get_server_console_output.\
+            assert_called_with('a95b5509-c122-4c2f-823e-884bb559afe8',
+                               length=10)
+
     @mock.patch('openstacksdk_plugin.resources.compute.server'
                 '._get_user_password')
     @mock.patch('openstacksdk_plugin.resources.compute.server'
@@ -767,10 +818,10 @@ class ServerTestCase(OpenStackTestBase):
         mock_connection().compute.reboot_server = \
             mock.MagicMock(return_value=None)
 
-        # Mock get operation
+        # Mock get operation, reboot acts by server id so the server is
+        # only fetched to check its status
         mock_connection().compute.get_server = \
-            mock.MagicMock(side_effect=[server_instance,
-                                        rebooted_server_instance])
+            mock.MagicMock(side_effect=[rebooted_server_instance])
 
         self._ctx.operation.retry = mock.Mock(side_effect=OperationRetry())
 
@@ -779,6 +830,8 @@ class ServerTestCase(OpenStackTestBase):
             server.reboot()
         self._ctx.operation.retry.assert_called_with(
             message='Server has REBOOT state. Waiting.', retry_after=30)
+        mock_connection().compute.reboot_server.assert_called_once_with(
+            server_instance.id, 'SOFT')
 
     def test_suspend(self, mock_connection):
         # Prepare the context for suspend operation
@@ -885,9 +938,21 @@ class ServerTestCase(OpenStackTestBase):
         mock_connection().compute.get_server = \
             mock.MagicMock(return_value=server_instance)
 
+        # Generate the snapshot name for the uploaded image
+        snapshot_name = get_snapshot_name('vm', 'test-snapshot', False)
+        image = openstack.image.v2.image.Image(**{
+            'id': 'a95b5509-c122-4c2f-823e-884bb559afe7',
+            'name': snapshot_name,
+            'container_format': 'test_bare',
+            'disk_format': 'test_format',
+            'checksum': '6d8f1c8cf05e1fbdc8b543fda1a9fa7f',
+            'size': 258540032
+
+        })
+
         # Mock list image operation
         mock_connection().image.images = \
-            mock.MagicMock(return_value=[])
+            mock.MagicMock(side_effect=[[], [image]])
 
         # Call snapshot
         snapshot_params = {
@@ -896,10 +961,12 @@ class ServerTestCase(OpenStackTestBase):
         }
         server.snapshot_create(**snapshot_params)
 
-        # Check if the resource id is already set or not
-        self.assertIn(
-            SERVER_TASK_BACKUP_DONE,
-            self._ctx.instance.runtime_properties)
+        # Image id is recorded once the upload finished
+        self.assertEqual(
+            self._ctx.instance.runtime_properties[SERVER_SNAPSHOT_IMAGES],
+            {snapshot_name: 'a95b5509-c122-4c2f-823e-884bb559afe7'})
+        self.assertNotIn(SERVER_SNAPSHOT_STATE,
+                         self._ctx.instance.runtime_properties)
 
     def test_create_backup(self, mock_connection):
         # Prepare the context for backup create operation
@@ -934,9 +1001,21 @@ class ServerTestCase(OpenStackTestBase):
         mock_connection().compute.get_server = \
             mock.MagicMock(return_value=server_instance)
 
+        # Generate the snapshot name for the uploaded image
+        snapshot_name = get_snapshot_name('vm', 'test-snapshot', True)
+        image = openstack.image.v2.image.Image(**{
+            'id': 'a95b5509-c122-4c2f-823e-884bb559afe7',
+            'name': snapshot_name,
+            'container_format': 'test_bare',
+            'disk_format': 'test_format',
+            'checksum': '6d8f1c8cf05e1fbdc8b543fda1a9fa7f',
+            'size': 258540032
+
+        })
+
         # Mock list image operation
         mock_connection().image.images = \
-            mock.MagicMock(return_value=[])
+            mock.MagicMock(side_effect=[[], [image]])
 
         # Call snapshot
         snapshot_params = {
@@ -947,22 +1026,16 @@ class ServerTestCase(OpenStackTestBase):
         }
         server.snapshot_create(**snapshot_params)
 
-        # Check if the resource id is already set or not
-        self.assertIn(
-            SERVER_TASK_BACKUP_DONE,
-            self._ctx.instance.runtime_properties)
-
-    def test_apply_snapshot(self, mock_connection):
-        # Prepare the context for snapshot apply operation
-        self._prepare_context_for_operation(
-            test_name='ServerTestCase',
-            ctx_operation_name='cloudify.interfaces.snapshot.apply',
-            type_hierarchy=self.type_hierarchy,
-            test_runtime_properties={
-                'id': 'a95b5509-c122-4c2f-823e-884bb559afe8'
-            })
-
-        server_instance = openstack.compute.v2.server.Server(**{
+        # Image id is recorded once the upload finished
+        self.assertEqual(
+            self._ctx.instance.runtime_properties[SERVER_SNAPSHOT_IMAGES],
+            {snapshot_name: 'a95b5509-c122-4c2f-823e-884bb559afe7'})
+        self.assertNotIn(SERVER_SNAPSHOT_STATE,
+                         self._ctx.instance.runtime_properties)
+
+    def _get_server_instances(self, *statuses):
+        # Server states returned by consecutive get server calls
+        return [openstack.compute.v2.server.Server(**{
             'id': 'a95b5509-c122-4c2f-823e-884bb559afe8',
             'name': 'test_server',
             'access_ipv4': '1',
@@ -974,9 +1047,20 @@ class ServerTestCase(OpenStackTestBase):
             'image_id': '3',
             'availability_zone': 'test_availability_zone',
             'key_name': 'test_key_name',
-            'status': 'ACTIVE',
+            'status': status,
+
+        }) for status in statuses]
+
+    def test_apply_snapshot(self, mock_connection):
+        # Prepare the context for snapshot apply operation
+        self._prepare_context_for_operation(
+            test_name='ServerTestCase',
+            ctx_operation_name='cloudify.interfaces.snapshot.apply',
+            type_hierarchy=self.type_hierarchy,
+            test_runtime_properties={
+                'id': 'a95b5509-c122-4c2f-823e-884bb559afe8'
+            })
 
-        })
         # Generate the snapshot name for the mocked image
         snapshot_name = get_snapshot_name('vm', 'test-snapshot', False)
         image = openstack.image.v2.image.Image(**{
@@ -989,26 +1073,23 @@ class ServerTestCase(OpenStackTestBase):
 
         })
 
-        # Mock backup operation
-        mock_connection().compute.backup = \
+        # Mock server actions
+        mock_connection().compute.stop_server = \
+            mock.MagicMock(return_value=None)
+        mock_connection().compute.rebuild_server = \
+            mock.MagicMock(return_value=None)
+        mock_connection().compute.start_server = \
             mock.MagicMock(return_value=None)
 
-        # Mock get server operation
+        # Server is stopped, rebuilt and started again within one call
         mock_connection().compute.get_server = \
-            mock.MagicMock(return_value=server_instance)
+            mock.MagicMock(side_effect=self._get_server_instances(
+                'ACTIVE', 'SHUTOFF', 'SHUTOFF', 'ACTIVE'))
 
         # Mock list image operation
         mock_connection().image.images = \
             mock.MagicMock(return_value=[image])
 
-        # Set runtime properties for apply snapshot
-        self._ctx.instance.runtime_properties[SERVER_TASK_RESTORE_STATE]\
-            = SERVER_ACTION_STATUS_PENDING
-        self._ctx.instance.runtime_properties[SERVER_TASK_STOP] = \
-            SERVER_ACTION_STATUS_DONE
-        self._ctx.instance.runtime_properties[SERVER_TASK_START] = \
-            SERVER_ACTION_STATUS_DONE
-
         # Call snapshot
         snapshot_params = {
             'snapshot_name': 'test-snapshot',
@@ -1016,6 +1097,14 @@ class ServerTestCase(OpenStackTestBase):
         }
         server.snapshot_apply(**snapshot_params)
 
+        mock_connection().compute.stop_server.assert_called_once()
+        mock_connection().compute.start_server.assert_called_once()
+        self.assertEqual(
+            mock_connection().compute.rebuild_server.call_args[1]['image'],
+            'a95b5509-c122-4c2f-823e-884bb559afe7')
+        self.assertNotIn(SERVER_SNAPSHOT_STATE,
+                         self._ctx.instance.runtime_properties)
+
     def test_apply_backup(self, mock_connection):
         # Prepare the context for backup apply operation
         self._prepare_context_for_operation(
@@ -1026,53 +1115,27 @@ class ServerTestCase(OpenStackTestBase):
                 'id': 'a95b5509-c122-4c2f-823e-884bb559afe8'
             })
 
-        server_instance = openstack.compute.v2.server.Server(**{
-            'id': 'a95b5509-c122-4c2f-823e-884bb559afe8',
-            'name': 'test_server',
-            'access_ipv4': '1',
-            'access_ipv6': '2',
-            'addresses': {},
-            'config_drive': True,
-            'created': '2015-03-09T12:14:57.233772',
-            'flavor_id': '2',
-            'image_id': '3',
-            'availability_zone': 'test_availability_zone',
-            'key_name': 'test_key_name',
-            'status': 'ACTIVE',
-
-        })
-
-        # Generate the snapshot name for the mocked image
+        # Image id recorded by snapshot create
         snapshot_name = get_snapshot_name('vm', 'test-snapshot', True)
-        image = openstack.image.v2.image.Image(**{
-            'id': 'a95b5509-c122-4c2f-823e-884bb559afe7',
-            'name': snapshot_name,
-            'container_format': 'test_bare',
-            'disk_format': 'test_format',
-            'checksum': '6d8f1c8cf05e1fbdc8b543fda1a9fa7f',
-            'size': 258540032
-
-        })
+        self._ctx.instance.runtime_properties[SERVER_SNAPSHOT_IMAGES] = {
+            snapshot_name: 'a95b5509-c122-4c2f-823e-884bb559afe7'
+        }
 
-        # Mock backup operation
-        mock_connection().compute.backup = \
+        # Mock server actions
+        mock_connection().compute.stop_server = \
+            mock.MagicMock(return_value=None)
+        mock_connection().compute.rebuild_server = \
+            mock.MagicMock(return_value=None)
+        mock_connection().compute.start_server = \
             mock.MagicMock(return_value=None)
 
-        # Mock get server operation
+        # Server is already stopped, so only rebuild and start are needed
         mock_connection().compute.get_server = \
-            mock.MagicMock(return_value=server_instance)
+            mock.MagicMock(side_effect=self._get_server_instances(
+                'SHUTOFF', 'SHUTOFF', 'SHUTOFF', 'ACTIVE'))
 
         # Mock list image operation
-        mock_connection().image.images = \
-            mock.MagicMock(return_value=[image])
-
-        # Set runtime properties for apply snapshot
-        self._ctx.instance.runtime_properties[SERVER_TASK_RESTORE_STATE]\
-            = SERVER_ACTION_STATUS_PENDING
-        self._ctx.instance.runtime_properties[SERVER_TASK_STOP] = \
-            SERVER_ACTION_STATUS_DONE
-        self._ctx.instance.runtime_properties[SERVER_TASK_START] = \
-            SERVER_ACTION_STATUS_DONE
+        mock_connection().image.images = mock.MagicMock()
 
         # Call snapshot
         snapshot_params = {
@@ -1081,6 +1144,115 @@ class ServerTestCase(OpenStackTestBase):
         }
         server.snapshot_apply(**snapshot_params)
 
+        # The recorded image id is used instead of looking up the image
+        mock_connection().image.images.assert_not_called()
+        mock_connection().compute.stop_server.assert_not_called()
+        mock_connection().compute.start_server.assert_called_once()
+        self.assertEqual(
+            mock_connection().compute.rebuild_server.call_args[1]['image'],
+            'a95b5509-c122-4c2f-823e-884bb559afe7')
+        self.assertNotIn(SERVER_SNAPSHOT_STATE,
+                         self._ctx.instance.runtime_properties)
+
+    def test_apply_snapshot_resumed(self, mock_connection):
+        # Prepare the context for snapshot apply operation
+        self._prepare_context_for_operation(
+            test_name='ServerTestCase',
+            ctx_operation_name='cloudify.interfaces.snapshot.apply',
+            type_hierarchy=self.type_hierarchy,
+            test_runtime_properties={
+                'id': 'a95b5509-c122-4c2f-823e-884bb559afe8'
+            })
+
+        # Image id recorded by snapshot create
+        snapshot_name = get_snapshot_name('vm', 'test-snapshot', False)
+        self._ctx.instance.runtime_properties[SERVER_SNAPSHOT_IMAGES] = {
+            snapshot_name: 'a95b5509-c122-4c2f-823e-884bb559afe7'
+        }
+
+        # Mock server actions
+        mock_connection().compute.stop_server = \
+            mock.MagicMock(return_value=None)
+        mock_connection().compute.rebuild_server = \
+            mock.MagicMock(return_value=None)
+        mock_connection().compute.start_server = \
+            mock.MagicMock(return_value=None)
+
+        # Server is still stopping when it is checked
+        mock_connection().compute.get_server = \
+            mock.MagicMock(side_effect=self._get_server_instances(
+                'ACTIVE', 'ACTIVE'))
+
+        snapshot_params = {
+            'snapshot_name': 'test-snapshot',
+            'snapshot_incremental': False
+        }
+        with self.assertRaises(OperationRetry):
+            server.snapshot_apply(**snapshot_params)
+
+        state = self._ctx.instance.runtime_properties[SERVER_SNAPSHOT_STATE]
+        self.assertEqual(state['phase'], 'stop')
+        mock_connection().compute.rebuild_server.assert_not_called()
+
+        # The retry continues polling the stop phase without stopping the
+        # server again
+        mock_connection().compute.get_server = \
+            mock.MagicMock(side_effect=self._get_server_instances(
+                'SHUTOFF', 'SHUTOFF', 'ACTIVE'))
+        server.snapshot_apply(**snapshot_params)
+
+        mock_connection().compute.stop_server.assert_called_once()
+        mock_connection().compute.rebuild_server.assert_called_once()
+        mock_connection().compute.start_server.assert_called_once()
+        self.assertNotIn(SERVER_SNAPSHOT_STATE,
+                         self._ctx.instance.runtime_properties)
+
+    def test_apply_snapshot_outdated_status(self, mock_connection):
+        # Prepare the context for snapshot apply operation
+        self._prepare_context_for_operation(
+            test_name='ServerTestCase',
+            ctx_operation_name='cloudify.interfaces.snapshot.apply',
+            type_hierarchy=self.type_hierarchy,
+            test_runtime_properties={
+                'id': 'a95b5509-c122-4c2f-823e-884bb559afe8'
+            })
+
+        # Image id recorded by snapshot create
+        snapshot_name = get_snapshot_name('vm', 'test-snapshot', False)
+        self._ctx.instance.runtime_properties[SERVER_SNAPSHOT_IMAGES] = {
+            snapshot_name: 'a95b5509-c122-4c2f-823e-884bb559afe7'
+        }
+
+        # Mock server actions
+        mock_connection().compute.rebuild_server = \
+            mock.MagicMock(return_value=None)
+        mock_connection().compute.start_server = \
+            mock.MagicMock(return_value=None)
+
+        # Server is rebuilding right after the rebuild request
+        stopped, _ = self._get_server_instances('SHUTOFF', 'SHUTOFF')
+        rebuilding = openstack.compute.v2.server.Server(
+            id='a95b5509-c122-4c2f-823e-884bb559afe8',
+            status='REBUILD',
+            task_state='rebuild_spawning')
+        mock_connection().compute.get_server = \
+            mock.MagicMock(side_effect=[stopped, stopped, rebuilding])
+
+        snapshot_params = {
+            'snapshot_name': 'test-snapshot',
+            'snapshot_incremental': False
+        }
+        # Status published by the status multiplexer before the rebuild
+        with mock.patch(
+                'openstack_sdk.resources.compute.OpenstackServer.get_fresh',
+                return_value=stopped):
+            with self.assertRaises(OperationRetry):
+                server.snapshot_apply(**snapshot_params)
+
+        state = self._ctx.instance.runtime_properties[SERVER_SNAPSHOT_STATE]
+        self.assertEqual(state['phase'], 'rebuild')
+        mock_connection().compute.start_server.assert_not_called()
+
     def test_delete_snapshot(self, mock_connection):
         # Prepare the context for snapshot delete operation
         self._prepare_context_for_operation(
@@ -1107,14 +1279,8 @@ class ServerTestCase(OpenStackTestBase):
         })
 
         # Set runtime properties for snapshot
-        self._ctx.instance.runtime_properties[SERVER_TASK_BACKUP_DONE]\
-            = SERVER_ACTION_STATUS_DONE
-        self._ctx.instance.runtime_properties[SERVER_TASK_RESTORE_STATE]\
-            = SERVER_ACTION_STATUS_DONE
         self._ctx.instance.runtime_properties[SERVER_TASK_STOP] = \
             SERVER_ACTION_STATUS_DONE
-        self._ctx.instance.runtime_properties[SERVER_TASK_START] = \
-            SERVER_ACTION_STATUS_DONE
 
         # Generate the snapshot name for the mocked image
         snapshot_name = get_snapshot_name('vm', 'test-snapshot', False)
@@ -1128,6 +1294,15 @@ class ServerTestCase(OpenStackTestBase):
 
         })
 
+        self._ctx.instance.runtime_properties[SERVER_SNAPSHOT_STATE] = {
+            'operation': 'apply',
+            'name': snapshot_name,
+            'phase': 'stop',
+        }
+        self._ctx.instance.runtime_properties[SERVER_SNAPSHOT_IMAGES] = {
+            snapshot_name: 'a95b5509-c122-4c2f-823e-884bb559afe7'
+        }
+
         # Mock get server operation
         mock_connection().compute.get_server = \
             mock.MagicMock(return_value=server_instance)
@@ -1147,11 +1322,10 @@ class ServerTestCase(OpenStackTestBase):
         }
         server.snapshot_delete(**snapshot_params)
 
-        for attr in [SERVER_TASK_RESTORE_STATE,
-                     SERVER_ACTION_STATUS_DONE,
-                     SERVER_TASK_STOP,
-                     SERVER_TASK_START]:
+        for attr in [SERVER_TASK_STOP, SERVER_SNAPSHOT_STATE]:
             self.assertNotIn(attr, self._ctx.instance.runtime_properties)
+        self.assertEqual(
+            self._ctx.instance.runtime_properties[SERVER_SNAPSHOT_IMAGES], {})
 
     def test_delete_backup(self, mock_connection):
         # Prepare the context for snapshot delete backup
@@ -1179,14 +1353,8 @@ class ServerTestCase(OpenStackTestBase):
         })
 
         # Set runtime properties for snapshot
-        self._ctx.instance.runtime_properties[SERVER_TASK_BACKUP_DONE]\
-            = SERVER_ACTION_STATUS_DONE
-        self._ctx.instance.runtime_properties[SERVER_TASK_RESTORE_STATE]\
-            = SERVER_ACTION_STATUS_DONE
         self._ctx.instance.runtime_properties[SERVER_TASK_STOP] = \
             SERVER_ACTION_STATUS_DONE
-        self._ctx.instance.runtime_properties[SERVER_TASK_START] = \
-            SERVER_ACTION_STATUS_DONE
 
         # Generate the snapshot name for the mocked image
         snapshot_name = get_snapshot_name('vm', 'test-snapshot', True)
@@ -1219,10 +1387,7 @@ class ServerTestCase(OpenStackTestBase):
         }
         server.snapshot_delete(**snapshot_params)
 
-        for attr in [SERVER_TASK_RESTORE_STATE,
-                     SERVER_TASK_BACKUP_DONE,
-                     SERVER_TASK_STOP,
-                     SERVER_TASK_START]:
+        for attr in [SERVER_TASK_STOP, SERVER_SNAPSHOT_STATE]:
             self.assertNotIn(attr, self._ctx.instance.runtime_properties)
 
     @mock.patch(
@@ -16,6 +16,8 @@
 # Third party imports
 import mock
 import openstack.network.v2.network
+from openstack import exceptions
+from cloudify.exceptions import NonRecoverableError, OperationRetry
 
 # Local imports
 from openstacksdk_plugin.tests.base import OpenStackTestBase
@@ -93,6 +95,72 @@ class NetworkTestCase(OpenStackTestBase):
             self._ctx.instance.runtime_properties[OPENSTACK_TYPE_PROPERTY],
             NETWORK_OPENSTACK_TYPE)
 
+    def test_create_transient_error(self, mock_connection):
+        # Prepare the context for create operation
+        self._prepare_context_for_operation(
+            test_name='NetworkTestCase',
+            ctx_operation_name='cloudify.interfaces.lifecycle.create')
+
+        # Mock create network response, the network may have been created
+        # even though the API failed
+        mock_connection().network.create_network = \
+            mock.MagicMock(
+                side_effect=exceptions.HttpException(http_status=503))
+
+        # Call create network, create request is not idempotent, so it is
+        # not sent again neither in process nor by retrying the operation
+        with self.assertRaises(NonRecoverableError):
+            network.create()
+        mock_connection().network.create_network.assert_called_once()
+
+    def test_create_throttled(self, mock_connection):
+        # Prepare the context for create operation
+        self._prepare_context_for_operation(
+            test_name='NetworkTestCase',
+            ctx_operation_name='cloudify.interfaces.lifecycle.create')
+
+        # Mock create network response, throttled requests are not
+        # processed by the API
+        mock_connection().network.create_network = \
+            mock.MagicMock(
+                side_effect=exceptions.HttpException(http_status=429))
+
+        # Call create network
+        with self.assertRaises(OperationRetry):
+            network.create()
+
+    def test_create_conflict(self, mock_connection):
+        # Prepare the context for create operation
+        self._prepare_context_for_operation(
+            test_name='NetworkTestCase',
+            ctx_operation_name='cloudify.interfaces.lifecycle.create')
+
+        # Mock create network response
+        mock_connection().network.create_network = \
+            mock.MagicMock(
+                side_effect=exceptions.HttpException(http_status=409))
+
+        # Call create network
+        with self.assertRaises(NonRecoverableError):
+            network.create()
+        mock_connection().network.create_network.assert_called_once()
+
+    def test_create_permanent_error(self, mock_connection):
+        # Prepare the context for create operation
+        self._prepare_context_for_operation(
+            test_name='NetworkTestCase',
+            ctx_operation_name='cloudify.interfaces.lifecycle.create')
+
+        # Mock create network response
+        mock_connection().network.create_network = \
+            mock.MagicMock(
+                side_effect=exceptions.HttpException(http_status=400))
+
+        # Call create network
+        with self.assertRaises(NonRecoverableError):
+            network.create()
+        mock_connection().network.create_network.assert_called_once()
+
     def test_delete(self, mock_connection):
         # Prepare the context for delete operation
         self._prepare_context_for_operation(
@@ -145,6 +213,30 @@ class NetworkTestCase(OpenStackTestBase):
                      OPENSTACK_TYPE_PROPERTY]:
             self.assertNotIn(attr, self._ctx.instance.runtime_properties)
 
+    def test_delete_conflict(self, mock_connection):
+        # Prepare the context for delete operation
+        self._prepare_context_for_operation(
+            test_name='NetworkTestCase',
+            ctx_operation_name='cloudify.interfaces.lifecycle.delete')
+
+        network_instance = openstack.network.v2.network.Network(**{
+            'id': 'a95b5509-c122-4c2f-823e-884bb559afe4',
+            'name': 'test_network',
+        })
+        # Mock delete network response, the network is still used by
+        # ports which are being deleted
+        mock_connection().network.delete_network = \
+            mock.MagicMock(
+                side_effect=exceptions.HttpException(http_status=409))
+
+        # Mock get network response
+        mock_connection().network.get_network = \
+            mock.MagicMock(return_value=network_instance)
+
+        # Call delete network
+        with self.assertRaises(OperationRetry):
+            network.delete()
+
     def test_update(self, mock_connection):
         # Prepare the context for update operation
         self._prepare_context_for_operation(
@@ -227,6 +319,35 @@ class NetworkTestCase(OpenStackTestBase):
         # Call update network
         network.update(args=new_config)
 
+        mock_connection().network.update_network.assert_called_once_with(
+            old_network_instance, name='test_updated_network')
+
+    def test_update_without_changes(self, mock_connection):
+        # Prepare the context for update operation
+        self._prepare_context_for_operation(
+            test_name='NetworkTestCase',
+            ctx_operation_name='cloudify.interfaces.operations.update')
+
+        network_instance = openstack.network.v2.network.Network(**{
+            'id': 'a95b5509-c122-4c2f-823e-884bb559afe4',
+            'name': 'test_network',
+            'admin_state_up': True,
+            'description': '',
+            'router:external': False,
+        })
+
+        # Mock get network response
+        mock_connection().network.get_network = \
+            mock.MagicMock(return_value=network_instance)
+
+        # Call update network with the same values as the remote one
+        network.update(args={'name': 'test_network',
+                             'admin_state_up': True,
+                             'description': '',
+                             'router:external': False})
+
+        mock_connection().network.update_network.assert_not_called()
+
     def test_list_networks(self, mock_connection):
         # Prepare the context for list projects operation
         self._prepare_context_for_operation(
@@ -471,13 +471,27 @@ class PortTestCase(OpenStackTestBase):
         mock_connection().network.get_port = \
             mock.MagicMock(return_value=port_instance)
 
-        # Mock update port response
-        mock_connection().network.update_port = \
-            mock.MagicMock(return_value=updated_port_instance)
+        # Mock conditional update port response
+        update_response = mock.MagicMock(status_code=200)
+        update_response.json.return_value = {
+            'port': updated_port_instance.to_dict()
+        }
+        mock_connection().network.put = \
+            mock.MagicMock(return_value=update_response)
 
         # Call create port
         port.create()
 
+        mock_connection().network.put.assert_called_once_with(
+            '/ports/a95b5509-c122-4c2f-823e-884bb559afe1',
+            json={'port': {'allowed_address_pairs': [
+                {'ip_address': '10.0.0.3'},
+                {'ip_address': '10.0.0.4'},
+                {'ip_address': '10.0.0.5'},
+                {'ip_address': '10.0.0.6'}
+            ]}},
+            headers={'If-Match': 'revision_number=22'})
+
         for attr in [RESOURCE_ID,
                      OPENSTACK_NAME_PROPERTY,
                      OPENSTACK_TYPE_PROPERTY,
@@ -633,13 +647,25 @@ class PortTestCase(OpenStackTestBase):
         mock_connection().network.get_port = \
             mock.MagicMock(return_value=port_instance)
 
-        # Mock update port response
-        mock_connection().network.update_port = \
-            mock.MagicMock(return_value=updated_port_instance)
+        # Mock conditional update port response
+        update_response = mock.MagicMock(status_code=200)
+        update_response.json.return_value = {
+            'port': updated_port_instance.to_dict()
+        }
+        mock_connection().network.put = \
+            mock.MagicMock(return_value=update_response)
 
         # Call delete port
         port.delete()
 
+        mock_connection().network.put.assert_called_once_with(
+            '/ports/a95b5509-c122-4c2f-823e-884bb559afe1',
+            json={'port': {'allowed_address_pairs': [
+                {'ip_address': '10.0.0.3'},
+                {'ip_address': '10.0.0.4'}
+            ]}},
+            headers={'If-Match': 'revision_number=22'})
+
         for attr in [RESOURCE_ID,
                      OPENSTACK_NAME_PROPERTY,
                      OPENSTACK_TYPE_PROPERTY,
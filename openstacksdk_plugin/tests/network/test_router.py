@@ -128,13 +128,20 @@ class RouterTestCase(OpenStackTestBase):
         mock_connection().network.create_router = \
             mock.MagicMock(return_value=router_instance)
 
-        # Mock get network response
-        mock_connection().network.get_network = \
-            mock.MagicMock(return_value=network_instance)
+        # Mock list networks filtered by id response
+        list_response = mock.MagicMock(status_code=200)
+        list_response.json.return_value = {
+            'networks': [network_instance.to_dict()]
+        }
+        mock_connection().network.get = \
+            mock.MagicMock(return_value=list_response)
 
         # Call create router
         router.create()
 
+        mock_connection().network.get.assert_called_once_with(
+            '/networks',
+            params={'id': ['a95b5509-c122-4c2f-823e-884bb559afe4']})
         self.assertEqual(self._ctx.instance.runtime_properties[RESOURCE_ID],
                          'a95b5509-c122-4c2f-823e-884bb559afe8')
 
@@ -392,13 +399,22 @@ class RouterTestCase(OpenStackTestBase):
         mock_connection().network.get_router = \
             mock.MagicMock(return_value=old_router_instance)
 
-        # Mock update router response
-        mock_connection().network.update_router = \
-            mock.MagicMock(return_value=new_router_instance)
+        # Mock conditional update router response
+        update_response = mock.MagicMock(status_code=200)
+        update_response.json.return_value = {
+            'router': new_router_instance.to_dict()
+        }
+        mock_connection().network.put = \
+            mock.MagicMock(return_value=update_response)
 
         # Call stop router
         router.stop()
 
+        mock_connection().network.put.assert_called_once_with(
+            '/routers/a95b5509-c122-4c2f-823e-884bb559afe8',
+            json={'router': {'routes': []}},
+            headers={'If-Match': 'revision_number=7'})
+
     def test_add_interface_to_router(self, mock_connection):
         # Prepare the context for postconfigure operation
         self._prepare_context_for_operation(
@@ -13,6 +13,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+# Standard imports
+import os
+import shutil
+import tempfile
+
 # Third party imports
 import mock
 import openstack.block_storage.v2.volume
@@ -23,6 +28,7 @@ from cloudify.exceptions import (OperationRetry,
                                  NonRecoverableError)
 
 # Local imports
+from openstack_sdk.latency_model import LatencyModel
 from openstacksdk_plugin.tests.base import OpenStackTestBase
 from openstacksdk_plugin.resources.volume import volume
 from openstacksdk_plugin.utils import get_snapshot_name
@@ -220,6 +226,95 @@ class VolumeTestCase(OpenStackTestBase):
             volume.delete()
             mock_delete_volume_snapshot.assert_called()
 
+    @mock.patch('openstack_sdk.poller.time.sleep')
+    @mock.patch(
+        'openstacksdk_plugin.resources.volume.volume._delete_volume_snapshot')
+    def test_delete_polled_in_process(self,
+                                      mock_delete_volume_snapshot,
+                                      mock_sleep,
+                                      mock_connection):
+        # Prepare the context for delete operation with in process polling
+        properties = dict(self.node_properties)
+        properties['client_config'] = dict(self.client_config,
+                                           polling={'budget': 10})
+        self._prepare_context_for_operation(
+            test_name='VolumeTestCase',
+            test_properties=properties,
+            ctx_operation_name='cloudify.interfaces.lifecycle.delete')
+
+        volume_instance_deleting = openstack.block_storage.v2.volume.Volume(**{
+            'id': '1',
+            'name': 'test_volume',
+            'status': VOLUME_STATUS_DELETING
+        })
+        # Mock get volume response, the volume is deleted on third check
+        mock_connection().block_storage.get_volume = \
+            mock.MagicMock(side_effect=[volume_instance_deleting,
+                                        volume_instance_deleting,
+                                        volume_instance_deleting,
+                                        openstack.exceptions.ResourceNotFound])
+
+        # Mock delete volume response
+        mock_connection().block_storage.delete_volume = \
+            mock.MagicMock(return_value=None)
+
+        # Call delete volume, which must not be retried
+        volume.delete()
+
+        self.assertEqual(mock_sleep.call_count, 2)
+        self.assertNotIn(RESOURCE_ID, self._ctx.instance.runtime_properties)
+
+    @mock.patch(
+        'openstacksdk_plugin.resources.volume.volume._delete_volume_snapshot')
+    def test_delete_retry_after_learned(self,
+                                        mock_delete_volume_snapshot,
+                                        mock_connection):
+        # Prepare the context for delete operation with recorded completion
+        # times of volume delete
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path, ignore_errors=True)
+        properties = dict(self.node_properties)
+        properties['client_config'] = dict(
+            self.client_config,
+            latency_model={'enabled': True,
+                           'path': os.path.join(path, 'state.db')})
+        self._prepare_context_for_operation(
+            test_name='VolumeTestCase',
+            test_properties=properties,
+            ctx_operation_name='cloudify.interfaces.lifecycle.delete')
+        latency_model = \
+            LatencyModel.from_client_config(properties['client_config'])
+        for _ in range(3):
+            latency_model.record(VOLUME_OPENSTACK_TYPE, 'delete', 16, 60)
+
+        volume_instance_deleting = openstack.block_storage.v2.volume.Volume(**{
+            'id': '1',
+            'name': 'test_volume',
+            'status': VOLUME_STATUS_DELETING
+        })
+        # Mock get volume response
+        mock_connection().block_storage.get_volume = \
+            mock.MagicMock(return_value=volume_instance_deleting)
+
+        # Mock delete volume response
+        mock_connection().block_storage.delete_volume = \
+            mock.MagicMock(return_value=None)
+
+        # The retry is scheduled at the recorded completion time
+        with self.assertRaises(OperationRetry) as error:
+            volume.delete()
+        self.assertEqual(error.exception.retry_after, 60)
+
+        # Once the volume is deleted its completion time is recorded
+        mock_connection().block_storage.get_volume = \
+            mock.MagicMock(side_effect=openstack.exceptions.ResourceNotFound)
+        volume.delete()
+        self.assertEqual(
+            len(latency_model.get_durations(
+                VOLUME_OPENSTACK_TYPE, 'delete', 16)), 4)
+        self.assertNotIn('volume_delete_started_at',
+                         self._ctx.instance.runtime_properties)
+
     def test_create_volume_backup(self, mock_connection):
         # Prepare the context for create snapshot operation
         self._prepare_context_for_operation(
@@ -496,23 +591,12 @@ class VolumeTestCase(OpenStackTestBase):
             })
         ]
 
-        remaining_volume_backups = [
-            openstack.block_storage.v2.backup.Backup(**{
-                'id': '2',
-                'name': 'test_volume_backup_2',
-                'description': 'volume_backup_description',
-                'availability_zone': 'test_availability_zone',
-                'status': VOLUME_STATUS_AVAILABLE
-            })
-        ]
-        # Mock list volume backup response
+        # Mock list volume backup response, the backup is still deleting on
+        # the first check and gone on the second one
         mock_connection().block_storage.backups = \
             mock.MagicMock(side_effect=[all_volume_backups,
-                                        remaining_volume_backups])
-
-        # Mock get volume backup response
-        mock_connection().block_storage.get_backup = \
-            mock.MagicMock(return_value=volume_backup_to_delete)
+                                        [volume_backup_to_delete],
+                                        all_volume_backups[1:]])
 
         # Mock delete volume backup response
         mock_connection().block_storage.delete_backup = \
@@ -523,8 +607,66 @@ class VolumeTestCase(OpenStackTestBase):
             'snapshot_incremental': False
         }
 
-        # Call delete backup volume
+        # Call delete backup volume, which only deletes the matched backup
+        with self.assertRaises(OperationRetry):
+            volume.snapshot_delete(**snapshot_params)
+        mock_connection().block_storage.delete_backup.assert_called_once_with(
+            '1')
+        self.assertEqual(
+            self._ctx.instance.runtime_properties['pending_backup_deletes'],
+            {'search_opts': {'name': snapshot_name, 'volume_id': '1'},
+             'ids': ['1']})
+
+        # Retry only checks the deleted backup, with a single list
         volume.snapshot_delete(**snapshot_params)
+        self.assertEqual(
+            mock_connection().block_storage.backups.call_count, 3)
+        mock_connection().block_storage.delete_backup.assert_called_once_with(
+            '1')
+        self.assertNotIn('pending_backup_deletes',
+                         self._ctx.instance.runtime_properties)
+
+    def test_delete_volume_backup_other_search_opts(self, mock_connection):
+        # Prepare the context for delete snapshot operation
+        self._prepare_context_for_operation(
+            test_name='VolumeTestCase',
+            ctx_operation_name='cloudify.interfaces.snapshot.delete')
+
+        # Set resource id as runtime properties for volume instance
+        self._ctx.instance.runtime_properties['id'] = '1'
+
+        snapshot_name = \
+            get_snapshot_name('volume', 'test_volume_backup', False)
+
+        # Pending deletes left by a delete of another snapshot
+        self._ctx.instance.runtime_properties['pending_backup_deletes'] = {
+            'search_opts': {'name': 'other_backup', 'volume_id': '1'},
+            'ids': ['2']
+        }
+
+        volume_backup = openstack.block_storage.v2.backup.Backup(**{
+            'id': '1',
+            'name': snapshot_name,
+            'description': 'volume_backup_description',
+            'availability_zone': 'test_availability_zone',
+            'status': VOLUME_STATUS_AVAILABLE
+        })
+
+        # Mock list volume backup response, the backup is gone on the check
+        mock_connection().block_storage.backups = \
+            mock.MagicMock(side_effect=[[volume_backup], []])
+
+        # Mock delete volume backup response
+        mock_connection().block_storage.delete_backup = \
+            mock.MagicMock(return_value=None)
+
+        # Call delete backup volume, which starts over with its own search
+        volume.snapshot_delete(snapshot_name='test_volume_backup',
+                               snapshot_incremental=False)
+        mock_connection().block_storage.delete_backup.assert_called_once_with(
+            '1')
+        self.assertNotIn('pending_backup_deletes',
+                         self._ctx.instance.runtime_properties)
 
     def test_delete_volume_snapshot(self, mock_connection):
         # Prepare the context for delete snapshot operation
@@ -538,14 +680,6 @@ class VolumeTestCase(OpenStackTestBase):
         snapshot_name = \
             get_snapshot_name('volume', 'test_volume_snapshot', True)
 
-        volume_snapshot_to_delete = \
-            openstack.block_storage.v2.snapshot.Snapshot(**{
-                'id': '1',
-                'name': snapshot_name,
-                'description': 'volume_backup_description',
-                'status': VOLUME_STATUS_CREATING
-            })
-
         all_volume_snapshots = [
             openstack.block_storage.v2.snapshot.Snapshot(**{
                 'id': '1',
@@ -561,22 +695,10 @@ class VolumeTestCase(OpenStackTestBase):
             })
         ]
 
-        remaining_volume_snapshots = [
-            openstack.block_storage.v2.snapshot.Snapshot(**{
-                'id': '1',
-                'name': 'test_volume_snapshot_2',
-                'description': 'volume_backup_description',
-                'status': VOLUME_STATUS_CREATING
-            })
-        ]
-        # Mock list volume snapshots response
+        # Mock list volume snapshots response, the snapshot is deleted on
+        # the first check
         mock_connection().block_storage.snapshots = \
-            mock.MagicMock(side_effect=[all_volume_snapshots,
-                                        remaining_volume_snapshots])
-
-        # Mock get volume snapshot response
-        mock_connection().block_storage.get_snapshot = \
-            mock.MagicMock(return_value=volume_snapshot_to_delete)
+            mock.MagicMock(side_effect=[all_volume_snapshots, []])
 
         # Mock delete volume snapshot response
         mock_connection().block_storage.delete_snapshot = \
@@ -589,6 +711,10 @@ class VolumeTestCase(OpenStackTestBase):
 
         # Call delete snapshot volume
         volume.snapshot_delete(**snapshot_params)
+        mock_connection().block_storage.snapshots.assert_called_with(
+            volume_id='1')
+        self.assertNotIn('pending_snapshot_deletes',
+                         self._ctx.instance.runtime_properties)
 
     def test_list_volumes(self, mock_connection):
         # Prepare the context for list volumes operation
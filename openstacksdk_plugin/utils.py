@@ -15,6 +15,7 @@
 
 # Standard imports
 import sys
+import time
 import base64
 import inspect
 
@@ -24,6 +25,7 @@ import openstack.exceptions
 from cloudify import compute
 from cloudify import ctx
 from cloudify.exceptions import (NonRecoverableError, OperationRetry)
+from cloudify.state import current_ctx
 from cloudify.utils import exception_to_error_cause
 
 try:
@@ -33,12 +35,16 @@ except ImportError:
     RELATIONSHIP_INSTANCE = 'relationship-instance'
 
 # Local imports
+from openstack_sdk.executor import Executor
+from openstack_sdk.latency_model import LatencyModel
+from openstack_sdk.poller import Poller
 from openstacksdk_plugin.constants import (PS_OPEN,
                                            PS_CLOSE,
                                            QUOTA_VALID_MSG,
                                            QUOTA_INVALID_MSG,
                                            INFINITE_RESOURCE_QUOTA,
                                            RESOURCE_ID,
+                                           TRANSITION_STARTED_AT,
                                            OPENSTACK_TYPE_PROPERTY,
                                            OPENSTACK_NAME_PROPERTY,
                                            CLOUDIFY_NEW_NODE_OPERATIONS,
@@ -325,11 +331,6 @@ def validate_resource_quota(resource, openstack_type):
     )
     openstack_type_plural = resource.resource_plural(openstack_type)
 
-    resource_list = list(resource.list())
-
-    # This is the available quota for provisioning the resource
-    resource_amount = len(resource_list)
-
     # Log message to give an indication to the caller that there will be a
     # call trigger to fetch the quota for current resource
     ctx.logger.info(
@@ -340,6 +341,13 @@ def validate_resource_quota(resource, openstack_type):
     # This represent the quota for the provided resource openstack type
     resource_quota = resource.get_quota_sets(openstack_type_plural)
 
+    # This is the available quota for provisioning the resource, there is
+    # no need to fetch more resources than the quota in order to know
+    # whether it is exceeded
+    resource_amount = resource.count(
+        max_items=None if resource_quota == INFINITE_RESOURCE_QUOTA
+        else resource_quota)
+
     if resource_amount < resource_quota \
             or resource_quota == INFINITE_RESOURCE_QUOTA:
         ctx.logger.debug(
@@ -582,28 +590,150 @@ def get_ready_resource_status(resource,
     """
     # Get the last updated instance in order to start comparison based
     # on the remote status with the desired one that resource should be in
-    openstack_resource = resource.get()
+    openstack_resource = resource.get_fresh()
 
     # If the remote status of the current object matches one of error
     # statuses defined to this method, then a NonRecoverableError must
     # be raised
     if openstack_resource.status in error_statuses:
+        resource.stop_waiting()
         raise NonRecoverableError('{0} {1} is in error state'
                                   ''.format(resource_type,
                                             openstack_resource.id))
 
     # Check if the openstack resource match the desired status
     if openstack_resource.status == status:
+        resource.stop_waiting()
         return openstack_resource, True
 
     # The object is not ready yet
     return openstack_resource, False
 
 
+def poll_resource_status(resource,
+                         resource_type,
+                         status,
+                         error_statuses):
+    """
+    This method will keep checking the status of openstack resource in
+    process until it is ready or the polling budget configured by "polling"
+    of client config is spent
+    :param resource: Current instance of openstack resource
+    :param str resource_type: Resource type need to check status for
+    :param str status: desired status need to check the resource on
+    :param list error_statuses: List of error statuses that we should raise
+     error about if the remote openstack resource matches them
+    :return: Instance of the current openstack object contains the updated
+    status and boolean flag to mark it as updated or not
+    """
+    poller = Poller.from_client_config(resource.client_config,
+                                       logger=ctx.logger)
+    return poller.poll(
+        lambda: get_ready_resource_status(resource,
+                                          resource_type,
+                                          status,
+                                          error_statuses))
+
+
+def poll_resource_deleted(resource):
+    """
+    This method will keep checking if openstack resource is deleted in
+    process until it is not found or the polling budget configured by
+    "polling" of client config is spent
+    :param resource: Current instance of openstack resource
+    :return bool: True when the resource is deleted, otherwise False
+    """
+    def _check_deleted():
+        try:
+            return resource.get_fresh(), False
+        except openstack.exceptions.ResourceNotFound:
+            resource.stop_waiting()
+            return None, True
+
+    poller = Poller.from_client_config(resource.client_config,
+                                       logger=ctx.logger)
+    _, deleted = poller.poll(_check_deleted)
+    return deleted
+
+
+def start_transition(resource, transition):
+    """
+    This method will record when the transition of openstack resource
+    started, so that its completion time is recorded by the latency model
+    configured by "latency_model" of client config. A transition which is
+    already started keeps its start time
+    :param resource: Current instance of openstack resource
+    :param str transition: Name of the transition, i.e. stop
+    """
+    if not LatencyModel.from_client_config(resource.client_config):
+        return
+    runtime_properties = resolve_ctx(ctx).instance.runtime_properties
+    key = TRANSITION_STARTED_AT.format(resource.resource_type, transition)
+    if key not in runtime_properties:
+        runtime_properties[key] = time.time()
+
+
+def get_transition_retry_after(resource,
+                               transition,
+                               bucket=None,
+                               default=None):
+    """
+    This method will get the period to wait before checking the transition
+    of openstack resource again, based on the completion times recorded by
+    the latency model configured by "latency_model" of client config
+    :param resource: Current instance of openstack resource
+    :param str transition: Name of the transition, i.e. stop
+    :param bucket: Size or flavor bucket of the resource
+    :param default: Period used when the latency model is disabled or does
+    not have enough completion times recorded
+    :return: Period in seconds
+    """
+    latency_model = LatencyModel.from_client_config(resource.client_config,
+                                                    logger=ctx.logger)
+    if not latency_model:
+        return default
+    runtime_properties = resolve_ctx(ctx).instance.runtime_properties
+    key = TRANSITION_STARTED_AT.format(resource.resource_type, transition)
+    if key not in runtime_properties:
+        runtime_properties[key] = time.time()
+    return latency_model.get_retry_after(
+        resource.resource_type,
+        transition,
+        bucket,
+        time.time() - runtime_properties[key],
+        default)
+
+
+def finish_transition(resource, transition, bucket=None):
+    """
+    This method will record the completion time of the transition of
+    openstack resource in the latency model configured by "latency_model"
+    of client config
+    :param resource: Current instance of openstack resource
+    :param str transition: Name of the transition, i.e. stop
+    :param bucket: Size or flavor bucket of the resource
+    """
+    latency_model = LatencyModel.from_client_config(resource.client_config)
+    if not latency_model:
+        return
+    runtime_properties = resolve_ctx(ctx).instance.runtime_properties
+    key = TRANSITION_STARTED_AT.format(resource.resource_type, transition)
+    started_at = runtime_properties.get(key)
+    if started_at is None:
+        return
+    del runtime_properties[key]
+    latency_model.record(resource.resource_type,
+                         transition,
+                         bucket,
+                         time.time() - started_at)
+
+
 def wait_until_status(resource,
                       resource_type,
                       status,
-                      error_statuses):
+                      error_statuses,
+                      transition=None,
+                      bucket=None):
     """
     This method is build in order to check the status of the openstack
     resource and whether is is ready to be used or not
@@ -612,15 +742,21 @@ def wait_until_status(resource,
     :param str status: desired status need to check the resource on
     :param list error_statuses: List of error statuses that we should raise
      error about if the remote openstack resource matches them
+    :param str transition: Name of the awaited transition, when it is set
+     the completion time is recorded and the retry is scheduled by the
+     latency model
+    :param bucket: Size or flavor bucket of the resource
     :return: Instance of the current openstack object contains the updated
     status
     """
     # Check the openstack resource status
-    openstack_resource, ready = get_ready_resource_status(resource,
-                                                          resource_type,
-                                                          status,
-                                                          error_statuses)
+    openstack_resource, ready = poll_resource_status(resource,
+                                                     resource_type,
+                                                     status,
+                                                     error_statuses)
     if ready and openstack_resource:
+        if transition:
+            finish_transition(resource, transition, bucket)
         return openstack_resource
     else:
         message = '{0} {1} current state not ready: {2}'\
@@ -628,7 +764,11 @@ def wait_until_status(resource,
                         openstack_resource.id,
                         openstack_resource.status)
 
-        raise OperationRetry(message)
+        retry_after = None
+        if transition:
+            retry_after = \
+                get_transition_retry_after(resource, transition, bucket)
+        raise OperationRetry(message, retry_after=retry_after)
 
 
 def merge_resource_config(resource_config, config):
@@ -690,3 +830,24 @@ def allow_to_run_operation_for_external_node(operation_name):
     if operation_name not in CLOUDIFY_NEW_NODE_OPERATIONS:
         return True
     return False
+
+
+def run_concurrently(client_config, func, items):
+    """
+    Call func for every item concurrently using the executor configured by
+    client config, the calls run with the context of the current operation
+    so that they can use ctx the same as the operation itself
+    :param dict client_config: Openstack client configuration
+    :param func: Callable which takes a single item
+    :param items: Items to call func with
+    :return list: Results of the calls, in the order of items
+    """
+    operation_ctx = current_ctx.get_ctx()
+    operation_parameters = current_ctx.get_parameters()
+
+    def _call(item):
+        with current_ctx.push(operation_ctx, operation_parameters):
+            return func(item)
+
+    executor = Executor.from_client_config(client_config, logger=ctx.logger)
+    return executor.map(_call, items)
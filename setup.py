@@ -26,5 +26,10 @@ setup(
     license='LICENSE',
     zip_safe=False,
     packages=find_packages(exclude=['tests*']),
-    install_requires=['cloudify-common', 'openstacksdk'],
+    install_requires=['cloudify-common', 'openstacksdk>=0.27.0'],
+    entry_points={
+        'console_scripts': [
+            'openstacksdk-broker = openstack_sdk.broker:main'
+        ]
+    },
     test_requires=['mock', 'requests-mock'])